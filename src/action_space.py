@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from enum import Enum
+from typing import Any, Callable
+
+import numpy as np
+
+from src.board_interface import IBoard
+from src.card_combo_permuations import CARD_VALUES
+from src.cards import CardValue
+from src.controller_interface import IController
+from src.frozen_combo import FrozenCombo
+from src.legal_combo_table import TABLE_COMBOS, COMBO_INDICES
+
+type ActionChooser = Callable[[IBoard], int]
+
+GIVE_AWAY_VALUES = tuple(value for value in CARD_VALUES if value != CardValue.JOKER)  # Jokers are never given away
+GIVE_AWAY_VALUE_INDICES = {value: i for i, value in enumerate(GIVE_AWAY_VALUES)}
+
+
+class ActionPhase(Enum):
+    TURN = 0
+    GIVE_AWAY = 1
+    JOKER_TARGET = 2
+
+
+class ActionSpace:
+    """ Every move as an integer id, for a fixed number of players:
+        [pickup] + [combo i of TABLE_COMBOS] + [give away (value, target player)] + [joker target player].
+
+        Only turn actions (pickup and combos) are applied directly. Give-aways and joker targets are asked for
+        in the middle of a combo, so they are answered through an ActionIdController instead."""
+
+    PICKUP = 0
+    COMBOS_START = 1
+    GIVE_AWAYS_START = COMBOS_START + len(TABLE_COMBOS)
+
+    __loaded: dict[int, ActionSpace] = {}
+
+    def __init__(self, number_of_players: int):
+        self.number_of_players = number_of_players
+        self.joker_targets_start = self.GIVE_AWAYS_START + len(GIVE_AWAY_VALUES) * number_of_players
+        self.size = self.joker_targets_start + number_of_players
+
+    @classmethod
+    def cached(cls, number_of_players: int) -> ActionSpace:
+        if number_of_players not in cls.__loaded:
+            cls.__loaded[number_of_players] = cls(number_of_players)
+        return cls.__loaded[number_of_players]
+
+    def combo_id(self, combo: FrozenCombo) -> int:
+        return self.COMBOS_START + COMBO_INDICES[combo]
+
+    def give_away_id(self, value: CardValue, target_player_index: int) -> int:
+        return self.GIVE_AWAYS_START + GIVE_AWAY_VALUE_INDICES[value] * self.number_of_players + target_player_index
+
+    def joker_target_id(self, target_player_index: int) -> int:
+        return self.joker_targets_start + target_player_index
+
+    def phase_of(self, action_id: int) -> ActionPhase:
+        if not 0 <= action_id < self.size:
+            raise IndexError(f"Action id {action_id} is outside of the action space of size {self.size}")
+        if action_id < self.GIVE_AWAYS_START:
+            return ActionPhase.TURN
+        if action_id < self.joker_targets_start:
+            return ActionPhase.GIVE_AWAY
+        return ActionPhase.JOKER_TARGET
+
+    def combo(self, action_id: int) -> FrozenCombo:
+        return TABLE_COMBOS[action_id - self.COMBOS_START]
+
+    def give_away(self, action_id: int) -> tuple[CardValue, int]:
+        value_index, target_player_index = divmod(action_id - self.GIVE_AWAYS_START, self.number_of_players)
+        return GIVE_AWAY_VALUES[value_index], target_player_index
+
+    def joker_target(self, action_id: int) -> int:
+        return action_id - self.joker_targets_start
+
+    def empty_mask(self) -> np.ndarray:
+        return np.zeros(self.size, dtype=bool)
+
+    def __repr__(self) -> str:
+        return f"ActionSpace(number_of_players={self.number_of_players}, size={self.size})"
+
+
+class ActionIdController(IController):
+    """ Answers in-combo decisions with action ids from chooser. While chooser runs, the board's
+        legal_action_mask covers the decision being asked for (give-away or joker target)."""
+
+    def __init__(self, chooser: ActionChooser):
+        self.__chooser = chooser
+
+    def get_response(self, prompts: list[Any], output_checks: list[Any]) -> list[Any]:
+        raise NotImplementedError("Action id decisions never prompt!")
+
+    def card_giveaway(self, board: IBoard, prompt_manager: Any = None) -> tuple[int, int]:
+        action_id = self.__choose(board, ActionPhase.GIVE_AWAY)
+        value, target_player_index = ActionSpace.cached(len(board.players)).give_away(action_id)
+        playable_cards = board.current_player.playable_cards
+        card_index = next(i for i, card in enumerate(playable_cards) if card.value == value)
+        return card_index, target_player_index
+
+    def joker_target_index(self, board: IBoard, prompt_manager: Any = None) -> int:
+        action_id = self.__choose(board, ActionPhase.JOKER_TARGET)
+        return ActionSpace.cached(len(board.players)).joker_target(action_id)
+
+    def __choose(self, board: IBoard, phase: ActionPhase) -> int:
+        board.set_action_phase(phase)
+        try:
+            action_id = self.__chooser(board)
+        finally:
+            board.set_action_phase(ActionPhase.TURN)
+        if not board.legal_action_mask(phase)[action_id]:
+            raise ValueError(f"Action id {action_id} is not a legal {phase.name.lower()} action")
+        return action_id
@@ -0,0 +1,399 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+
+from src.board import Board
+from src.board_actions import PlayCardsCombo, combo_card_indices
+from src.board_interface import BoardPlayOrder, BoardTurnOrder
+from src.board_seeds import BoardFactory
+from src.card_combos import CardComboFactory, Combo_3
+from src.card_pile import CardPile, DequeCardPile, PlayCardPile
+from src.cards import CARD_TABLE, Card, Cards, CardValue, NUMBER_OF_CARD_VALUES, NUMBER_OF_SUITS
+from src.controller_interface import IController
+from src.hand import Hand
+from src.karma import KarmaFaceUp, KarmaFaceDown
+from src.legal_combo_table import TABLE_COMBOS
+from src.player import Player
+from src.policies import RandomPolicy
+from src.simulator import PolicyController
+
+PICKUP = -1  # Action value for picking up the play pile, every other action is an index into TABLE_COMBOS
+
+HAND, KARMA_FACE_UP, KARMA_FACE_DOWN = 0, 1, 2  # Order in which a player's cards become playable
+MAX_PILE_SIZE = NUMBER_OF_CARD_VALUES * NUMBER_OF_SUITS
+PILE_WIDTH = MAX_PILE_SIZE + 1  # The last column is scratch space for masked scatters
+
+TWO, THREE, FOUR, SIX, SEVEN, EIGHT, NINE, TEN, ACE, JOKER = (value - 2 for value in (
+    CardValue.TWO, CardValue.THREE, CardValue.FOUR, CardValue.SIX, CardValue.SEVEN, CardValue.EIGHT, CardValue.NINE,
+    CardValue.TEN, CardValue.ACE, CardValue.JOKER))
+SLOT_VALUES = np.arange(NUMBER_OF_CARD_VALUES) + 2
+ALWAYS_PLAYABLE_SLOTS = np.isin(np.arange(NUMBER_OF_CARD_VALUES), (TWO, FOUR, SIX))
+SIMPLE_SLOTS = np.isin(np.arange(NUMBER_OF_CARD_VALUES), (TWO, THREE, FOUR, SIX, SEVEN, EIGHT, NINE, TEN))
+MINIMUM_TO_FILLER = 3
+HAND_SIZE = 3
+
+
+def _combo_arrays() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ (major slot, number of major cards, number of sixes on top) for every combo in TABLE_COMBOS."""
+    majors, counts, fillers = [], [], []
+    for combo in TABLE_COMBOS:
+        items = dict(combo.items())
+        filler_count = items.pop(CardValue.SIX) if len(items) == 2 else 0
+        (major, count), = items.items()
+        majors.append(major - 2)
+        counts.append(count)
+        fillers.append(filler_count)
+    return np.array(majors), np.array(counts), np.array(fillers)
+
+
+COMBO_MAJORS, COMBO_COUNTS, COMBO_FILLERS = _combo_arrays()
+COMBO_SIZES = COMBO_COUNTS + COMBO_FILLERS
+COMBO_IS_SINGLE = (COMBO_COUNTS == 1) & (COMBO_FILLERS == 0)
+COMBO_IS_PURE_FILLER = COMBO_MAJORS == SIX
+
+
+class BatchBoard:
+    """ batch_size independent games held as arrays, so thousands can be stepped together.
+
+        Cards are kept as values only: per player value counts for the hand and both karmas, and bottom-first
+        value arrays for the piles. Every container is treated as sorted, so a combo goes onto the play pile in
+        ascending value order, the same as from a sorted Hand.
+
+        Legal combo masks, pickups and the combos of 2, 3, 4, 6, 7, 8, 9 and 10 (with their burns) are vectorized.
+        Everything else (5, jack, queen, king, ace, joker, or a play pile holding a joker) is played on a
+        scalar Board built from that game, asking fallback_controller for any choices, then read back."""
+
+    def __init__(self, batch_size: int, number_of_players: int, fallback_controller: IController | None = None):
+        self.batch_size = batch_size
+        self.number_of_players = number_of_players
+        self.fallback_controller = fallback_controller
+        if fallback_controller is None:
+            self.fallback_controller = PolicyController([RandomPolicy() for _ in range(number_of_players)])
+
+        self.held = np.zeros((batch_size, number_of_players, 3, NUMBER_OF_CARD_VALUES), dtype=np.int16)
+        self.draw_values = np.zeros((batch_size, PILE_WIDTH), dtype=np.int8)
+        self.draw_lengths = np.zeros(batch_size, dtype=np.int64)
+        self.play_values = np.zeros((batch_size, PILE_WIDTH), dtype=np.int8)
+        self.play_visibles = np.zeros((batch_size, PILE_WIDTH), dtype=bool)
+        self.play_lengths = np.zeros(batch_size, dtype=np.int64)
+        self.burn_values = np.zeros((batch_size, PILE_WIDTH), dtype=np.int8)
+        self.burn_lengths = np.zeros(batch_size, dtype=np.int64)
+
+        self.top_run_values = np.full(batch_size, -1, dtype=np.int8)
+        self.top_run_lengths = np.zeros(batch_size, dtype=np.int64)
+        self.longest_runs = np.zeros(batch_size, dtype=np.int64)
+
+        self.play_orders = np.full(batch_size, BoardPlayOrder.UP.value, dtype=np.int8)
+        self.turn_orders = np.full(batch_size, BoardTurnOrder.RIGHT.value, dtype=np.int8)
+        self.flipped = np.zeros(batch_size, dtype=bool)
+        self.multiplier_exponents = np.zeros(batch_size, dtype=np.int64)  # The multiplier is always a power of 2
+        self.player_indices = np.zeros(batch_size, dtype=np.int64)
+        self.starting_player_indices = np.zeros(batch_size, dtype=np.int64)
+        self.has_burned = np.zeros(batch_size, dtype=bool)
+        self.turns_played = np.zeros(batch_size, dtype=np.int64)
+        self.last_majors = np.full(batch_size, -1, dtype=np.int8)
+
+    @classmethod
+    def from_boards(cls, boards: Iterable[Board], fallback_controller: IController | None = None) -> BatchBoard:
+        boards = list(boards)
+        batch = cls(len(boards), len(boards[0].players), fallback_controller=fallback_controller)
+        for i, board in enumerate(boards):
+            batch.load_board(i, board)
+        return batch
+
+    @classmethod
+    def random_start(cls, batch_size: int, number_of_players: int = 4, number_of_jokers: int = 1,
+                     fallback_controller: IController | None = None) -> BatchBoard:
+        factory = BoardFactory(Board)
+        return cls.from_boards((factory.random_start(number_of_players, number_of_jokers=number_of_jokers)
+                                for _ in range(batch_size)), fallback_controller=fallback_controller)
+
+    @property
+    def effect_multipliers(self) -> np.ndarray:
+        return np.left_shift(1, self.multiplier_exponents)
+
+    @property
+    def player_card_counts(self) -> np.ndarray:
+        """ [batch, player] number of cards held."""
+        return self.held.sum(axis=(2, 3))
+
+    @property
+    def potential_winners(self) -> np.ndarray:
+        return self.player_card_counts == 0
+
+    @property
+    def jokers_in_play(self) -> np.ndarray:
+        in_draw_piles = ((self.draw_values == JOKER) & self.__within(self.draw_lengths)).sum(axis=1)
+        return in_draw_piles + self.held[:, :, :, JOKER].sum(axis=(1, 2))
+
+    def playable_sources(self) -> np.ndarray:
+        """ Which of HAND, KARMA_FACE_UP and KARMA_FACE_DOWN each current player plays from."""
+        current = self.held[np.arange(self.batch_size), self.player_indices]
+        return np.argmax(current.sum(axis=2) > 0, axis=1)
+
+    def playable_counts(self) -> np.ndarray:
+        batch = np.arange(self.batch_size)
+        return self.held[batch, self.player_indices, self.playable_sources()]
+
+    def top_visible_slots(self) -> np.ndarray:
+        """ Slot (value - 2) of each play pile's top visible card, -1 when there is none."""
+        visibles = self.play_visibles & self.__within(self.play_lengths)
+        last_visible = PILE_WIDTH - 1 - np.argmax(visibles[:, ::-1], axis=1)
+        top_slots = self.play_values[np.arange(self.batch_size), last_visible]
+        return np.where(visibles.any(axis=1), top_slots, -1)
+
+    def legal_combo_masks(self) -> np.ndarray:
+        """ [batch, len(TABLE_COMBOS)] bool, the same combos as Board.legal_combos_from_cards."""
+        counts = self.playable_counts().astype(np.int64)
+        top_slots = self.top_visible_slots()
+        has_top = top_slots >= 0
+        top_values = top_slots + 2
+
+        is_up = self.play_orders == BoardPlayOrder.UP.value
+        beats_top = np.where(is_up[:, None], SLOT_VALUES >= top_values[:, None], SLOT_VALUES <= top_values[:, None])
+        playable = ~has_top[:, None] | ALWAYS_PLAYABLE_SLOTS | beats_top
+        playable_counts = counts * playable
+        allowed = np.ones_like(playable)
+        allowed[:, JOKER] = has_top & (top_slots == ACE)
+        exclusively_filler = ~((counts[:, SIX] > 0) & has_top & ~beats_top[:, SIX])
+        total = playable_counts.sum(axis=1)
+
+        major_counts = playable_counts[:, COMBO_MAJORS]
+        filler_counts = playable_counts[:, SIX][:, None]
+        enough_fillers = (COMBO_FILLERS == 0) | ((COMBO_COUNTS >= MINIMUM_TO_FILLER) & (filler_counts >= COMBO_FILLERS))
+        masks = (major_counts >= COMBO_COUNTS) & allowed[:, COMBO_MAJORS] & enough_fillers
+        pure_filler_allowed = exclusively_filler[:, None] | (total == 1)[:, None]
+        masks &= ~COMBO_IS_PURE_FILLER | pure_filler_allowed
+
+        flipped_masks = COMBO_IS_SINGLE & (counts[:, COMBO_MAJORS] > 0)
+        return np.where(self.flipped[:, None], flipped_masks, masks)
+
+    def can_pickup(self) -> np.ndarray:
+        return (self.player_card_counts[np.arange(self.batch_size), self.player_indices] > 0) & (self.play_lengths > 0)
+
+    def start_turn(self) -> None:
+        self.starting_player_indices[:] = self.player_indices
+        self.has_burned[:] = False
+        return None
+
+    def apply(self, actions: np.ndarray) -> None:
+        """ One legal action per game: PICKUP or an index into TABLE_COMBOS."""
+        actions = np.asarray(actions)
+        is_pickup = actions == PICKUP
+        majors = COMBO_MAJORS[np.where(is_pickup, 0, actions)]
+        play_pile_has_joker = ((self.play_values == JOKER) & self.__within(self.play_lengths)).any(axis=1)
+        needs_board = ~is_pickup & (~SIMPLE_SLOTS[majors] | play_pile_has_joker)
+
+        self.__pickup(np.flatnonzero(is_pickup))
+        self.__play_simple(np.flatnonzero(~is_pickup & ~needs_board), actions)
+        for i in np.flatnonzero(needs_board):
+            self.__play_on_board(int(i), int(actions[i]))
+        return None
+
+    def end_turn(self) -> None:
+        self.turns_played += 1
+        self.player_indices = (self.player_indices + self.turn_orders) % self.number_of_players
+        batch = np.arange(self.batch_size)
+        starter_has_cards = self.player_card_counts[batch, self.starting_player_indices] > 0
+        self.player_indices = np.where(self.has_burned & starter_has_cards, self.starting_player_indices,
+                                       self.player_indices)
+        return None
+
+    def to_board(self, i: int) -> Board:
+        players = [Player(Hand(self.__cards_from_counts(hand)),
+                          KarmaFaceUp(self.__cards_from_counts(karma_face_up)),
+                          KarmaFaceDown(self.__cards_from_counts(karma_face_down)))
+                   for hand, karma_face_up, karma_face_down in self.held[i].tolist()]
+        play_pile = PlayCardPile.empty()
+        play_length = self.play_lengths[i]
+        play_pile.add_cards(self.__cards_from_slots(self.play_values[i, :play_length]),
+                            are_visibles=[int(visible) for visible in self.play_visibles[i, :play_length]])
+        board = Board(players,
+                      draw_pile=CardPile(self.__cards_from_slots(self.draw_values[i, :self.draw_lengths[i]])),
+                      burn_pile=DequeCardPile(self.__cards_from_slots(self.burn_values[i, :self.burn_lengths[i]])),
+                      play_pile=play_pile,
+                      play_order=BoardPlayOrder(int(self.play_orders[i])),
+                      turn_order=BoardTurnOrder(int(self.turn_orders[i])),
+                      cards_are_flipped=bool(self.flipped[i]),
+                      effect_multiplier=1 << int(self.multiplier_exponents[i]),
+                      who_starts=int(self.player_indices[i]),
+                      turns_played=int(self.turns_played[i]))
+        board.player_index_who_started_turn = int(self.starting_player_indices[i])
+        if self.last_majors[i] == THREE:
+            board.combo_history.append(Combo_3(Cards(), {}))  # Jack only keeps a multiplier that a three set
+        return board
+
+    def load_board(self, i: int, board: Board) -> None:
+        for p, player in enumerate(board.players):
+            for source, cards in enumerate((player.hand, player.karma_face_up, player.karma_face_down)):
+                self.held[i, p, source] = cards.value_counts
+        self.draw_lengths[i] = self.__set_slots(self.draw_values[i], board.draw_pile)
+        self.burn_lengths[i] = self.__set_slots(self.burn_values[i], board.burn_pile)
+        self.play_lengths[i] = self.__set_slots(self.play_values[i], board.play_pile)
+        self.play_visibles[i] = False
+        self.play_visibles[i, :len(board.play_pile)] = [bool(visible) for visible in board.play_pile.visibles]
+
+        top_run = board.play_pile.top_run
+        self.top_run_values[i] = -1 if top_run is None else top_run[0] - 2
+        self.top_run_lengths[i] = 0 if top_run is None else top_run[1]
+        self.longest_runs[i] = board.play_pile.longest_run
+
+        self.play_orders[i] = board.play_order.value
+        self.turn_orders[i] = board.turn_order.value
+        self.flipped[i] = board.cards_are_flipped
+        self.multiplier_exponents[i] = board.effect_multiplier.bit_length() - 1
+        self.player_indices[i] = board.player_index
+        self.starting_player_indices[i] = board.player_index_who_started_turn
+        self.has_burned[i] = board.has_burned_this_turn
+        self.turns_played[i] = board.turns_played
+        if board.combo_history:
+            combo_class = board.combo_history[-1].__class__
+            self.last_majors[i] = next(value - 2 for value, value_combo_class in CardComboFactory.combo_maps.items()
+                                       if value_combo_class is combo_class)
+        return None
+
+    def __play_simple(self, b: np.ndarray, actions: np.ndarray) -> None:
+        if b.size == 0:
+            return None
+        combo_indices = actions[b]
+        majors = COMBO_MAJORS[combo_indices]
+        counts = COMBO_COUNTS[combo_indices]
+        fillers = COMBO_FILLERS[combo_indices]
+        sizes = COMBO_SIZES[combo_indices]
+        p = self.player_indices[b]
+        sources = self.playable_sources()[b]
+
+        self.held[b, p, sources, majors] -= counts
+        self.held[b, p, sources, SIX] -= fillers
+
+        major_first = majors < SIX
+        first_counts = np.where(major_first, counts, fillers)
+        positions = np.arange(COMBO_SIZES.max())[None, :]
+        pushed = np.where(positions < first_counts[:, None], np.where(major_first, majors, SIX)[:, None],
+                          np.where(major_first, SIX, majors)[:, None])
+        self.__push_play_cards(b, pushed, sizes, majors != FOUR)
+        will_burn_due_to_four_in_a_row = self.longest_runs[b] >= 4
+        self.__draw_until_full(b, p)
+
+        exponents = self.multiplier_exponents[b]
+        is_odd_multiplier = exponents == 0
+        self.play_orders[b[majors == TWO]] = BoardPlayOrder.UP.value
+        flips_play_order = b[(majors == SEVEN) & is_odd_multiplier]
+        self.play_orders[flips_play_order] = 1 - self.play_orders[flips_play_order]
+        flips_turn_order = b[(majors == EIGHT) & is_odd_multiplier]
+        self.turn_orders[flips_turn_order] = -self.turn_orders[flips_turn_order]
+        skips = (majors == NINE) & ~will_burn_due_to_four_in_a_row
+        steps = sizes[skips] * self.__powers_of_two_mod_players(exponents[skips])
+        self.player_indices[b[skips]] = (p[skips] + self.turn_orders[b[skips]] * steps) % self.number_of_players
+        self.__burn(b[majors == TEN])
+
+        self.multiplier_exponents[b] = np.where(majors == THREE, exponents + sizes, 0)
+        self.last_majors[b] = majors
+        self.__burn(b[will_burn_due_to_four_in_a_row])
+        return None
+
+    def __push_play_cards(self, b: np.ndarray, pushed: np.ndarray, sizes: np.ndarray, visible: np.ndarray) -> None:
+        for j in range(pushed.shape[1]):
+            active = j < sizes
+            bj = b[active]
+            slots = pushed[active, j]
+            positions = self.play_lengths[bj]
+            self.play_values[bj, positions] = slots
+            self.play_visibles[bj, positions] = visible[active]
+            self.play_lengths[bj] += 1
+            continues_run = self.top_run_values[bj] == slots
+            self.top_run_lengths[bj] = np.where(continues_run, self.top_run_lengths[bj] + 1, 1)
+            self.top_run_values[bj] = slots
+            self.longest_runs[bj] = np.maximum(self.longest_runs[bj], self.top_run_lengths[bj])
+        return None
+
+    def __draw_until_full(self, b: np.ndarray, p: np.ndarray) -> None:
+        hand_sizes = self.held[b, p, HAND].sum(axis=1)
+        number_to_draw = np.minimum(np.maximum(HAND_SIZE - hand_sizes, 0), self.draw_lengths[b])
+        for j in range(HAND_SIZE):
+            active = j < number_to_draw
+            bj, pj = b[active], p[active]
+            self.draw_lengths[bj] -= 1
+            self.held[bj, pj, HAND, self.draw_values[bj, self.draw_lengths[bj]]] += 1
+        return None
+
+    def __burn(self, b: np.ndarray) -> None:
+        """ Board.burn(joker_count=0) for every game in b."""
+        self.multiplier_exponents[b] = 0
+        b = b[self.play_lengths[b] > 0]
+        if b.size == 0:
+            return None
+        self.has_burned[b] = True
+        positions = np.arange(PILE_WIDTH)[None, :]
+        destinations = np.where(positions < self.play_lengths[b][:, None],
+                                self.burn_lengths[b][:, None] + positions, PILE_WIDTH - 1)
+        burn_values = self.burn_values[b]
+        np.put_along_axis(burn_values, destinations, self.play_values[b], axis=1)
+        self.burn_values[b] = burn_values
+        self.burn_lengths[b] += self.play_lengths[b]
+        self.__clear_play_piles(b)
+        return None
+
+    def __pickup(self, b: np.ndarray) -> None:
+        if b.size == 0:
+            return None
+        within = self.__within(self.play_lengths[b])
+        one_hot = (self.play_values[b][:, :, None] == np.arange(NUMBER_OF_CARD_VALUES)) & within[:, :, None]
+        self.held[b, self.player_indices[b], HAND] += one_hot.sum(axis=1).astype(np.int16)
+        self.multiplier_exponents[b] = 0
+        self.__clear_play_piles(b)
+        return None
+
+    def __clear_play_piles(self, b: np.ndarray) -> None:
+        self.play_lengths[b] = 0
+        self.play_visibles[b] = False
+        self.top_run_values[b] = -1
+        self.top_run_lengths[b] = 0
+        self.longest_runs[b] = 0
+        return None
+
+    def __play_on_board(self, i: int, combo_index: int) -> None:
+        board = self.to_board(i)
+        board.start_turn()
+        playable_cards = board.current_player.playable_cards
+        cards = playable_cards.get(combo_card_indices(playable_cards, TABLE_COMBOS[combo_index]))
+        PlayCardsCombo(lambda: cards)(board, controller=self.fallback_controller)
+        has_burned = self.has_burned[i] or board.has_burned_this_turn
+        self.load_board(i, board)
+        self.has_burned[i] = has_burned
+        return None
+
+    def __powers_of_two_mod_players(self, exponents: np.ndarray) -> np.ndarray:
+        result = np.ones_like(exponents)
+        base = np.full_like(exponents, 2 % self.number_of_players)
+        remaining = exponents.copy()
+        while remaining.any():
+            result = np.where(remaining & 1, result * base % self.number_of_players, result)
+            base = base * base % self.number_of_players
+            remaining >>= 1
+        return result
+
+    def __within(self, lengths: np.ndarray) -> np.ndarray:
+        return np.arange(PILE_WIDTH)[None, :] < lengths[:, None]
+
+    @staticmethod
+    def __cards_from_counts(counts: list[int]) -> Cards:
+        return Cards(CARD_TABLE[slot * NUMBER_OF_SUITS + copy % NUMBER_OF_SUITS]
+                     for slot, count in enumerate(counts) for copy in range(count))
+
+    @staticmethod
+    def __cards_from_slots(slots: np.ndarray) -> Cards:
+        copies = [0 for _ in range(NUMBER_OF_CARD_VALUES)]
+        cards = Cards()
+        for slot in slots.tolist():
+            cards.append(CARD_TABLE[slot * NUMBER_OF_SUITS + copies[slot] % NUMBER_OF_SUITS])
+            copies[slot] += 1
+        return cards
+
+    @staticmethod
+    def __set_slots(row: np.ndarray, cards: Iterable[Card]) -> int:
+        slots = [card.value - 2 for card in cards]
+        row[:len(slots)] = slots
+        return len(slots)
@@ -0,0 +1,118 @@
+import unittest
+
+import random
+
+import numpy as np
+
+from src.batch_board import BatchBoard, PICKUP, COMBO_MAJORS, SIMPLE_SLOTS
+from src.board import Board
+from src.board_actions import PickUpPlayPile, PlayCardsCombo, combo_card_indices
+from src.board_seeds import BoardFactory
+from src.cards import CardValue
+from src.frozen_combo import FrozenCombo
+from src.legal_combo_table import TABLE_COMBOS, COMBO_INDICES
+from src.policies import RandomPolicy
+from src.simulator import PolicyController
+
+
+def _total_cards(batch: BatchBoard) -> np.ndarray:
+    return batch.held.sum(axis=(1, 2, 3)) + batch.draw_lengths + batch.play_lengths + batch.burn_lengths
+
+
+def _simple_actions(batch: BatchBoard, generator: np.random.Generator) -> np.ndarray:
+    masks = batch.legal_combo_masks() & SIMPLE_SLOTS[COMBO_MAJORS]
+    can_pickup = batch.can_pickup()
+    actions = np.full(batch.batch_size, PICKUP)
+    for i in range(batch.batch_size):
+        options = list(np.flatnonzero(masks[i])) + ([PICKUP] if can_pickup[i] else [])
+        if options:
+            actions[i] = generator.choice(options)
+    return actions
+
+
+class TestBatchBoard(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.generator = np.random.default_rng(0)
+
+    def test_round_trip(self):
+        batch = BatchBoard.random_start(20, 4)
+        copy = BatchBoard.from_boards(batch.to_board(i) for i in range(batch.batch_size))
+        for name in ("held", "draw_values", "draw_lengths", "play_lengths", "player_indices", "play_orders"):
+            self.assertTrue(np.array_equal(getattr(batch, name), getattr(copy, name)), name)
+
+    def test_legal_combo_masks_match_board(self):
+        batch = BatchBoard.random_start(50, 4)
+        for _ in range(30):
+            batch.start_turn()
+            masks = batch.legal_combo_masks()
+            for i in range(batch.batch_size):
+                board = batch.to_board(i)
+                board.start_turn()
+                expected = {COMBO_INDICES[combo] for combo in board.current_legal_combos}
+                self.assertEqual(set(np.flatnonzero(masks[i])), expected)
+            batch.apply(_simple_actions(batch, self.generator))
+            batch.end_turn()
+
+    def test_flipped_masks_are_single_cards(self):
+        board = BoardFactory(Board).matrix_start([[[2, 2, 7], [], []], [[3], [], []]], [], cards_are_flipped=True)
+        masks = BatchBoard.from_boards([board]).legal_combo_masks()
+        self.assertEqual({TABLE_COMBOS[i] for i in np.flatnonzero(masks[0])}, board.legal_combos_from_cards(
+            board.current_player.playable_cards))
+
+    def test_simple_steps_match_board(self):
+        batch = BatchBoard.random_start(50, 4)
+        controller = PolicyController([RandomPolicy() for _ in range(4)])
+        for _ in range(40):
+            boards = [batch.to_board(i) for i in range(batch.batch_size)]
+            batch.start_turn()
+            actions = _simple_actions(batch, self.generator)
+            for board, action in zip(boards, actions):
+                board.start_turn()
+                if action == PICKUP:
+                    if PickUpPlayPile in board.current_legal_actions:
+                        PickUpPlayPile()(board)
+                else:
+                    playable_cards = board.current_player.playable_cards
+                    cards = playable_cards.get(combo_card_indices(playable_cards, TABLE_COMBOS[action]))
+                    PlayCardsCombo(lambda: cards)(board, controller=controller)
+                board.end_turn()
+                board.step_player_index(1)
+                if board.has_burned_this_turn and board.get_player(board.player_index_who_started_turn).has_cards:
+                    board.set_player_index(board.player_index_who_started_turn)
+            batch.apply(actions)
+            batch.end_turn()
+
+            expected = BatchBoard.from_boards(boards)
+            for name in ("held", "draw_lengths", "play_lengths", "burn_lengths", "play_orders", "turn_orders",
+                         "multiplier_exponents", "player_indices", "has_burned", "longest_runs"):
+                self.assertTrue(np.array_equal(getattr(batch, name), getattr(expected, name)), name)
+            for i in range(batch.batch_size):
+                length = batch.play_lengths[i]
+                self.assertTrue(np.array_equal(batch.play_values[i, :length], expected.play_values[i, :length]))
+                self.assertTrue(np.array_equal(batch.play_visibles[i, :length],
+                                               expected.play_visibles[i, :length]))
+
+    def test_cards_are_conserved(self):
+        batch = BatchBoard.random_start(100, 4)
+        total = _total_cards(batch)
+        for _ in range(60):
+            batch.start_turn()
+            masks = batch.legal_combo_masks()
+            actions = np.where(masks.any(axis=1), np.argmax(masks, axis=1), PICKUP)
+            batch.apply(actions)
+            batch.end_turn()
+            self.assertTrue(np.array_equal(_total_cards(batch), total))
+
+    def test_ten_burns(self):
+        board = BoardFactory(Board).matrix_start([[[10, 5], [], []], [[3], [], []]], [], play_pile_values=[7, 8])
+        batch = BatchBoard.from_boards([board])
+        batch.start_turn()
+        batch.apply(np.array([COMBO_INDICES[FrozenCombo({CardValue.TEN: 1})]]))
+        self.assertEqual(batch.play_lengths[0], 0)
+        self.assertEqual(batch.burn_lengths[0], 3)
+        self.assertTrue(batch.has_burned[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+
+from src.board import Board
+from src.board_interface import BoardEvent
+from src.cards import Card, Cards, NUMBER_OF_CARD_VALUES, NUMBER_OF_SUITS
+
+
+class BeliefTracker:
+    """ Follows the public events of a board to keep, for every observer and seat, the value counts that seat's
+        hand is known to contain: picked up piles, queen give-aways, cards played out of the hand, five
+        rotations and ace flips. Whenever hands move or flip, every hand an observer can see is copied in.
+
+        known[observer_index, seat] is a lower bound of the hand, so determinize deals those cards to the
+        seat first and shuffles the rest. Determinizing only reads the tracker, so search threads can share it."""
+
+    def __init__(self, number_of_players: int):
+        self.number_of_players = number_of_players
+        self.known = np.zeros((number_of_players, number_of_players, NUMBER_OF_CARD_VALUES), dtype=np.int16)
+        self.__hand_counts = np.zeros((number_of_players, NUMBER_OF_CARD_VALUES), dtype=np.int16)
+        self.__is_own_hand = np.eye(number_of_players, dtype=bool)
+
+    @classmethod
+    def following(cls, board: Board) -> BeliefTracker:
+        tracker = cls(len(board.players))
+        tracker.follow(board)
+        return tracker
+
+    def follow(self, board: Board) -> None:
+        board.register_on_board_event(self.on_board_event)
+        self.observe(board)
+        return None
+
+    def observe(self, board: Board) -> None:
+        """ Copies in every hand each observer can see right now."""
+        for seat, player in enumerate(board.players):
+            self.__hand_counts[seat] = player.hand.value_counts
+        is_visible = self.__is_own_hand != board.cards_are_flipped
+        np.copyto(self.known, self.__hand_counts[None], where=is_visible[:, :, None])
+        return None
+
+    def on_board_event(self, board: Board, event: BoardEvent, *args) -> None:
+        self.__event_handlers[event](self, board, *args)
+        return None
+
+    def determinize(self, board: Board, observer_index: int, generator: random.Random) -> Board:
+        """ Clone of board with the cards observer_index cannot see (hidden hands, face down karma and the
+            draw pile) dealt at random, except that each hidden hand gets the cards it is known to hold."""
+        clone = board.clone()
+        cards_are_flipped = clone.cards_are_flipped
+        hidden_seats = [seat for seat in range(len(clone.players)) if (seat == observer_index) == cards_are_flipped]
+        hidden_hands = [clone.players[seat].hand for seat in hidden_seats]
+        hidden_containers = hidden_hands + [player.karma_face_down for player in clone.players] + [clone.draw_pile]
+
+        hidden_cards = [card for container in hidden_containers for card in container]
+        generator.shuffle(hidden_cards)
+        wanted = self.known[observer_index, hidden_seats].tolist()
+        dealt = [[] for _ in hidden_seats]
+        rest = []
+        for card in hidden_cards:
+            slot = card.id // NUMBER_OF_SUITS
+            for hand_cards, hand_wanted in zip(dealt, wanted):
+                if hand_wanted[slot]:
+                    hand_wanted[slot] -= 1
+                    hand_cards.append(card)
+                    break
+            else:
+                rest.append(card)
+
+        start = 0
+        for hand, hand_cards in zip(hidden_hands, dealt):
+            end = start + len(hand) - len(hand_cards)
+            hand_cards.extend(rest[start:end])
+            start = end
+            if cards_are_flipped:
+                generator.shuffle(hand_cards)
+            hand.restore_state(tuple(hand_cards))
+            if not cards_are_flipped:
+                hand.sort()
+        for container in hidden_containers[len(hidden_hands):]:
+            end = start + len(container)
+            container.restore_state(tuple(rest[start:end]))
+            start = end
+        return clone
+
+    def __on_pickup(self, board: Board, player_index: int, pile: Cards) -> None:
+        self.known[:, player_index] += pile.value_counts
+        return None
+
+    def __on_hand_cards_played(self, board: Board, player_index: int, cards: Cards) -> None:
+        known = self.known[:, player_index]
+        np.maximum(known - cards.value_counts, 0, out=known, casting="unsafe")
+        return None
+
+    def __on_card_given_away(self, board: Board, giver_index: int, receiver_index: int, card: Card,
+                             is_from_hand: bool) -> None:
+        slot = card.id // NUMBER_OF_SUITS
+        if is_from_hand:
+            known = self.known[:, giver_index, slot]
+            np.maximum(known - 1, 0, out=known, casting="unsafe")
+        self.known[:, receiver_index, slot] += 1
+        return None
+
+    def __on_hands_rotated(self, board: Board, steps: int) -> None:
+        self.observe(board)
+        self.known[:] = np.roll(self.known, steps % self.number_of_players, axis=1)
+        return None
+
+    def __on_hands_flipped(self, board: Board) -> None:
+        self.observe(board)
+        return None
+
+    __event_handlers = {BoardEvent.PICKUP: __on_pickup,
+                        BoardEvent.HAND_CARDS_PLAYED: __on_hand_cards_played,
+                        BoardEvent.CARD_GIVEN_AWAY: __on_card_given_away,
+                        BoardEvent.HANDS_ROTATED: __on_hands_rotated,
+                        BoardEvent.HANDS_FLIPPED: __on_hands_flipped}
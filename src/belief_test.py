@@ -0,0 +1,107 @@
+import random
+import unittest
+
+from collections import Counter
+
+import numpy as np
+
+from src.action_space import ActionIdController
+from src.belief import BeliefTracker
+from src.board import Board
+from src.board_seeds import BoardFactory
+from src.cards import CardValue, NUMBER_OF_CARD_VALUES
+from src.frozen_combo import FrozenCombo
+from src.policies import RandomPolicy
+from src.simulator import Simulator
+
+
+class TestBeliefTracker(unittest.TestCase):
+    def test_pickup_is_known(self):
+        board = BoardFactory(Board).matrix_start([[[3], [], []], [[7, 8], [], []], [[4, 6], [], []]], [2, 2, 5],
+                                                 play_pile_values=[9, 9, 13])
+        tracker = BeliefTracker.following(board)
+        board.start_turn()
+        board.apply_action_id(board.action_space.PICKUP)
+        self.assertEqual(tracker.known[1, 0].tolist(), _counts([9, 9, 13]))
+        for _ in range(20):
+            determinization = tracker.determinize(board, 1, random.Random(_))
+            self.assertTrue(_contains(determinization.players[0].hand, [9, 9, 13]))
+
+    def test_given_away_card_is_known(self):
+        board = BoardFactory(Board).matrix_start([[[12, 9, 3], [], []], [[7, 8], [], []], [[4, 6], [], []]], [])
+        tracker = BeliefTracker.following(board)
+        board.start_turn()
+        give_nine = ActionIdController(lambda b: b.action_space.give_away_id(CardValue.NINE, 1))
+        board.apply_action_id(board.action_space.combo_id(FrozenCombo({CardValue.QUEEN: 1})), controller=give_nine)
+        self.assertEqual(tracker.known[2, 1].tolist(), _counts([9]))
+        self.assertEqual(tracker.known[0, 1].tolist(), _counts([9]))
+
+    def test_rotation_moves_beliefs(self):
+        board = BoardFactory(Board).matrix_start([[[3], [], []], [[5, 8], [], []], [[4, 6], [], []]], [],
+                                                 play_pile_values=[9, 13])
+        tracker = BeliefTracker.following(board)
+        board.start_turn()
+        board.apply_action_id(board.action_space.PICKUP)
+        board.end_turn()
+        board.set_player_index(1)
+        board.start_turn()
+        board.apply_action_id(board.action_space.combo_id(FrozenCombo({CardValue.FIVE: 1})))
+        self.assertEqual(board.players[1].hand.values, (CardValue.THREE, CardValue.NINE, CardValue.KING))
+        self.assertEqual(tracker.known[2, 1].tolist(), _counts([9, 13]))
+        self.assertEqual(tracker.known[0, 1].tolist(), _counts([3, 9, 13]))
+        self.assertEqual(tracker.known[1, 2].tolist(), _counts([8]))
+        self.assertEqual(tracker.known[0, 2].tolist(), _counts([]))
+
+    def test_flip_remembers_own_hand(self):
+        board = BoardFactory(Board).matrix_start([[[14, 7, 9], [], []], [[5, 8], [], []], [[4, 6], [], []]], [])
+        tracker = BeliefTracker.following(board)
+        board.start_turn()
+        board.apply_action_id(board.action_space.combo_id(FrozenCombo({CardValue.ACE: 1})))
+        self.assertTrue(board.cards_are_flipped)
+        determinization = tracker.determinize(board, 0, random.Random(0))
+        self.assertEqual(Counter(determinization.players[0].hand.values), Counter([CardValue.SEVEN, CardValue.NINE]))
+        self.assertEqual(determinization.players[1].hand, board.players[1].hand)
+
+    def test_beliefs_stay_consistent(self):
+        generator = random.Random(0)
+        for seed in range(15):
+            random.seed(seed)
+            board = BoardFactory(Board).random_start(number_of_players=4)
+            tracker = BeliefTracker.following(board)
+            simulator = Simulator([RandomPolicy(pickup_probability=0.05) for _ in range(4)])
+            for turn in range(60):
+                simulator.play_turn(board)
+                board.end_turn()
+                board.step_player_index(1)
+                hand_counts = np.array([player.hand.value_counts for player in board.players])
+                self.assertTrue((tracker.known <= hand_counts[None]).all())
+
+                observer_index = turn % 4
+                determinization = tracker.determinize(board, observer_index, generator)
+                self.assertEqual(_all_cards(determinization), _all_cards(board))
+                for player, known in zip(determinization.players, tracker.known[observer_index]):
+                    self.assertTrue((np.array(player.hand.value_counts) >= known).all())
+                if board.potential_winner_indices:
+                    break
+
+
+def _counts(values: list[int]) -> list[int]:
+    counts = [0 for _ in range(NUMBER_OF_CARD_VALUES)]
+    for value in values:
+        counts[value - 2] += 1
+    return counts
+
+
+def _contains(cards, values: list[int]) -> bool:
+    return not Counter(values) - Counter(card.value.value for card in cards)
+
+
+def _all_cards(board: Board) -> Counter:
+    cards = Counter(board.draw_pile) + Counter(board.play_pile) + Counter(board.burn_pile)
+    for player in board.players:
+        cards += Counter(player.hand) + Counter(player.karma_face_up) + Counter(player.karma_face_down)
+    return cards
+
+
+if __name__ == '__main__':
+    unittest.main()
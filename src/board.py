@@ -4,20 +4,45 @@ from typing import Iterable, Deque, Callable
 
 from collections import deque
 
-from src.utils.multiset import FrozenMultiset
-from src.card_combo_permuations import (equal_subsequence_permutations_filler,
-                                        equal_subsequence_permutations_filler_and_filter,
-                                        equal_subsequence_permutations_filler_not_exclusively_filler,
-                                        equal_subsequence_permutations_filler_filter_not_exclusively_filler)
+import numpy as np
+
+from src.action_space import ActionPhase, ActionSpace
+from src.frozen_combo import FrozenCombo
+from src.utils.lru_cache import LRUCache
+from src.card_combo_permuations import CARD_VALUES, legal_combos_from_counts
+from src.legal_combo_table import LegalComboTable
 from src.cards import Cards, Card, CardValue
 from src.player import Player
-from src.card_pile import CardPile, PlayCardPile
+from src.card_pile import CardPile, DequeCardPile, PlayCardPile
 from src.card_combos import CardComboFactory, CardCombo, Combo_3, Combo_4, Combo_Jack
-from src.board_interface import BoardPlayOrder, BoardTurnOrder, IBoard, IBoardPrinter, IAction
-from src.board_actions import PickUpPlayPile, PlayCardsCombo
+from src.board_interface import BoardEvent, BoardPlayOrder, BoardTurnOrder, IBoard, IBoardPrinter, IAction
+from src.board_actions import PickUpPlayPile, PlayCardsCombo, combo_card_indices
 from src.controller_interface import IController
+from src.utils.zobrist import zobrist_keys, mix
 
 type OnEndTurnEvent = Callable[[Board], None]
+type OnBoardEvent = Callable[..., None]  # (board, event, *event_args)
+
+MAX_PLAYERS = 8
+SEAT_SALTS = zobrist_keys("seats", MAX_PLAYERS, 3)  # Hand, face up karma, face down karma of each seat
+PILE_SALTS = zobrist_keys("piles", 3)  # Draw, play and burn pile
+SCALAR_SALTS = zobrist_keys("scalars", 3)  # Player index, log2 of the effect multiplier, jokers in play
+PLAY_ORDER_DOWN_KEY, TURN_ORDER_LEFT_KEY, CARDS_ARE_FLIPPED_KEY = zobrist_keys("flags", 3)
+
+
+class BoardSnapshot:
+    """ Immutable copy of the mutable game state of a Board. Cards are shared, never copied."""
+
+    def __init__(self, players: tuple, draw_pile: tuple, burn_pile: tuple, play_pile: tuple, scalars: tuple,
+                 combo_history: tuple, legal_combos: frozenset, legal_actions: set):
+        self.players = players
+        self.draw_pile = draw_pile
+        self.burn_pile = burn_pile
+        self.play_pile = play_pile
+        self.scalars = scalars
+        self.combo_history = combo_history
+        self.legal_combos = legal_combos
+        self.legal_actions = legal_actions
 
 
 class Board(IBoard):
@@ -27,18 +52,23 @@ class Board(IBoard):
     __always_legal_cards_values = {CardValue.FOUR, CardValue.TWO}
     __filler_card_value = CardValue.SIX
 
+    legal_combos_cache = LRUCache(max_size=1 << 16)
+    legal_combo_table = LegalComboTable.open_if_built()
+
     def __init__(self, players: Iterable[Player], draw_pile: CardPile | None = None,
-                 burn_pile: CardPile | None = None, play_pile: PlayCardPile | None = None,
+                 burn_pile: CardPile | DequeCardPile | None = None, play_pile: PlayCardPile | None = None,
                  play_order: BoardPlayOrder = BoardPlayOrder.UP, turn_order: BoardTurnOrder = BoardTurnOrder.RIGHT,
                  cards_are_flipped: bool = False, effect_multiplier: int = 1, who_starts: int = 0,
                  has_burned_this_turn: bool = False, turns_played: int = 0):
         self._players = deque(players)
+        if len(self._players) > MAX_PLAYERS:
+            raise ValueError(f"At most {MAX_PLAYERS} players are supported, not {len(self._players)}")
         self._draw_pile = draw_pile
         if draw_pile is None:
             self._draw_pile = CardPile.empty()
         self._burn_pile = burn_pile
         if burn_pile is None:
-            self._burn_pile = CardPile.empty()
+            self._burn_pile = DequeCardPile.empty()
         self._play_pile = play_pile
         if play_pile is None:
             self._play_pile = PlayCardPile.empty()
@@ -53,10 +83,11 @@ class Board(IBoard):
         self.player_index_who_started_turn = who_starts
 
         self.__on_end_turn_events: list[OnEndTurnEvent] = []
+        self.__on_board_events: list[OnBoardEvent] = []
         self.__card_combo_factory = CardComboFactory()
         self._has_burned_this_turn = False
 
-        self.__current_legal_combos = set()
+        self.__current_legal_combos: frozenset[FrozenCombo] = frozenset()
         self.__current_legal_actions = set()
         self.__all_actions = {PickUpPlayPile, PlayCardsCombo}
 
@@ -65,6 +96,150 @@ class Board(IBoard):
         self._combo_history = []
         self._number_of_combos_played_this_turn = 0
 
+        self.__undo_journal: list[dict] | None = None
+        self.__undo_frame_depth = 0
+        self.__action_phase = ActionPhase.TURN
+
+    def clone(self) -> Board:
+        """ Independent copy of the game state. The combo factory is shared and end turn and board events are
+            dropped."""
+        board = self.__class__.__new__(self.__class__)
+        board._players = deque(player.copy() for player in self._players)
+        board._draw_pile = self._draw_pile.copy()
+        board._burn_pile = self._burn_pile.copy()
+        board._play_pile = self._play_pile.copy()
+        board.__set_scalars(self.__scalars())
+        board._combo_history = self._combo_history.copy()
+        board.__on_end_turn_events = []
+        board.__on_board_events = []
+        board.__card_combo_factory = self.__card_combo_factory
+        board.__current_legal_combos = self.__current_legal_combos
+        board.__current_legal_actions = self.__current_legal_actions
+        board.__all_actions = self.__all_actions
+        board.__undo_journal = None
+        board.__undo_frame_depth = 0
+        board.__action_phase = ActionPhase.TURN
+        return board
+
+    def snapshot(self) -> BoardSnapshot:
+        players = tuple((player.hand.save_state(), player.karma_face_up.save_state(),
+                         player.karma_face_down.save_state()) for player in self._players)
+        return BoardSnapshot(players, self._draw_pile.save_state(), self._burn_pile.save_state(),
+                             self._play_pile.save_state(), self.__scalars(), tuple(self._combo_history),
+                             self.__current_legal_combos, self.__current_legal_actions)
+
+    def restore(self, snapshot: BoardSnapshot) -> None:
+        """ Rewinds this board (in place) to a snapshot taken from it, or from a clone of it."""
+        for player, (hand, karma_face_up, karma_face_down) in zip(self._players, snapshot.players):
+            player.hand.restore_state(hand)
+            player.karma_face_up.restore_state(karma_face_up)
+            player.karma_face_down.restore_state(karma_face_down)
+        self._draw_pile.restore_state(snapshot.draw_pile)
+        self._burn_pile.restore_state(snapshot.burn_pile)
+        self._play_pile.restore_state(snapshot.play_pile)
+        self.__set_scalars(snapshot.scalars)
+        self._combo_history[:] = snapshot.combo_history
+        self.__current_legal_combos = snapshot.legal_combos
+        self.__current_legal_actions = snapshot.legal_actions
+        return None
+
+    def enable_undo_journal(self) -> None:
+        """ From now on every mutation records how to reverse itself. Off by default, as Game never undoes."""
+        if self.__undo_journal is None:
+            self.__undo_journal = []
+            self.__undo_frame_depth = 0
+        return None
+
+    def disable_undo_journal(self) -> None:
+        self.__undo_journal = None
+        self.__undo_frame_depth = 0
+        return None
+
+    @property
+    def undo_depth(self) -> int:
+        if self.__undo_journal is None:
+            return 0
+        return len(self.__undo_journal)
+
+    def begin_undo_frame(self) -> None:
+        """ Everything recorded until the matching end_undo_frame is reversed by a single undo. Frames nest."""
+        if self.__undo_journal is None:
+            return None
+        if self.__undo_frame_depth == 0:
+            self.__undo_journal.append({})
+        self.__undo_frame_depth += 1
+        return None
+
+    def end_undo_frame(self) -> None:
+        if self.__undo_journal is None:
+            return None
+        self.__undo_frame_depth -= 1
+        return None
+
+    def record_cards(self, *cards: Cards) -> None:
+        """ Call before mutating card containers. Only the first state of each container in a frame is kept."""
+        frame = self.__current_undo_frame()
+        if frame is None:
+            return None
+        for container in cards:
+            if id(container) not in frame:
+                frame[id(container)] = (container, container.save_state())
+        return None
+
+    def record_hands(self) -> None:
+        """ Call before moving hands between players."""
+        frame = self.__current_undo_frame()
+        if frame is None or "hands" in frame:
+            return None
+        frame["hands"] = tuple(player.hand for player in self._players)
+        return None
+
+    def undo(self) -> None:
+        """ Reverts the most recent frame (a single play_cards, burn, pickup, turn change...)."""
+        if not self.__undo_journal:
+            raise IndexError("Nothing to undo")
+        frame = self.__undo_journal.pop()
+        if "hands" in frame:
+            for player, hand in zip(self._players, frame.pop("hands")):
+                player.hand = hand
+        if "scalars" in frame:
+            scalars, combo_history_length, legal_combos, legal_actions = frame.pop("scalars")
+            self.__set_scalars(scalars)
+            del self._combo_history[combo_history_length:]
+            self.__current_legal_combos = legal_combos
+            self.__current_legal_actions = legal_actions
+        for container, state in frame.values():
+            container.restore_state(state)
+        return None
+
+    def __current_undo_frame(self) -> dict | None:
+        if self.__undo_journal is None:
+            return None
+        if self.__undo_frame_depth == 0:
+            self.__undo_journal.append({})  # A lone mutation is its own frame
+        return self.__undo_journal[-1]
+
+    def __record_scalars(self) -> None:
+        frame = self.__current_undo_frame()
+        if frame is None or "scalars" in frame:
+            return None
+        frame["scalars"] = (self.__scalars(), len(self._combo_history),
+                            self.__current_legal_combos, self.__current_legal_actions)
+        return None
+
+    def __scalars(self) -> tuple:
+        return (self._play_order, self._turn_order, self._cards_are_flipped, self._effect_multiplier,
+                self._player_index, self._has_burned_this_turn, self._turns_played,
+                self.player_index_who_started_turn, self.__number_of_jokers_in_play, self.__total_jokers,
+                self._number_of_combos_played_this_turn)
+
+    def __set_scalars(self, scalars: tuple) -> None:
+        (self._play_order, self._turn_order, self._cards_are_flipped, self._effect_multiplier,
+         self._player_index, self._has_burned_this_turn, self._turns_played,
+         self.player_index_who_started_turn, self.__number_of_jokers_in_play, self.__total_jokers,
+         self._number_of_combos_played_this_turn) = scalars
+        return None
+
     def get_player(self, player_index: int) -> Player:
         return self.players[player_index]
 
@@ -73,11 +248,13 @@ class Board(IBoard):
         return self.get_player(self.player_index)
 
     def step_player_index(self, number_of_steps: int) -> None:
+        self.__record_scalars()
         self._player_index += self.turn_order.value * number_of_steps
         self._player_index %= len(self.players)
         return None
 
     def flip_turn_order(self) -> None:
+        self.__record_scalars()
         if self._turn_order == BoardTurnOrder.RIGHT:
             self._turn_order = BoardTurnOrder.LEFT
         else:
@@ -85,10 +262,12 @@ class Board(IBoard):
         return None
 
     def reset_play_order(self) -> None:
+        self.__record_scalars()
         self._play_order = BoardPlayOrder.UP
         return None
 
     def flip_play_order(self) -> None:
+        self.__record_scalars()
         if self._play_order == BoardPlayOrder.UP:
             self._play_order = BoardPlayOrder.DOWN
         else:
@@ -96,10 +275,12 @@ class Board(IBoard):
         return None
 
     def flip_hands(self) -> None:
+        self.__record_scalars()
         self._cards_are_flipped = not self.cards_are_flipped
         return None
 
     def start_turn(self) -> None:
+        self.__record_scalars()
         self.player_index_who_started_turn = self.player_index
         self._number_of_combos_played_this_turn = 0
         self._has_burned_this_turn = False
@@ -108,8 +289,13 @@ class Board(IBoard):
         return None
 
     def end_turn(self) -> None:
-        self._turns_played += 1
-        self.__trigger_on_end_turn_events()
+        self.begin_undo_frame()
+        try:
+            self.__record_scalars()
+            self._turns_played += 1
+            self.__trigger_on_end_turn_events()
+        finally:
+            self.end_undo_frame()  # Game's end turn events raise to end the game
         return None
 
     def register_on_end_turn_event(self, on_end_turn_event: OnEndTurnEvent) -> None:
@@ -121,82 +307,128 @@ class Board(IBoard):
             event(self)
         return None
 
+    def register_on_board_event(self, on_board_event: OnBoardEvent) -> None:
+        self.__on_board_events.append(on_board_event)
+        return None
+
+    def trigger_board_event(self, event: BoardEvent, *args) -> None:
+        """ Undo does not take events back."""
+        for on_board_event in self.__on_board_events:
+            on_board_event(self, event, *args)
+        return None
+
     def play_cards(self, cards: Cards,
                    controller: IController | None = None,
                    board_printer: IBoardPrinter | None = None,
                    add_to_play_pile: bool = True) -> bool:
         """ Assumes the cards are a legal combo AND can legally be played."""
-        self.card_combo_factory.set_counts(cards)
-        combo = self.card_combo_factory.create_combo(controller=controller, board_printer=board_printer)
-        combo_visibility = self.card_combo_factory.combo_visibility(self)
-        if add_to_play_pile:
-            self.play_pile.add_cards(cards, are_visibles=combo_visibility)
-
-        will_burn_due_to_four_in_a_row = self.play_pile.contains_min_length_run(run_length=4)
-
-        self.__draw_until_full()
-        if self.number_of_combos_played_this_turn > 52:
-            return False
-        combo(self)
-
-        self.__reset_effect_multiplier_if_necessary(self.card_combo_factory.major_card_value())
-        self._number_of_combos_played_this_turn += 1
-        self._combo_history.append(combo)
-
-        if will_burn_due_to_four_in_a_row:
-            self.burn(joker_count=self.play_pile.count_value(CardValue.JOKER))
+        self.begin_undo_frame()
+        try:
+            self.__record_scalars()
+            self.record_cards(self.play_pile, self.draw_pile, self.current_player.hand)
+            self.card_combo_factory.set_counts(cards)
+            combo = self.card_combo_factory.create_combo(controller=controller, board_printer=board_printer)
+            combo_visibility = self.card_combo_factory.combo_visibility(self)
+            if add_to_play_pile:
+                self.play_pile.add_cards(cards, are_visibles=combo_visibility)
+
+            will_burn_due_to_four_in_a_row = self.play_pile.contains_min_length_run(run_length=4)
+
+            self.__draw_until_full()
+            if self.number_of_combos_played_this_turn > 52:
+                return False
+            self._number_of_combos_played_this_turn += 1  # Before the effect, so kings replaying kings hit the limit
+            combo(self)
+
+            self.__reset_effect_multiplier_if_necessary(self.card_combo_factory.major_card_value())
+            self._combo_history.append(combo)
+
+            if will_burn_due_to_four_in_a_row:
+                self.burn(joker_count=self.play_pile.count_value(CardValue.JOKER))
+        finally:
+            self.end_undo_frame()  # Controllers and combos can raise mid effect
         return True
 
     def burn(self, joker_count: int) -> None:
-        self.set_effect_multiplier(1)
-        if not self.play_pile:
-            return None
+        self.begin_undo_frame()
+        try:
+            self.__record_scalars()
+            self.record_cards(self.play_pile, self.burn_pile)
+            self.set_effect_multiplier(1)
+            if not self.play_pile:
+                return None
 
-        self._has_burned_this_turn = True
-        if joker_count > 0:
-            if joker_count == 1:
-                indices_to_burn = [len(self.play_pile) - 1]
-            else:
-                indices_to_burn = list(range(len(self.play_pile) - joker_count, len(self.play_pile)))
-            cards_to_burn = self.play_pile.pop_multiple(indices_to_burn)
-            self.set_number_of_jokers_in_play(
-                self.number_of_jokers_in_play - cards_to_burn.count_value(CardValue.JOKER))
-            self.burn_pile.add_cards(cards_to_burn)
-            return None
-        self.burn_pile.add_cards(self.play_pile)
-        self.play_pile.clear()
+            self._has_burned_this_turn = True
+            if joker_count > 0:
+                if joker_count == 1:
+                    indices_to_burn = [len(self.play_pile) - 1]
+                else:
+                    indices_to_burn = list(range(len(self.play_pile) - joker_count, len(self.play_pile)))
+                cards_to_burn = self.play_pile.pop_multiple(indices_to_burn)
+                self.set_number_of_jokers_in_play(
+                    self.number_of_jokers_in_play - cards_to_burn.count_value(CardValue.JOKER))
+                self.burn_pile.add_cards(cards_to_burn)
+                return None
+            self.burn_pile.add_cards(self.play_pile)
+            self.play_pile.clear()
+        finally:
+            self.end_undo_frame()
         return None
 
-    def legal_combos_from_cards(self, cards: Cards) -> set:
+    def legal_combos_from_cards(self, cards: Cards) -> frozenset[FrozenCombo]:
         if not cards:
-            return set()
-
-        if self.cards_are_flipped:
-            return set(FrozenMultiset([card.value]) for card in cards)
-
-        filler = self.__filler_card_value
-
-        if not self.play_pile or self.play_pile.visible_top_card is None:
-            return equal_subsequence_permutations_filler_and_filter(cards, filler, self.__is_joker, 3)
-
-        top_card: Card = self.play_pile.visible_top_card
-        valid_cards = Cards(card for card in cards if self.__is_potentially_playable(card, top_card))
-
-        if top_card.value == CardValue.ACE:
-            if self.__contains_unplayable_filler(cards, top_card):
-                return equal_subsequence_permutations_filler_not_exclusively_filler(valid_cards, filler, 3)
-            return equal_subsequence_permutations_filler(valid_cards, filler, 3)
-
-        if self.__contains_unplayable_filler(cards, top_card):
-            return equal_subsequence_permutations_filler_filter_not_exclusively_filler(valid_cards, filler,
-                                                                                       self.__is_joker, 3)
-        return equal_subsequence_permutations_filler_and_filter(valid_cards, filler, self.__is_joker, 3)
+            return frozenset()
+
+        value_counts = cards.value_counts
+        top_card = self.play_pile.visible_top_card if self.play_pile else None
+        top_card_value = None if top_card is None else top_card.value
+        key = (value_counts, top_card_value, self.play_order, self.cards_are_flipped)
+        legal_combos = self.legal_combos_cache.get(key)
+        if legal_combos is not None:
+            return legal_combos
+
+        table = self.legal_combo_table
+        if table is not None and not self.cards_are_flipped and table.covers(value_counts):
+            legal_combos = frozenset(table.legal_combos(value_counts, top_card_value, self.play_order))
+        else:
+            legal_combos = frozenset(self.legal_combos_for_context(value_counts, top_card_value, self.play_order,
+                                                                   self.cards_are_flipped))
+        self.legal_combos_cache.put(key, legal_combos)
+        return legal_combos
+
+    @classmethod
+    def legal_combos_for_context(cls, value_counts: tuple[int, ...], top_card_value: CardValue | None,
+                                 play_order: BoardPlayOrder, cards_are_flipped: bool) -> Iterable[FrozenCombo]:
+        """ The live legal combo generator, without any caching or lookup table."""
+        if cards_are_flipped:
+            return (FrozenCombo([CARD_VALUES[slot]]) for slot, count in enumerate(value_counts) if count)
+
+        filler = cls.__filler_card_value
+        joker_mask = 1 << (CardValue.JOKER.value - 2)
+
+        if top_card_value is None:
+            return legal_combos_from_counts(value_counts, filler, joker_mask, True, 3)
+
+        counts = list(value_counts)
+        comparison = cls.__playable_card_comparisons[play_order]
+        top_value = top_card_value.value
+        filler_is_unplayable = not comparison(filler.value, top_value)
+        exclusively_filler = not (counts[filler.value - 2] > 0 and filler_is_unplayable)
+        for slot, value in enumerate(CARD_VALUES):
+            if counts[slot] and not (value in cls.__always_legal_cards_values or value == filler or
+                                     comparison(value.value, top_value)):
+                counts[slot] = 0
+
+        filter_mask = 0 if top_card_value == CardValue.ACE else joker_mask
+        return legal_combos_from_counts(counts, filler, filter_mask, exclusively_filler, 3)
 
     def set_effect_multiplier(self, new_multiplier: int) -> None:
+        self.__record_scalars()
         self._effect_multiplier = new_multiplier
         return None
 
     def set_player_index(self, new_index: int) -> None:
+        self.__record_scalars()
         self._player_index = new_index
         self._player_index %= len(self.players)
         return None
@@ -223,7 +455,7 @@ class Board(IBoard):
         return self._draw_pile
 
     @property
-    def burn_pile(self) -> CardPile:
+    def burn_pile(self) -> CardPile | DequeCardPile:
         return self._burn_pile
 
     @property
@@ -239,6 +471,7 @@ class Board(IBoard):
         return self._turn_order
 
     def set_turn_order(self, turn_order: BoardTurnOrder) -> None:
+        self.__record_scalars()
         self._turn_order = turn_order
         return None
 
@@ -275,6 +508,7 @@ class Board(IBoard):
         return self.__number_of_jokers_in_play
 
     def set_number_of_jokers_in_play(self, number_of_jokers: int) -> None:
+        self.__record_scalars()
         self.__number_of_jokers_in_play = number_of_jokers
         return None
 
@@ -287,13 +521,99 @@ class Board(IBoard):
         return self._combo_history
 
     @property
-    def current_legal_combos(self) -> set:
-        return {x.copy() for x in self.__current_legal_combos}
+    def current_legal_combos(self) -> frozenset[FrozenCombo]:
+        """ Shared, immutable and only rebuilt by start_turn. Safe to hold on to for the rest of the turn."""
+        return self.__current_legal_combos
 
     @property
     def current_legal_actions(self) -> set[IAction]:
         return self.__current_legal_actions
 
+    @property
+    def state_hash(self) -> int:
+        """ 64 bit Zobrist hash of the position. Every card container keeps its own hash up to date as cards
+            move, so this only salts each one by seat or pile and XORs in the orders, multiplier, player index,
+            flipped flag and jokers in play. Suits, turn counters and combo history are not part of it."""
+        state_hash = 0
+        for seat, player in enumerate(self._players):
+            hand_salt, karma_face_up_salt, karma_face_down_salt = SEAT_SALTS[seat]
+            state_hash ^= (mix(player.hand.zobrist_hash, hand_salt) ^
+                           mix(player.karma_face_up.zobrist_hash, karma_face_up_salt) ^
+                           mix(player.karma_face_down.zobrist_hash, karma_face_down_salt))
+        draw_salt, play_salt, burn_salt = PILE_SALTS
+        state_hash ^= (mix(self._draw_pile.zobrist_hash, draw_salt) ^ mix(self._play_pile.zobrist_hash, play_salt) ^
+                       mix(self._burn_pile.zobrist_hash, burn_salt))
+        player_index_salt, multiplier_salt, jokers_salt = SCALAR_SALTS
+        state_hash ^= (mix(self._player_index, player_index_salt) ^
+                       mix(self._effect_multiplier.bit_length() - 1, multiplier_salt) ^
+                       mix(self.__number_of_jokers_in_play, jokers_salt))
+        if self._play_order == BoardPlayOrder.DOWN:
+            state_hash ^= PLAY_ORDER_DOWN_KEY
+        if self._turn_order == BoardTurnOrder.LEFT:
+            state_hash ^= TURN_ORDER_LEFT_KEY
+        if self._cards_are_flipped:
+            state_hash ^= CARDS_ARE_FLIPPED_KEY
+        return state_hash
+
+    @property
+    def action_space(self) -> ActionSpace:
+        return ActionSpace.cached(len(self.players))
+
+    @property
+    def action_phase(self) -> ActionPhase:
+        return self.__action_phase
+
+    def set_action_phase(self, action_phase: ActionPhase) -> None:
+        self.__action_phase = action_phase
+        return None
+
+    def legal_action_mask(self, action_phase: ActionPhase | None = None) -> np.ndarray:
+        """ Boolean mask over action_space for the decision being made, by default the current action_phase.
+            Turn actions use the legal actions and combos from start_turn."""
+        mask = self.action_space.empty_mask()
+        mask[self.legal_action_ids(action_phase)] = True
+        return mask
+
+    def legal_action_ids(self, action_phase: ActionPhase | None = None) -> list[int]:
+        """ legal_action_mask as sorted action ids."""
+        if action_phase is None:
+            action_phase = self.__action_phase
+        action_space = self.action_space
+        if action_phase == ActionPhase.TURN:
+            action_ids = []
+            if PlayCardsCombo in self.current_legal_actions:
+                action_ids = sorted([action_space.combo_id(combo) for combo in self.current_legal_combos])
+            if PickUpPlayPile in self.current_legal_actions:
+                action_ids.insert(0, action_space.PICKUP)
+            return action_ids
+        if action_phase == ActionPhase.GIVE_AWAY:
+            excluded_target_indices = self.potential_winner_indices | {self.player_index}
+            target_indices = [i for i in range(len(self.players)) if i not in excluded_target_indices]
+            values = sorted({card.value for card in self.current_player.playable_cards} - {CardValue.JOKER})
+            return [action_space.give_away_id(value, i) for value in values for i in target_indices]
+        return [action_space.joker_target_id(i) for i in range(len(self.players)) if i != self.player_index]
+
+    def apply_action_id(self, action_id: int, controller: IController | None = None,
+                        board_printer: IBoardPrinter | None = None) -> None:
+        """ Plays a turn action (pickup or combo) from action_space. The controller answers any give-away
+            or joker target decisions the combo asks for, e.g. an ActionIdController."""
+        action_space = self.action_space
+        if action_space.phase_of(action_id) != ActionPhase.TURN:
+            raise ValueError(f"Action id {action_id} is not a turn action, answer it through a controller")
+        if action_id == action_space.PICKUP:
+            if PickUpPlayPile not in self.current_legal_actions:
+                raise ValueError("The play pile cannot be picked up")
+            PickUpPlayPile()(self, controller=controller, board_printer=board_printer)
+            return None
+
+        combo = action_space.combo(action_id)
+        if PlayCardsCombo not in self.current_legal_actions or combo not in self.current_legal_combos:
+            raise ValueError(f"{combo} is not a legal combo")
+        playable_cards = self.current_player.playable_cards
+        cards = playable_cards.get(combo_card_indices(playable_cards, combo))
+        PlayCardsCombo(lambda: cards)(self, controller=controller, board_printer=board_printer)
+        return None
+
     @property
     def potential_winner_indices(self) -> set[int]:
         return {i for i, player in enumerate(self.players) if not player.has_cards}
@@ -306,23 +626,10 @@ class Board(IBoard):
         self.__current_legal_actions = actions
         return None
 
-    @staticmethod
-    def __is_joker(card: Card) -> bool:
-        return card.value == CardValue.JOKER
-
     def __calculate_legal_combos(self, cards) -> None:
         self.__current_legal_combos = self.legal_combos_from_cards(cards)
         return None
 
-    def __cards_possible_on_play_pile(self, test_cards: Cards, top_card: Card,
-                                      comparison: Callable[[Card, Card], bool]) -> Cards:
-        return Cards(card for card in test_cards if
-                     self.__is_always_valid(card) or comparison(card,
-                                                                top_card) or card.value == self.__filler_card_value)
-
-    def __is_always_valid(self, card: Card) -> bool:
-        return card in self.__always_legal_cards_values
-
     def __count_in_play_jokers(self) -> int:
         joker_count_in_draw_pile = self.draw_pile.count_value(CardValue.JOKER)
         joker_count_in_players = sum(player.number_of_jokers for player in self.players)
@@ -335,17 +642,6 @@ class Board(IBoard):
         joker_count_in_players = sum(player.number_of_jokers for player in self.players)
         return j_draw_p + j_play_p + j_burn_p + joker_count_in_players
 
-    def __is_potentially_playable(self, card: Card, top_card: Card) -> bool:
-        comparison = self.__playable_card_comparisons[self.play_order]
-        is_always_legal = card.value in self.__always_legal_cards_values
-        return is_always_legal or comparison(card, top_card) or card.value == self.__filler_card_value
-
-    def __contains_unplayable_filler(self, cards: Cards, top_card: Card) -> bool:
-        contains_filler = self.__filler_card_value in cards.values
-        comparison = self.__playable_card_comparisons[self.play_order]
-        filler_is_unplayable = not comparison(self.__filler_card_value.value, top_card.value.value)
-        return contains_filler and filler_is_unplayable
-
     def __reset_effect_multiplier_if_necessary(self, card_value: CardValue) -> None:
         if card_value == CardValue.THREE:
             return None
@@ -2,10 +2,10 @@ from __future__ import annotations
 
 from typing import Callable
 
-from src.utils.multiset import FrozenMultiset
+from src.frozen_combo import FrozenCombo
 
 from src.cards import Cards
-from src.board_interface import IBoard, IBoardPrinter, IAction
+from src.board_interface import BoardEvent, IBoard, IBoardPrinter, IAction
 from src.controller_interface import IController
 
 
@@ -25,8 +25,12 @@ class PickUpPlayPile(IAction):
 
     def __call__(self, board: IBoard, **kwargs) -> None:
         player = board.current_player
+        board.begin_undo_frame()
+        board.record_cards(player.hand, board.play_pile)
+        board.trigger_board_event(BoardEvent.PICKUP, board.player_index, board.play_pile)
         player.pickup(board.play_pile)
         board.set_effect_multiplier(1)
+        board.end_undo_frame()
         return None
 
     def copy(self):
@@ -61,11 +65,32 @@ class PlayCardsCombo(IAction):
     def __call__(self, board: IBoard, controller: IController = None, board_printer: IBoardPrinter | None = None) -> None:
         player = board.current_player
 
-        while self.cards is None or FrozenMultiset(self.cards.values) not in board.current_legal_combos:
+        while self.cards is None or FrozenCombo(self.cards.values) not in board.current_legal_combos:
             self.__get_cards()
+        board.begin_undo_frame()
+        board.record_cards(player.playable_cards)
+        is_playing_from_hand = player.playable_cards is player.hand
         cards_to_play = player.playable_cards.remove(self.cards)
+        if is_playing_from_hand:
+            board.trigger_board_event(BoardEvent.HAND_CARDS_PLAYED, board.player_index, cards_to_play)
         board.play_cards(cards_to_play, controller=controller, board_printer=board_printer)
+        board.end_undo_frame()
         return None
 
     def copy(self):
         return PlayCardsCombo(cards_getter=self.__cards_getter)
+
+
+def combo_card_indices(cards: Cards, combo: FrozenCombo) -> list[int]:
+    """ Indices of cards (the first ones found) whose values make up the combo."""
+    remaining = dict(combo.items())
+    number_remaining = len(combo)
+    indices = []
+    for i, card in enumerate(cards):
+        if number_remaining == 0:
+            break
+        if remaining.get(card.value, 0) > 0:
+            remaining[card.value] -= 1
+            number_remaining -= 1
+            indices.append(i)
+    return indices
@@ -7,7 +7,7 @@ from typing import Deque, Iterable
 from enum import Enum
 
 from src.cards import Cards
-from src.card_pile import CardPile, PlayCardPile
+from src.card_pile import CardPile, DequeCardPile, PlayCardPile
 from src.player import Player
 from src.controller_interface import IController
 
@@ -22,6 +22,15 @@ class BoardTurnOrder(Enum):
     RIGHT = 1
 
 
+class BoardEvent(Enum):
+    """ Public card movements, with the arguments they are triggered with."""
+    PICKUP = 0  # player_index, pile (before it is picked up)
+    HAND_CARDS_PLAYED = 1  # player_index, cards played out of their hand
+    CARD_GIVEN_AWAY = 2  # giver_index, receiver_index, card, whether it came out of the giver's hand
+    HANDS_ROTATED = 3  # steps (before the rotation): seat i gets the hand of seat i - steps
+    HANDS_FLIPPED = 4  # (before the flip)
+
+
 class IBoardState(metaclass=ABCMeta):
     @abstractmethod
     def __init__(self, players: Iterable[Player], **kwargs):
@@ -39,7 +48,7 @@ class IBoardState(metaclass=ABCMeta):
 
     @property
     @abstractmethod
-    def burn_pile(self) -> CardPile:
+    def burn_pile(self) -> CardPile | DequeCardPile:
         raise NotImplementedError
 
     @property
@@ -84,7 +93,7 @@ class IBoardState(metaclass=ABCMeta):
 
     @property
     @abstractmethod
-    def current_legal_combos(self) -> set:
+    def current_legal_combos(self) -> frozenset:
         raise NotImplementedError
 
     @property
@@ -182,6 +191,42 @@ class IBoard(IBoardState):
     def combo_history(self) -> list[Cards]:
         raise NotImplementedError
 
+    @abstractmethod
+    def clone(self) -> IBoard:
+        raise NotImplementedError
+
+    @abstractmethod
+    def snapshot(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def restore(self, snapshot) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def begin_undo_frame(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def end_undo_frame(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def record_cards(self, *cards: Cards) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def record_hands(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def undo(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def trigger_board_event(self, event: BoardEvent, *args) -> None:
+        raise NotImplementedError
+
 
 # HOW THIS WORKS: https://stackoverflow.com/questions/57349105/python-abc-inheritance-with-specified-metaclass
 class MetaIAction(type):
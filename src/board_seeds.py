@@ -1,7 +1,7 @@
-from src.cards import Card, Cards, CardValue, CardSuit, SUITS
+from src.cards import Card, Cards, CardValue, CardSuit, SUITS, MAX_JOKERS
 from src.hand import Hand
 from src.karma import KarmaFaceDown, KarmaFaceUp
-from src.card_pile import CardPile, PlayCardPile
+from src.card_pile import CardPile, DequeCardPile, PlayCardPile
 from src.player import Player
 from src.board_interface import IBoard, BoardTurnOrder, BoardPlayOrder
 
@@ -11,8 +11,10 @@ class BoardFactory:
         self.__board_constructor = board_constructor
 
     def random_start(self, number_of_players: int, number_of_jokers: int = 1, who_starts: int=0) -> IBoard:
-        jokers = Cards(Card(SUITS[i % len(SUITS)], CardValue.JOKER) for i in range(number_of_jokers))
-        deck = Cards(Card(SUITS[i], CardValue(j)) for j in range(2, 15) for i in range(len(SUITS)))
+        if not 0 <= number_of_jokers <= MAX_JOKERS:
+            raise ValueError(f"Between 0 and {MAX_JOKERS} jokers are supported, not {number_of_jokers}")
+        jokers = Cards(Card.interned(SUITS[i % len(SUITS)], CardValue.JOKER) for i in range(number_of_jokers))
+        deck = Cards(Card.interned(SUITS[i], CardValue(j)) for j in range(2, 15) for i in range(len(SUITS)))
         deck.shuffle()
 
         face_down_karmas = [KarmaFaceDown(deck.pop_multiple([i * 3, i * 3 + 1, i * 3 + 2]))
@@ -35,9 +37,9 @@ class BoardFactory:
         if play_pile_values is not None:
             play_pile = PlayCardPile(self.__cards_from_values(play_pile_values))
 
-        burn_pile = CardPile.empty()
+        burn_pile = DequeCardPile.empty()
         if burn_pile_values is not None:
-            burn_pile = CardPile(self.__cards_from_values(burn_pile_values))
+            burn_pile = DequeCardPile(self.__cards_from_values(burn_pile_values))
 
         players = [Player.from_card_values(card_values) for card_values in players_card_values]
         draw_pile = CardPile(self.__cards_from_values(draw_pile_values))
@@ -53,4 +55,4 @@ class BoardFactory:
 
     @staticmethod
     def __cards_from_values(values: list[int], default_suit: CardSuit=SUITS[0]) -> Cards:
-        return Cards([Card(default_suit, CardValue(x)) for x in values])
\ No newline at end of file
+        return Cards([Card.interned(default_suit, CardValue(x)) for x in values])
\ No newline at end of file
@@ -0,0 +1,379 @@
+import pickle
+import random
+import sys
+import threading
+import unittest
+
+import numpy as np
+
+from src.action_space import ActionIdController, ActionPhase
+from src.board import Board, MAX_PLAYERS
+from src.board_seeds import BoardFactory
+from src.board_actions import PickUpPlayPile
+from src.card_pile import CardPile, DequeCardPile, PlayCardPile
+from src.cards import Cards, CardValue
+from src.hand import Hand
+from src.karma import KarmaFaceUp, KarmaFaceDown
+from src.player import Player
+from src.frozen_combo import FrozenCombo
+from src.policies import RandomPolicy
+from src.simulator import Simulator
+from src.utils.lru_cache import LRUCache
+
+
+class TestBoard_Clone(unittest.TestCase):
+    def test_clone_is_equal(self):
+        board = self.__board_mid_game()
+        clone = board.clone()
+        self.assertEqual(_state(board), _state(clone))
+
+    def test_clone_is_independent(self):
+        board = self.__board_mid_game()
+        state_before = _state(board)
+        clone = board.clone()
+        self.__play_turns(clone, 10)
+        self.assertEqual(_state(board), state_before)
+        self.assertNotEqual(_state(clone), state_before)
+
+    def test_clone_has_no_end_turn_events(self):
+        board = self.__board_mid_game()
+        board.register_on_end_turn_event(lambda x: x.flip_hands())
+        clone = board.clone()
+        clone.end_turn()
+        self.assertEqual(clone.cards_are_flipped, board.cards_are_flipped)
+
+    def test_snapshot_restore(self):
+        board = self.__board_mid_game()
+        state_before = _state(board)
+        snapshot = board.snapshot()
+        self.__play_turns(board, 10)
+        self.assertNotEqual(_state(board), state_before)
+        board.restore(snapshot)
+        self.assertEqual(_state(board), state_before)
+
+    def test_restored_board_replays_the_same(self):
+        board = self.__board_mid_game()
+        snapshot = board.snapshot()
+        random.seed(7)
+        self.__play_turns(board, 10)
+        state_after = _state(board)
+        board.restore(snapshot)
+        random.seed(7)
+        self.__play_turns(board, 10)
+        self.assertEqual(_state(board), state_after)
+
+    def __board_mid_game(self) -> Board:
+        random.seed(3)
+        board = BoardFactory(Board).random_start(number_of_players=4)
+        self.__play_turns(board, 12)
+        return board
+
+    @staticmethod
+    def __play_turns(board: Board, number_of_turns: int) -> None:
+        simulator = Simulator([RandomPolicy(pickup_probability=0.1) for _ in range(len(board.players))])
+        for _ in range(number_of_turns):
+            if len(board.potential_winner_indices) > 0:
+                return None
+            simulator.play_turn(board)
+            board.end_turn()
+            board.step_player_index(1)
+        return None
+
+
+class TestBoard_Undo(unittest.TestCase):
+    def test_undo_each_turn(self):
+        for seed in range(30):
+            random.seed(seed)
+            board = BoardFactory(Board).random_start(number_of_players=4)
+            board.enable_undo_journal()
+            simulator = Simulator([RandomPolicy(pickup_probability=0.2) for _ in range(4)])
+            states = []
+            for _ in range(60):
+                if len(board.potential_winner_indices) > 0:
+                    break
+                states.append(_state(board))
+                board.begin_undo_frame()
+                simulator.play_turn(board)
+                board.end_turn()
+                board.step_player_index(1)
+                board.end_undo_frame()
+            self.assertEqual(board.undo_depth, len(states))
+            while states:
+                board.undo()
+                self.assertEqual(_state(board), states.pop())
+
+    def test_undo_single_mutations(self):
+        random.seed(11)
+        board = BoardFactory(Board).random_start(number_of_players=4)
+        board.enable_undo_journal()
+        state_before = _state(board)
+        board.flip_play_order()
+        board.set_effect_multiplier(8)
+        board.step_player_index(3)
+        self.assertEqual(board.undo_depth, 3)
+        for _ in range(3):
+            board.undo()
+        self.assertEqual(_state(board), state_before)
+
+    def test_pickup_undo_restores_visibles(self):
+        board = BoardFactory(Board).matrix_start([[[3, 5], [], []], [[7], [], []]], [], play_pile_values=[4, 11, 9])
+        board.enable_undo_journal()
+        state_before = _state(board)
+        board.start_turn()
+        PickUpPlayPile()(board)
+        self.assertFalse(board.play_pile)
+        board.undo()
+        board.undo()
+        self.assertEqual(_state(board), state_before)
+        self.assertEqual(board.play_pile.visibles, [0, 0, 1])
+
+    def test_frames_stay_balanced_when_a_combo_raises(self):
+        board = BoardFactory(Board).matrix_start([[[12, 5], [], []], [[7], [], []], [[8], [], []]], [])
+        board.start_turn()
+        board.enable_undo_journal()
+        queen = board.current_player.hand.pop_multiple([1])
+        state_before = _state(board)
+        with self.assertRaises(RuntimeError):
+            board.play_cards(queen, controller=_RaisingController())
+        board.set_effect_multiplier(8)
+        self.assertEqual(board.undo_depth, 2)
+        board.undo()
+        self.assertEqual(board.effect_multiplier, 1)
+        board.undo()
+        self.assertEqual(_state(board), state_before)
+
+    def test_undo_empty_journal_raises(self):
+        board = BoardFactory(Board).matrix_start([[[3], [], []], [[7], [], []]], [])
+        board.enable_undo_journal()
+        with self.assertRaises(IndexError):
+            board.undo()
+
+
+class TestBoard_LegalCombosCache(unittest.TestCase):
+    def setUp(self):
+        Board.legal_combos_cache.clear()
+
+    def test_repeated_lookup_hits(self):
+        board = BoardFactory(Board).matrix_start([[[5, 5, 6], [], []], [[7], [], []]], [], play_pile_values=[3])
+        first = board.legal_combos_from_cards(board.players[0].hand)
+        second = board.legal_combos_from_cards(board.players[0].hand)
+        self.assertEqual(first, second)
+        self.assertEqual((Board.legal_combos_cache.misses, Board.legal_combos_cache.hits), (1, 1))
+
+    def test_same_counts_share_entry(self):
+        board = BoardFactory(Board).matrix_start([[[5, 5, 6], [], []], [[6, 5, 5], [], []]], [])
+        self.assertEqual(board.legal_combos_from_cards(board.players[0].hand),
+                         board.legal_combos_from_cards(board.players[1].hand))
+        self.assertEqual(len(Board.legal_combos_cache), 1)
+
+    def test_context_is_part_of_key(self):
+        board = BoardFactory(Board).matrix_start([[[5, 9], [], []], [[7], [], []]], [], play_pile_values=[7])
+        hand = board.players[0].hand
+        up = board.legal_combos_from_cards(hand)
+        board.flip_play_order()
+        down = board.legal_combos_from_cards(hand)
+        self.assertNotEqual(up, down)
+        self.assertEqual(Board.legal_combos_cache.misses, 2)
+
+    def test_cache_is_thread_safe(self):
+        cache = LRUCache(max_size=2)
+        errors = []
+
+        def hammer(offset: int) -> None:
+            try:
+                for i in range(20000):
+                    key = (offset + i) % 4
+                    if cache.get(key) is None:
+                        cache.put(key, key)
+            except Exception as exception:
+                errors.append(exception)
+            return None
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=hammer, args=(offset,)) for offset in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(switch_interval)
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(cache), 2)
+        self.assertEqual(len(pickle.loads(pickle.dumps(cache))), len(cache))
+
+    def test_current_legal_combos_are_shared_and_immutable(self):
+        board = BoardFactory(Board).matrix_start([[[5, 5, 6], [], []], [[7], [], []]], [], play_pile_values=[3])
+        board.start_turn()
+        self.assertIsInstance(board.current_legal_combos, frozenset)
+        self.assertIs(board.current_legal_combos, board.current_legal_combos)
+
+
+class TestBoard_ActionSpace(unittest.TestCase):
+    def test_turn_mask_matches_legal_combos(self):
+        board = BoardFactory(Board).matrix_start([[[5, 5, 6], [], []], [[7], [], []]], [], play_pile_values=[3])
+        board.start_turn()
+        mask = board.legal_action_mask()
+        action_space = board.action_space
+        self.assertTrue(mask[action_space.PICKUP])
+        self.assertEqual({action_space.combo(i) for i in np.flatnonzero(mask[action_space.COMBOS_START:
+                                                                            action_space.GIVE_AWAYS_START])
+                          + action_space.COMBOS_START}, set(board.current_legal_combos))
+
+    def test_legal_action_ids_match_mask(self):
+        board = BoardFactory(Board).matrix_start([[[12, 8, 9], [], []], [[15], [], []], [[5], [], []]], [],
+                                                 play_pile_values=[3])
+        board.start_turn()
+        self.assertEqual(board.legal_action_ids(), np.flatnonzero(board.legal_action_mask()).tolist())
+        for action_phase in (ActionPhase.GIVE_AWAY, ActionPhase.JOKER_TARGET):
+            self.assertEqual(board.legal_action_ids(action_phase),
+                             np.flatnonzero(board.legal_action_mask(action_phase)).tolist())
+
+    def test_all_jokers_fit_the_action_space(self):
+        board = BoardFactory(Board).matrix_start([[[15, 15, 15, 15], [], []], [[7], [], []]], [],
+                                                 play_pile_values=[14])
+        board.start_turn()
+        self.assertIn(board.action_space.combo_id(FrozenCombo({CardValue.JOKER: 4})), board.legal_action_ids())
+
+    def test_too_many_jokers_raises(self):
+        with self.assertRaises(ValueError):
+            BoardFactory(Board).random_start(number_of_players=4, number_of_jokers=5)
+
+    def test_apply_combo_id(self):
+        board = BoardFactory(Board).matrix_start([[[5, 5, 6], [], []], [[7], [], []]], [], play_pile_values=[3])
+        board.start_turn()
+        board.apply_action_id(board.action_space.combo_id(FrozenCombo({CardValue.FIVE: 2})))
+        self.assertEqual(board.play_pile.values, (CardValue.THREE, CardValue.FIVE, CardValue.FIVE))
+
+    def test_apply_pickup_id(self):
+        board = BoardFactory(Board).matrix_start([[[5], [], []], [[7], [], []]], [], play_pile_values=[3, 9])
+        board.start_turn()
+        board.apply_action_id(board.action_space.PICKUP)
+        self.assertEqual(len(board.players[0].hand), 3)
+        self.assertFalse(board.play_pile)
+
+    def test_illegal_id_raises(self):
+        board = BoardFactory(Board).matrix_start([[[5], [], []], [[7], [], []]], [], play_pile_values=[9])
+        board.start_turn()
+        with self.assertRaises(ValueError):
+            board.apply_action_id(board.action_space.combo_id(FrozenCombo({CardValue.FIVE: 1})))
+        with self.assertRaises(ValueError):
+            board.apply_action_id(board.action_space.joker_target_id(1))
+
+    def test_give_away_through_controller(self):
+        board = BoardFactory(Board).matrix_start([[[12, 8, 9], [], []], [[7], [], []], [[], [], []]], [])
+        board.start_turn()
+        masks = []
+
+        def chooser(decision_board: Board) -> int:
+            masks.append(decision_board.legal_action_mask())
+            return decision_board.action_space.give_away_id(CardValue.NINE, 1)
+
+        board.apply_action_id(board.action_space.combo_id(FrozenCombo({CardValue.QUEEN: 1})),
+                              controller=ActionIdController(chooser))
+        action_space = board.action_space
+        self.assertEqual(set(np.flatnonzero(masks[0])), {action_space.give_away_id(CardValue.EIGHT, 1),
+                                                         action_space.give_away_id(CardValue.NINE, 1)})
+        self.assertEqual(board.players[1].hand.values, (CardValue.SEVEN, CardValue.NINE))
+        self.assertEqual(board.action_phase, ActionPhase.TURN)
+
+    def test_joker_target_through_controller(self):
+        board = BoardFactory(Board).matrix_start([[[15, 8], [], []], [[7], [], []], [[5], [], []]], [],
+                                                 play_pile_values=[3, 14])
+        board.start_turn()
+        board.apply_action_id(board.action_space.combo_id(FrozenCombo({CardValue.JOKER: 1})),
+                              controller=ActionIdController(lambda x: x.action_space.joker_target_id(2)))
+        self.assertEqual(len(board.players[2].hand), 3)
+
+
+class TestBoard_StateHash(unittest.TestCase):
+    def test_every_seat_up_to_the_maximum_has_salts(self):
+        board = BoardFactory(Board).matrix_start([[[3], [], []] for _ in range(MAX_PLAYERS)], [])
+        self.assertIsInstance(board.state_hash, int)
+        with self.assertRaises(ValueError):
+            BoardFactory(Board).matrix_start([[[3], [], []] for _ in range(MAX_PLAYERS + 1)], [])
+
+    def test_incremental_hash_matches_rebuilt_board(self):
+        random.seed(5)
+        board = BoardFactory(Board).random_start(number_of_players=4)
+        simulator = Simulator([RandomPolicy(pickup_probability=0.1) for _ in range(4)])
+        for _ in range(60):
+            if board.potential_winner_indices:
+                break
+            simulator.play_turn(board)
+            board.end_turn()
+            board.step_player_index(1)
+            self.assertEqual(board.state_hash, _rebuilt(board).state_hash)
+
+    def test_restore_restores_hash(self):
+        random.seed(6)
+        board = BoardFactory(Board).random_start(number_of_players=4)
+        state_hash = board.state_hash
+        snapshot = board.snapshot()
+        simulator = Simulator([RandomPolicy() for _ in range(4)])
+        for _ in range(5):
+            simulator.play_turn(board)
+            board.end_turn()
+        self.assertNotEqual(board.state_hash, state_hash)
+        board.restore(snapshot)
+        self.assertEqual(board.state_hash, state_hash)
+
+    def test_suits_and_hand_order_do_not_matter(self):
+        first = BoardFactory(Board).matrix_start([[[5, 9, 9], [3], [2]], [[7], [], []]], [8], play_pile_values=[4])
+        second = BoardFactory(Board).matrix_start([[[9, 5, 9], [3], [2]], [[7], [], []]], [8], play_pile_values=[4])
+        second.players[0].hand.reverse()
+        self.assertEqual(first.state_hash, second.state_hash)
+
+    def test_seats_orders_and_scalars_matter(self):
+        board = BoardFactory(Board).matrix_start([[[5], [], []], [[7], [], []]], [8], play_pile_values=[4, 9])
+        swapped = BoardFactory(Board).matrix_start([[[7], [], []], [[5], [], []]], [8], play_pile_values=[4, 9])
+        reordered = BoardFactory(Board).matrix_start([[[5], [], []], [[7], [], []]], [8], play_pile_values=[9, 4])
+        hashes = {board.state_hash, swapped.state_hash, reordered.state_hash}
+        for change in (Board.flip_play_order, Board.flip_turn_order, Board.flip_hands,
+                       lambda x: x.set_effect_multiplier(4), lambda x: x.step_player_index(1)):
+            changed = board.clone()
+            change(changed)
+            hashes.add(changed.state_hash)
+        self.assertEqual(len(hashes), 8)
+
+
+def _rebuilt(board: Board) -> Board:
+    """ A board with the same position, built from scratch so every container hash is recomputed."""
+    players = [Player(Hand(list(player.hand)), KarmaFaceUp(list(player.karma_face_up)),
+                      KarmaFaceDown(list(player.karma_face_down))) for player in board.players]
+    play_pile = PlayCardPile.empty()
+    play_pile.add_cards(Cards(board.play_pile), are_visibles=list(board.play_pile.visibles))
+    rebuilt = Board(players, draw_pile=CardPile(list(board.draw_pile)), burn_pile=DequeCardPile(board.burn_pile),
+                    play_pile=play_pile, play_order=board.play_order, turn_order=board.turn_order,
+                    cards_are_flipped=board.cards_are_flipped, effect_multiplier=board.effect_multiplier,
+                    who_starts=board.player_index)
+    rebuilt.set_number_of_jokers_in_play(board.number_of_jokers_in_play)
+    return rebuilt
+
+
+class _RaisingController:
+    def card_giveaway(self, board: Board, prompt_manager=None) -> tuple[int, int]:
+        raise RuntimeError("The controller gave up")
+
+def _state(board: Board) -> tuple:
+    players = tuple((tuple(player.hand), tuple(player.karma_face_up), tuple(player.karma_face_down))
+                    for player in board.players)
+    return (players, tuple(board.draw_pile), tuple(board.burn_pile), tuple(board.play_pile),
+            tuple(board.play_pile.visibles), board.play_order, board.turn_order, board.cards_are_flipped,
+            board.effect_multiplier, board.player_index, board.has_burned_this_turn, board.turns_played,
+            board.number_of_jokers_in_play, board.number_of_combos_played_this_turn,
+            len(board.combo_history), frozenset(board.current_legal_combos))
+
+
+class TestBoard_PlayCards(unittest.TestCase):
+    def test_kings_replaying_kings_stop_at_the_combo_limit(self):
+        # Every king replays a king from the burn pile, and every fourth burns them all back onto it
+        board = BoardFactory(Board).matrix_start([[[13, 3], [], []], [[5], [], []]], [],
+                                                 play_pile_values=[13, 13], burn_pile_values=[13, 13, 13])
+        board.start_turn()
+        self.assertTrue(board.play_cards(board.current_player.hand.pop_multiple([1])))
+        self.assertEqual(board.number_of_combos_played_this_turn, 53)
+
+if __name__ == '__main__':
+    unittest.main()
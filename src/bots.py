@@ -1,7 +1,7 @@
 from bot_interface import IBot
 
 from src.cards import CardValue
-from src.utils.multiset import FrozenMultiset
+from src.frozen_combo import FrozenCombo
 from src.board_interface import IBoard, BoardTurnOrder
 from src.board_actions import PickUpPlayPile, PlayCardsCombo
 
@@ -38,7 +38,7 @@ class IntegrationTestBot(IBot):
     def card_play_indices(self) -> list[int]:
         legal_combos = self.__board.current_legal_combos
         playable_cards = self.__board.current_player.playable_cards
-        legal_combo: FrozenMultiset = legal_combos.pop()
+        legal_combo: FrozenCombo = next(iter(legal_combos))
 
         legal_items = dict(legal_combo.items())
 
@@ -1,154 +1,89 @@
-from collections import defaultdict
+from typing import Callable, Iterator, Sequence
 
-from src.utils.multiset import FrozenMultiset
-from src.cards import Cards, CardValue
+from src.frozen_combo import FrozenCombo
+from src.cards import Card, Cards, CardValue
 
+type CardFilter = Callable[[Card], bool]
 
-def equal_subsequence_permutations(seq: Cards) -> set[FrozenMultiset]:
-    if len(seq) == 0:
-        return set()
-    if len(seq) == 1:
-        return __single_value_frozen_multiset(seq)
+CARD_VALUES: tuple[CardValue, ...] = tuple(CardValue)  # Slot i of a value count vector is CARD_VALUES[i]
 
-    count = defaultdict(int)
 
-    outputs = set()
+def legal_combos_from_counts(counts: Sequence[int], filler: CardValue, filter_mask: int = 0,
+                             exclusively_filler: bool = True,
+                             minimum_to_filler: int = 2) -> Iterator[FrozenCombo]:
+    """ Every combo playable from a value count vector: any number of one value, and, once there are at least
+        minimum_to_filler of it, topped up with any number of fillers.
+
+        filter_mask: bit i set means CARD_VALUES[i] can never be played (a lone card is filtered too).
+        exclusively_filler: whether combos made only of fillers are allowed.
+        A single card on its own is always playable, unless it is filtered."""
+    filler_slot = filler.value - 2
+    filler_count = counts[filler_slot]
+    total = 0
+    for count in counts:
+        total += count
+
+    if total == 1:
+        slot = next(i for i, count in enumerate(counts) if count)
+        if not filter_mask >> slot & 1:
+            yield FrozenCombo({CARD_VALUES[slot]: 1})
+        return None
+
+    for slot, count in enumerate(counts):
+        if count == 0 or filter_mask >> slot & 1:
+            continue
+        value = CARD_VALUES[slot]
+        if slot == filler_slot:
+            if exclusively_filler:
+                for number_of_cards in range(1, count + 1):
+                    yield FrozenCombo({value: number_of_cards})
+            continue
+        for number_of_cards in range(1, count + 1):
+            yield FrozenCombo({value: number_of_cards})
+            if number_of_cards < minimum_to_filler:
+                continue
+            for number_of_fillers in range(1, filler_count + 1):
+                yield FrozenCombo({value: number_of_cards, filler: number_of_fillers})
+    return None
+
+
+def filter_mask_from_cards(seq: Cards, _filter: CardFilter) -> int:
+    mask = 0
     for card in seq:
-        key = card.value
-        count[key] += 1
-        outputs.add(FrozenMultiset([key for _ in range(count[key])]))
-    return outputs
+        if _filter(card):
+            mask |= 1 << (card.value.value - 2)
+    return mask
+
+
+def equal_subsequence_permutations(seq: Cards) -> set[FrozenCombo]:
+    counts = seq.value_counts
+    return {FrozenCombo({CARD_VALUES[slot]: number_of_cards})
+            for slot, count in enumerate(counts) for number_of_cards in range(1, count + 1)}
 
 
 def equal_subsequence_permutations_filler(seq: Cards,
                                           filler: CardValue,
-                                          minimum_to_filler: int = 2) -> set[FrozenMultiset]:
-    if len(seq) == 0:
-        return set()
-    if len(seq) == 1:
-        return __single_value_frozen_multiset(seq)
-
-    count = defaultdict(int)
-    outputs = set()
-    for card in seq:
-        key = card.value
-        count[key] += 1
-        outputs.add(FrozenMultiset([key for _ in range(count[key])]))
-
-    filler_count = count[filler]
-    outputs_that_include_filler = set()
-    if filler_count == 0:
-        return outputs
-    for output in outputs:
-        if len(output) < minimum_to_filler:
-            continue
-        for i in range(1, filler_count + 1):
-            outputs_that_include_filler.add(FrozenMultiset(list(output) + [filler for _ in range(i)]))
-    outputs |= outputs_that_include_filler
-    outputs -= {FrozenMultiset([filler for _ in range(filler_count + i)]) for i in range(1, filler_count + 1)}
-    return outputs | outputs_that_include_filler
+                                          minimum_to_filler: int = 2) -> set[FrozenCombo]:
+    return set(legal_combos_from_counts(seq.value_counts, filler, 0, True, minimum_to_filler))
 
 
 def equal_subsequence_permutations_filler_not_exclusively_filler(seq: Cards,
                                                                  filler: CardValue,
-                                                                 minimum_to_filler: int=2) -> set[FrozenMultiset]:
-    if len(seq) == 0:
-        return set()
-    if len(seq) == 1:
-        return __single_value_frozen_multiset(seq)
-
-    count = defaultdict(int)
-    outputs = set()
-    for card in seq:
-        key = card.value
-        count[key] += 1
-        outputs.add(FrozenMultiset([key for _ in range(count[key])]))
-
-    filler_count = count[filler]
-    if filler_count == 0:
-        return outputs
-    outputs_that_include_filler = set()
-    for output in outputs:
-        if len(output) < minimum_to_filler:
-            continue
-        for i in range(1, filler_count + 1):
-            outputs_that_include_filler.add(FrozenMultiset(list(output) + [filler for _ in range(i)]))
-    outputs |= outputs_that_include_filler
-    outputs -= {FrozenMultiset([filler for _ in range(i)]) for i in range(1, filler_count * 2 + 1)}
-    return outputs
+                                                                 minimum_to_filler: int=2) -> set[FrozenCombo]:
+    return set(legal_combos_from_counts(seq.value_counts, filler, 0, False, minimum_to_filler))
 
 
 def equal_subsequence_permutations_filler_and_filter(seq: Cards,
                                                      filler: CardValue,
-                                                     _filter: callable,
-                                                     minimum_to_filler: int = 2) -> set[FrozenMultiset]:
-    if len(seq) == 0:
-        return set()
-    if len(seq) == 1:
-        if _filter(seq[0]):
-            return set()
-        return __single_value_frozen_multiset(seq)
-
-    count = defaultdict(int)
-    outputs = set()
-    for card in seq:
-        key = card.value
-        count[key] += 1
-        if _filter(card):
-            continue
-        outputs.add(FrozenMultiset([key for _ in range(count[key])]))
-
-    filler_count = count[filler]
-    if filler_count == 0:
-        return outputs
-    outputs_that_include_filler = set()
-    for output in outputs:
-        if len(output) < minimum_to_filler:
-            continue
-        for i in range(1, filler_count + 1):
-            outputs_that_include_filler.add(FrozenMultiset(list(output) + [filler for _ in range(i)]))
-    outputs |= outputs_that_include_filler
-    outputs -= __not_exclusively_filler_but_contains_filler_frozen_multi_sets(filler, filler_count)
-    return outputs
+                                                     _filter: CardFilter,
+                                                     minimum_to_filler: int = 2) -> set[FrozenCombo]:
+    filter_mask = filter_mask_from_cards(seq, _filter)
+    return set(legal_combos_from_counts(seq.value_counts, filler, filter_mask, True, minimum_to_filler))
 
 
 def equal_subsequence_permutations_filler_filter_not_exclusively_filler(seq: Cards,
                                                                         filler: CardValue,
-                                                                        _filter: callable,
-                                                                        minimum_to_filler: int = 2) -> set[FrozenMultiset]:
-    if len(seq) == 0:
-        return set()
-    if len(seq) == 1:
-        if _filter(seq[0]):
-            return set()
-        return __single_value_frozen_multiset(seq)
-
-    count = defaultdict(int)
-    outputs = set()
-    for card in seq:
-        key = card.value
-        count[key] += 1
-        if _filter(card):
-            continue
-        outputs.add(FrozenMultiset([key for _ in range(count[key])]))
-
-    filler_count = count[filler]
-    if filler_count == 0:
-        return outputs
-    outputs_that_include_filler = set()
-    for output in outputs:
-        if len(output) < minimum_to_filler:
-            continue
-        for i in range(1, filler_count + 1):
-            outputs_that_include_filler.add(FrozenMultiset(list(output) + [filler for _ in range(i)]))
-    outputs |= outputs_that_include_filler
-    outputs -= {FrozenMultiset([filler for _ in range(i)]) for i in range(1, filler_count * 2 + 1)}
-    return outputs
-
-
-def __single_value_frozen_multiset(seq):
-    return {FrozenMultiset([seq[0].value])}
-
-
-def __not_exclusively_filler_but_contains_filler_frozen_multi_sets(filler, filler_count):
-    return {FrozenMultiset([filler for _ in range(filler_count + i)]) for i in range(1, filler_count + 1)}
+                                                                        _filter: CardFilter,
+                                                                        minimum_to_filler: int = 2) -> set[FrozenCombo]:
+    filter_mask = filter_mask_from_cards(seq, _filter)
+    return set(legal_combos_from_counts(seq.value_counts, filler, filter_mask, False, minimum_to_filler))
@@ -0,0 +1,50 @@
+import unittest
+
+from src.utils.multiset import FrozenMultiset
+from src.card_combo_permuations import (legal_combos_from_counts, equal_subsequence_permutations_filler,
+                                        equal_subsequence_permutations_filler_and_filter)
+from src.cards import Cards, Card, CardValue, SUITS
+
+
+def _cards(*values: int) -> Cards:
+    return Cards(Card(SUITS[i % len(SUITS)], CardValue(value)) for i, value in enumerate(values))
+
+
+def _combo(**counts: int) -> FrozenMultiset:
+    return FrozenMultiset({CardValue[name]: count for name, count in counts.items()})
+
+
+class TestLegalCombosFromCounts(unittest.TestCase):
+    def test_fillers_only_join_large_enough_combos(self):
+        combos = set(legal_combos_from_counts(_cards(5, 5, 5, 6).value_counts, CardValue.SIX, minimum_to_filler=3))
+        self.assertEqual(combos, {_combo(FIVE=1), _combo(FIVE=2), _combo(FIVE=3), _combo(FIVE=3, SIX=1),
+                                  _combo(SIX=1)})
+
+    def test_not_exclusively_filler(self):
+        combos = set(legal_combos_from_counts(_cards(5, 5, 6, 6).value_counts, CardValue.SIX,
+                                              exclusively_filler=False))
+        self.assertEqual(combos, {_combo(FIVE=1), _combo(FIVE=2), _combo(FIVE=2, SIX=1), _combo(FIVE=2, SIX=2)})
+
+    def test_filter_mask(self):
+        counts = _cards(15, 15, 9).value_counts
+        combos = set(legal_combos_from_counts(counts, CardValue.SIX, 1 << (CardValue.JOKER.value - 2)))
+        self.assertEqual(combos, {_combo(NINE=1)})
+
+    def test_single_card_ignores_exclusively_filler(self):
+        combos = set(legal_combos_from_counts(_cards(6).value_counts, CardValue.SIX, exclusively_filler=False))
+        self.assertEqual(combos, {_combo(SIX=1)})
+
+    def test_filler_combos_never_exceed_fillers_held(self):
+        combos = equal_subsequence_permutations_filler(_cards(6, 6, 6, 6), CardValue.SIX, 3)
+        self.assertEqual(combos, {_combo(SIX=1), _combo(SIX=2), _combo(SIX=3), _combo(SIX=4)})
+
+    def test_card_filter_matches_filter_mask(self):
+        cards = _cards(15, 3, 3, 3, 6, 6)
+        combos = equal_subsequence_permutations_filler_and_filter(cards, CardValue.SIX,
+                                                                  lambda card: card.value == CardValue.JOKER, 3)
+        self.assertEqual(combos, set(legal_combos_from_counts(cards.value_counts, CardValue.SIX,
+                                                              1 << (CardValue.JOKER.value - 2), True, 3)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,13 +4,13 @@ from abc import ABC, abstractmethod
 
 from collections import Counter, deque
 
+from src.action_space import ActionPhase
 from src.cards import Cards, CardValue, non_six_value
 from src.hand import Hand
 from src.player import Player
-from src.board_interface import IBoard, IBoardPrinter
+from src.board_interface import BoardEvent, IBoard, IBoardPrinter
 from src.controller_interface import IController
 from prompt_manager import PromptManager
-import src.response_conditions as rc
 
 type CardValueCounts = dict[CardValue, int]
 
@@ -26,7 +26,7 @@ class CardCombo(ABC):
         self.__counts = counts
         self.prompt_manager = prompt_manager
         if prompt_manager is None:
-            self.prompt_manager = PromptManager()
+            self.prompt_manager = PromptManager.cached()
 
     def __len__(self) -> int:
         return len(self.cards)
@@ -59,7 +59,9 @@ class Combo_4(CardCombo):
 class Combo_5(CardCombo):
     def __call__(self, board: IBoard) -> None:
         hands = deque([player.hand for player in board.players])
+        board.record_hands()
         number_of_repeats = len(self) * board.effect_multiplier
+        board.trigger_board_event(BoardEvent.HANDS_ROTATED, number_of_repeats * board.turn_order.value)
         if number_of_repeats < len(board.players):
             self.__hand_rotates(board, hands, number_of_repeats)
             return None
@@ -141,31 +143,28 @@ class Combo_Queen(CardCombo):
         number_of_repeats = len(self) * board.effect_multiplier
         playing_index_at_start_of_combo = current_player.playing_from
         for _ in range(number_of_repeats):
-            self.board_printer.print(board.player_index)
+            if self.board_printer is not None:
+                self.board_printer.print(board.player_index)
             if current_player.playing_from != playing_index_at_start_of_combo:
                 return None
             if current_player.playable_cards.is_exclusively(CardValue.JOKER):
                 return None
+            if not board.legal_action_ids(ActionPhase.GIVE_AWAY):  # Every other player is a potential winner
+                return None
             self.__give_away_card(board, current_player)
             if not current_player.has_cards:
                 return None
         return None
 
     def __give_away_card(self, board: IBoard, current_player):
-        joker_indices = {i for i, card in enumerate(current_player.playable_cards) if card.value == CardValue.JOKER}
-        card_index_selected = self.controller.get_response([self.prompt_manager["give_away"]],
-                                                           [rc.IsNumberSelection(0,
-                                                                                 len(current_player.playable_cards) - 1,
-                                                                                 1,
-                                                                                 exclude=joker_indices)])
-        excluded_target_players = board.potential_winner_indices | {board.player_index}
-        target_player_index = self.controller.get_response([self.prompt_manager["give_away_select_player"]],
-                                                           [rc.IsNumberSelection(0,
-                                                                                 len(board.players) - 1,
-                                                                                 1,
-                                                                                 exclude=excluded_target_players)])
-        target_player: Player = board.players[target_player_index[0]]
-        target_player.receive_card(current_player.playable_cards.pop(card_index_selected[0]))
+        card_index_selected, target_player_index = self.controller.card_giveaway(board, self.prompt_manager)
+        target_player: Player = board.players[target_player_index]
+        board.record_cards(current_player.playable_cards, current_player.hand, target_player.hand, board.draw_pile)
+        is_giving_from_hand = current_player.playable_cards is current_player.hand
+        card = current_player.playable_cards.pop(card_index_selected)
+        target_player.receive_card(card)
+        board.trigger_board_event(BoardEvent.CARD_GIVEN_AWAY, board.player_index, target_player_index, card,
+                                  is_giving_from_hand)
         if board.draw_pile and len(current_player.hand) < 3:
             current_player.draw_card(board.draw_pile)
         return None
@@ -181,6 +180,7 @@ class Combo_King(CardCombo):
         number_of_repeats = min(number_of_repeats, len(board.burn_pile))
         if number_of_repeats == 0:
             return None
+        board.record_cards(board.burn_pile)
         cards_to_play = board.burn_pile.remove_from_bottom(number_of_repeats)
         for card in cards_to_play:
             if card.value == CardValue.JOKER:
@@ -193,6 +193,8 @@ class Combo_Ace(CardCombo):
     def __call__(self, board: IBoard) -> None:
         number_of_repeats = len(self) * board.effect_multiplier
         if number_of_repeats == 1:
+            board.record_cards(*(player.hand for player in board.players))
+            board.trigger_board_event(BoardEvent.HANDS_FLIPPED)
             board.flip_hands()
             if board.cards_are_flipped:
                 for player in board.players:
@@ -211,12 +213,9 @@ class Combo_Ace(CardCombo):
 class Combo_Joker(CardCombo):
     def __call__(self, board: IBoard) -> None:
         board.burn(joker_count=len(self))
-        current_player_index = board.player_index
-        target_index = self.controller.get_response([self.prompt_manager["joker_select_player"]],
-                                                    [rc.IsNumberSelection(0, len(board.players) - 1,
-                                                                          max_selection_count=1,
-                                                                          exclude=current_player_index)])
-        target_index = target_index[0]
+        target_index = self.controller.joker_target_index(board, self.prompt_manager)
+        board.record_cards(board.players[target_index].hand, board.play_pile)
+        board.trigger_board_event(BoardEvent.PICKUP, target_index, board.play_pile)
         board.players[target_index].pickup(board.play_pile)
         return None
 
@@ -232,7 +231,7 @@ class CardComboFactory:
 
     def __init__(self, prompt_file_path: str = "prompts.csv"):
         self.__counts = {}
-        self.__prompt_manager = PromptManager(prompt_file_path)
+        self.__prompt_manager = PromptManager.cached(prompt_file_path)
         self.__cards = None
 
     def is_valid_combo(self) -> bool:
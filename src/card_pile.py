@@ -1,11 +1,94 @@
-from typing import Iterable, Self
+from typing import Iterable, Reversible, Self
 
-from cards import Card, Cards, CardValue
+from collections import deque
+
+import random
+
+from src.cards import Card, Cards, CardValue, NUMBER_OF_CARD_VALUES, NUMBER_OF_SUITS, MAX_ZOBRIST_CARDS
+from src.utils.zobrist import MASK_64, extend_zobrist_keys, zobrist_keys
+
+SLOT_KEYS = zobrist_keys("positions", NUMBER_OF_CARD_VALUES)
+POSITION_BASE = zobrist_keys("position base", 1)[0] | 1  # Odd, so it can be divided out mod 2 ** 64
+POSITION_BASE_INVERSE = pow(POSITION_BASE, -1, 1 << 64)
+POSITION_POWERS = [1]  # POSITION_BASE ** i mod 2 ** 64, grown on demand so piles have no size limit
+VISIBLE_KEYS = zobrist_keys("visibles", MAX_ZOBRIST_CARDS)
 
 
 class CardPile(Cards):
+    """ Order matters in a pile, so zobrist_hash is the sum of SLOT_KEYS[slot] * POSITION_BASE ** i mod 2 ** 64
+        over the cards, bottom first. Changes at the top update it in place, anything that shifts cards below
+        recomputes it."""
+
     def __init__(self, cards: Cards):
         super().__init__(cards)
+        self.__hash = _positions_hash(self)
+
+    @property
+    def zobrist_hash(self) -> int:
+        return self.__hash
+
+    def append(self, card: Card) -> None:
+        self.__hash = (self.__hash + _position_term(card, len(self))) & MASK_64
+        super().append(card)
+        return None
+
+    def extend(self, cards: Iterable[Card]) -> None:
+        cards = list(cards)
+        self.__hash = (self.__hash + _positions_hash(cards, len(self))) & MASK_64
+        super().extend(cards)
+        return None
+
+    def __iadd__(self, cards: Iterable[Card]) -> Self:
+        self.extend(cards)
+        return self
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+    def pop(self, index: int = -1) -> Card:
+        if index != -1 and index != len(self) - 1:
+            card = super().pop(index)
+            self.__hash = _positions_hash(self)
+            return card
+        card = super().pop()
+        self.__hash = (self.__hash - _position_term(card, len(self))) & MASK_64
+        return card
+
+    def insert(self, index: int, card: Card) -> None:
+        super().insert(index, card)
+        self.__hash = _positions_hash(self)
+        return None
+
+    def clear(self) -> None:
+        super().clear()
+        self.__hash = 0
+        return None
+
+    def __setitem__(self, key: int | slice, value: Card | Iterable[Card]) -> None:
+        if isinstance(key, slice):
+            super().__setitem__(key, value)
+            self.__hash = _positions_hash(self)
+            return None
+        position = key % len(self)
+        self.__hash = (self.__hash - _position_term(self[position], position)
+                       + _position_term(value, position)) & MASK_64
+        super().__setitem__(position, value)
+        return None
+
+    def __delitem__(self, key: int | slice) -> None:
+        super().__delitem__(key)
+        self.__hash = _positions_hash(self)
+        return None
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self.__hash = _positions_hash(self)
+        return None
+
+    def reverse(self) -> None:
+        super().reverse()
+        self.__hash = _positions_hash(self)
+        return None
 
     def pop_card(self, index: int=-1) -> Card:
         return self.pop(index)
@@ -20,12 +103,157 @@ class CardPile(Cards):
         return cls([])
 
 
+class DequeCardPile(deque[Card]):
+    """ Pile that only grows at the top and is taken from the top or the bottom, like the burn pile.
+
+        Whole piles go in with one C level extend and remove_from_bottom pops from the left, so neither
+        depends on how many cards are already in the pile. Neither does the hash: taking the bottom card off
+        subtracts its key and divides every other term down one position by POSITION_BASE."""
+
+    def __init__(self, cards: Iterable[Card] | None = None):
+        if cards is None:
+            cards = ()
+        super().__init__(cards)
+        self.__hash = _positions_hash(self)
+
+    def __repr__(self) -> str:
+        return f"[{', '.join(repr(card) for card in self)}]"
+
+    @property
+    def zobrist_hash(self) -> int:
+        """ The same as a CardPile holding the same cards."""
+        return self.__hash
+
+    def append(self, card: Card) -> None:
+        self.__hash = (self.__hash + _position_term(card, len(self))) & MASK_64
+        super().append(card)
+        return None
+
+    def extend(self, cards: Iterable[Card]) -> None:
+        cards = list(cards)
+        self.__hash = (self.__hash + _positions_hash(cards, len(self))) & MASK_64
+        super().extend(cards)
+        return None
+
+    def __iadd__(self, cards: Iterable[Card]) -> Self:
+        self.extend(cards)
+        return self
+
+    def pop(self) -> Card:
+        card = super().pop()
+        self.__hash = (self.__hash - _position_term(card, len(self))) & MASK_64
+        return card
+
+    def popleft(self) -> Card:
+        card = super().popleft()
+        self.__hash = (self.__hash - SLOT_KEYS[card.id // NUMBER_OF_SUITS]) * POSITION_BASE_INVERSE & MASK_64
+        return card
+
+    def clear(self) -> None:
+        super().clear()
+        self.__hash = 0
+        return None
+
+    def __delitem__(self, key: int) -> None:
+        super().__delitem__(key)
+        self.__hash = _positions_hash(self)
+        return None
+
+    def __setitem__(self, key: int, card: Card) -> None:
+        super().__setitem__(key, card)
+        self.__hash = _positions_hash(self)
+        return None
+
+    def insert(self, index: int, card: Card) -> None:
+        super().insert(index, card)
+        self.__hash = _positions_hash(self)
+        return None
+
+    def rotate(self, n: int = 1) -> None:
+        super().rotate(n)
+        self.__hash = _positions_hash(self)
+        return None
+
+    def reverse(self) -> None:
+        super().reverse()
+        self.__hash = _positions_hash(self)
+        return None
+
+    @classmethod
+    def empty(cls) -> Self:
+        return cls()
+
+    def add_card(self, card: Card) -> None:
+        self.append(card)
+        return None
+
+    def add_cards(self, cards: Iterable[Card]) -> None:
+        self.extend(cards)
+        return None
+
+    def pop_card(self, index: int = -1) -> Card:
+        if index == -1:
+            return self.pop()
+        if index == 0:
+            return self.popleft()
+        card = self[index]
+        del self[index]
+        return card
+
+    def remove_from_bottom(self, split_index: int) -> Cards:
+        split_index = min(split_index, len(self))
+        cards = Cards()
+        for _ in range(split_index):
+            cards.append(self.popleft())
+        return cards
+
+    def shuffle(self) -> None:
+        cards = list(self)
+        random.shuffle(cards)
+        self.clear()
+        self.extend(cards)
+        return None
+
+    def copy(self) -> Self:
+        return self.__class__(self)
+
+    def save_state(self) -> tuple:
+        return tuple(self)
+
+    def restore_state(self, state: tuple) -> None:
+        self.clear()
+        self.extend(state)
+        return None
+
+    def count_value(self, target_value: CardValue) -> int:
+        return sum(1 if card.value == target_value else 0 for card in self)
+
+    @property
+    def value_counts(self) -> tuple[int, ...]:
+        counts = [0 for _ in range(NUMBER_OF_CARD_VALUES)]
+        for card in self:
+            counts[card.id // NUMBER_OF_SUITS] += 1
+        return tuple(counts)
+
+    @property
+    def values(self) -> tuple[CardValue, ...]:
+        return tuple(card.value for card in self)
+
+
 class PlayCardPile(CardPile):
     __invisible_cards = {CardValue.FOUR}
 
     def __init__(self, cards: Cards):
         super().__init__(cards)
         self.__visibles = self.__are_visibles(cards)
+        self.__visible_indices = self.__indices_of_visibles(self.__visibles)
+        self.__visibility_hash = self.__visibility_hash_of(self.__visible_indices)
+        self.__runs = self.__runs_of(self)
+
+    @property
+    def zobrist_hash(self) -> int:
+        """ The positions hash of the cards, with VISIBLE_KEYS[i] XORed in for every visible index i."""
+        return super().zobrist_hash ^ self.__visibility_hash
 
     @property
     def visibles(self) -> list[int]:
@@ -33,21 +261,27 @@ class PlayCardPile(CardPile):
 
     @property
     def visible_top_card(self) -> None | Card:
-        if len(self.__visibles) == 0:
+        if not self.__visible_indices:
             return None
-        if len(self.__visibles) == 1:
-            if self.__visibles[0]:
-                return self[0]
-            else:
-                return None
-        for i in range(len(self)-1, -1, -1):
-            visible = self.__visibles[i]
-            if visible:
-                return self[i]
-        return None
+        return self[self.__visible_indices[-1]]
+
+    @property
+    def top_run(self) -> tuple[CardValue, int] | None:
+        """ (value, length) of the run of equal values at the top of the pile."""
+        if not self.__runs:
+            return None
+        value, length, _ = self.__runs[-1]
+        return value, length
+
+    @property
+    def longest_run(self) -> int:
+        if not self.__runs:
+            return 0
+        return self.__runs[-1][2]
 
     def add_card(self, card: Card, is_visible: bool | None=None) -> None:
         super().add_card(card)
+        self.__push_run(card.value)
         if is_visible is None:
             visibility = 1
             if card.value == CardValue.FOUR:
@@ -57,6 +291,12 @@ class PlayCardPile(CardPile):
             self.__visibles.append(1)
         elif not is_visible:
             self.__visibles.append(0)
+        if self.__visibles[-1]:
+            position = len(self.__visibles) - 1
+            if position >= len(VISIBLE_KEYS):
+                extend_zobrist_keys(VISIBLE_KEYS, "visibles", position + 1)
+            self.__visible_indices.append(position)
+            self.__visibility_hash ^= VISIBLE_KEYS[position]
         return None
 
     def add_cards(self, cards: Cards, are_visibles: list[bool] | None=None) -> None:
@@ -69,22 +309,71 @@ class PlayCardPile(CardPile):
         return None
 
     def pop_card(self, index: int=-1) -> Card:
-        self.__visibles.pop(index)
-        return super().pop_card(index)
+        is_top_card = index == -1 or index == len(self.__visibles) - 1
+        visible = self.__visibles.pop(index)
+        if is_top_card:
+            if visible:
+                self.__visible_indices.pop()
+                self.__visibility_hash ^= VISIBLE_KEYS[len(self.__visibles)]
+            self.__pop_run()
+            return super().pop_card(index)
+        self.__visible_indices = self.__indices_of_visibles(self.__visibles)
+        self.__visibility_hash = self.__visibility_hash_of(self.__visible_indices)
+        card = super().pop_card(index)
+        self.__runs = self.__runs_of(self)
+        return card
 
     def pop_multiple(self, indices: Iterable[int]) -> Cards:
         excluded_indices = set(indices)
         self.__visibles = [x for i, x in enumerate(self.__visibles) if i not in excluded_indices]
-        return super().pop_multiple(indices)
+        self.__visible_indices = self.__indices_of_visibles(self.__visibles)
+        self.__visibility_hash = self.__visibility_hash_of(self.__visible_indices)
+        cards = super().pop_multiple(indices)
+        self.__runs = self.__runs_of(self)
+        return cards
 
     def clear(self) -> None:
         super().clear()
         self.__visibles = []
+        self.__visible_indices = []
+        self.__visibility_hash = 0
+        self.__runs = []
         return None
 
     def remove_from_bottom(self, split_index: int) -> Cards:
         self.__visibles = self.__visibles[split_index:]
-        return super().remove_from_bottom(split_index)
+        self.__visible_indices = [i - split_index for i in self.__visible_indices if i >= split_index]
+        self.__visibility_hash = self.__visibility_hash_of(self.__visible_indices)
+        cards = super().remove_from_bottom(split_index)
+        self.__runs = self.__runs_of(self)
+        return cards
+
+    def copy(self) -> Self:
+        pile = super().copy()
+        pile.__visibles = self.__visibles.copy()
+        pile.__visible_indices = self.__visible_indices.copy()
+        pile.__visibility_hash = self.__visibility_hash
+        pile.__runs = self.__runs.copy()
+        return pile
+
+    def save_state(self) -> tuple:
+        return tuple(self), tuple(self.__visibles)
+
+    def __reduce__(self):
+        return self.__class__, (Cards(),), self.save_state()
+
+    def __setstate__(self, state: tuple) -> None:
+        self.restore_state(state)
+        return None
+
+    def restore_state(self, state: tuple) -> None:
+        cards, visibles = state
+        self[:] = cards
+        self.__visibles = list(visibles)
+        self.__visible_indices = self.__indices_of_visibles(self.__visibles)
+        self.__visibility_hash = self.__visibility_hash_of(self.__visible_indices)
+        self.__runs = self.__runs_of(self)
+        return None
 
     def shuffle(self) -> None:
         raise NotImplementedError("Not supported yet for PlayCardPile")
@@ -93,21 +382,55 @@ class PlayCardPile(CardPile):
         raise NotImplementedError("Not supported yet for PlayCardPile")
 
     def contains_min_length_run(self, run_length: int = 4) -> bool:
-        if len(self) < run_length:
-            return False
-        total_run = 1
-        major_value = self[0].value
-
-        for card in self[1:]:
-            if card.value == major_value:
-                total_run += 1
+        return self.longest_run >= run_length
+
+    def __push_run(self, value: CardValue) -> None:
+        runs = self.__runs
+        if runs and runs[-1][0] == value:
+            _, length, longest = runs[-1]
+            runs[-1] = (value, length + 1, max(longest, length + 1))
+            return None
+        longest_below = runs[-1][2] if runs else 0
+        runs.append((value, 1, max(longest_below, 1)))
+        return None
+
+    def __pop_run(self) -> None:
+        runs = self.__runs
+        value, length, _ = runs.pop()
+        if length > 1:
+            longest_below = runs[-1][2] if runs else 0
+            runs.append((value, length - 1, max(longest_below, length - 1)))
+        return None
+
+    @staticmethod
+    def __runs_of(cards: Cards) -> list[tuple[CardValue, int, int]]:
+        """ Run length encoding of the pile's values, bottom first: (value, length, longest run up to here)."""
+        runs = []
+        longest = 0
+        for card in cards:
+            value = card.value
+            if runs and runs[-1][0] == value:
+                length = runs[-1][1] + 1
+                longest = max(longest, length)
+                runs[-1] = (value, length, longest)
             else:
-                total_run = 1
-                major_value = card.value
+                longest = max(longest, 1)
+                runs.append((value, 1, longest))
+        return runs
+
+    @staticmethod
+    def __visibility_hash_of(visible_indices: list[int]) -> int:
+        if visible_indices and visible_indices[-1] >= len(VISIBLE_KEYS):
+            extend_zobrist_keys(VISIBLE_KEYS, "visibles", visible_indices[-1] + 1)
+        visibility_hash = 0
+        for i in visible_indices:
+            visibility_hash ^= VISIBLE_KEYS[i]
+        return visibility_hash
 
-            if total_run == run_length:
-                return True
-        return False
+    @staticmethod
+    def __indices_of_visibles(visibles: list[int]) -> list[int]:
+        """ Ascending, so the top visible card is always the last entry."""
+        return [i for i, visible in enumerate(visibles) if visible]
 
     @staticmethod
     def __are_visibles(cards: Cards) -> list[int]:
@@ -125,3 +448,24 @@ class PlayCardPile(CardPile):
             if value == CardValue.JACK and i != 0 and values[i-1] == CardValue.FOUR:
                 visibles[i] = False
         return visibles
+
+
+def _positions_hash(cards: Reversible[Card], first_position: int = 0) -> int:
+    """ The hash terms of cards placed from first_position up, by Horner's rule from the top."""
+    zobrist_hash = 0
+    for card in reversed(cards):
+        zobrist_hash = (zobrist_hash * POSITION_BASE + SLOT_KEYS[card.id // NUMBER_OF_SUITS]) & MASK_64
+    if first_position == 0:
+        return zobrist_hash
+    return zobrist_hash * _position_power(first_position) & MASK_64
+
+
+def _position_term(card: Card, position: int) -> int:
+    return SLOT_KEYS[card.id // NUMBER_OF_SUITS] * _position_power(position)
+
+
+def _position_power(position: int) -> int:
+    if position >= len(POSITION_POWERS):
+        for _ in range(len(POSITION_POWERS), position + 1):
+            POSITION_POWERS.append(POSITION_POWERS[-1] * POSITION_BASE & MASK_64)
+    return POSITION_POWERS[position]
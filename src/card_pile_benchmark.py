@@ -0,0 +1,40 @@
+from typing import Callable
+
+import timeit
+
+from src.cards import Cards, CARD_TABLE
+from src.card_pile import CardPile, DequeCardPile
+
+type PileConstructor = Callable[[Cards], CardPile | DequeCardPile]
+
+PILE_SIZES = (10, 100, 1000, 10000)
+
+
+def _cards(number_of_cards: int) -> Cards:
+    return Cards(CARD_TABLE[i % len(CARD_TABLE)] for i in range(number_of_cards))
+
+
+def time_remove_from_bottom(pile_constructor: PileConstructor, pile_size: int, number: int = 2000) -> float:
+    """ Seconds per king resurrection (two cards taken from the bottom and put back on top, so the size holds)."""
+    pile = pile_constructor(_cards(pile_size))
+    return timeit.timeit(lambda: pile.add_cards(pile.remove_from_bottom(2)), number=number) / number
+
+
+def time_burn(pile_constructor: PileConstructor, pile_size: int, number: int = 2000) -> float:
+    """ Seconds per five card play pile moved onto a pile that already holds pile_size cards."""
+    pile = pile_constructor(_cards(pile_size))
+    play_pile = _cards(5)
+    return timeit.timeit(lambda: pile.add_cards(play_pile), number=number) / number
+
+
+def main():
+    print(f"{'pile size':>10} {'operation':>18} {'CardPile':>12} {'DequeCardPile':>14}")
+    for pile_size in PILE_SIZES:
+        for operation_name, benchmark in (("remove_from_bottom", time_remove_from_bottom), ("burn", time_burn)):
+            list_time = benchmark(CardPile, pile_size)
+            deque_time = benchmark(DequeCardPile, pile_size)
+            print(f"{pile_size:>10} {operation_name:>18} {list_time * 1e6:>10.2f}us {deque_time * 1e6:>12.2f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
+import random
 import unittest
 
+from itertools import groupby
+
 from src.cards import Cards, Card, CardValue, CardSuit, SUITS
-from src.card_pile import PlayCardPile
+from src.card_pile import CardPile, DequeCardPile, PlayCardPile
 
 
 class TestPlayCardPile_TopVisibleCard(unittest.TestCase):
@@ -38,11 +41,73 @@ class TestPlayCardPile_TopVisibleCard(unittest.TestCase):
             pile = self.__from_values([value, 4, 4, 4, 11, 4])
             self.assertEqual(pile.visible_top_card.value, CardValue(value))
 
+    def test_pop_top_uncovers_card_below(self):
+        pile = self.__from_values([9, 4, 4, 7])
+        pile.pop_card()
+        self.assertEqual(pile.visible_top_card.value, CardValue.NINE)
+        pile.pop_card()
+        self.assertEqual(pile.visible_top_card.value, CardValue.NINE)
+
+    def test_tracks_every_mutation(self):
+        rng = random.Random(0)
+        pile = self.__from_values([])
+        for _ in range(2000):
+            operation = rng.randrange(6)
+            if operation <= 1 or not pile:
+                pile.add_card(Card(SUITS[0], CardValue(rng.choice([3, 4, 4, 9, 11]))))
+            elif operation == 2:
+                pile.pop_card(rng.randrange(len(pile)))
+            elif operation == 3:
+                pile.pop_multiple(rng.sample(range(len(pile)), rng.randint(1, len(pile))))
+            elif operation == 4:
+                pile.remove_from_bottom(rng.randint(0, len(pile)))
+            else:
+                state = pile.save_state()
+                pile.clear()
+                pile.restore_state(state)
+            expected = next((pile[i] for i in range(len(pile) - 1, -1, -1) if pile.visibles[i]), None)
+            self.assertIs(pile.visible_top_card, expected)
+
     @staticmethod
     def __from_values(values: list[int], default_suit: CardSuit=SUITS[0]):
         return PlayCardPile(Cards([Card(default_suit, CardValue(value)) for value in values]))
 
 
+class TestPlayCardPile_Runs(unittest.TestCase):
+    def test_empty(self):
+        pile = PlayCardPile.empty()
+        self.assertIsNone(pile.top_run)
+        self.assertFalse(pile.contains_min_length_run(4))
+
+    def test_run_below_top(self):
+        pile = PlayCardPile(Cards([Card(SUITS[0], CardValue(value)) for value in [3, 9, 9, 9, 9, 5]]))
+        self.assertTrue(pile.contains_min_length_run(4))
+        self.assertFalse(pile.contains_min_length_run(5))
+        self.assertEqual(pile.top_run, (CardValue.FIVE, 1))
+
+    def test_pop_breaks_run(self):
+        pile = PlayCardPile(Cards([Card(SUITS[0], CardValue(value)) for value in [3, 9, 9, 9, 9]]))
+        pile.pop_card()
+        self.assertFalse(pile.contains_min_length_run(4))
+        self.assertEqual(pile.top_run, (CardValue.NINE, 3))
+
+    def test_tracks_every_mutation(self):
+        rng = random.Random(1)
+        pile = PlayCardPile.empty()
+        for _ in range(2000):
+            operation = rng.randrange(6)
+            if operation <= 2 or not pile:
+                pile.add_cards(Cards([Card(SUITS[0], CardValue(rng.choice([3, 9])))] * rng.randint(1, 3)))
+            elif operation == 3:
+                pile.pop_card(rng.choice([-1, rng.randrange(len(pile))]))
+            elif operation == 4:
+                pile.pop_multiple(rng.sample(range(len(pile)), rng.randint(1, len(pile))))
+            else:
+                pile.remove_from_bottom(rng.randint(0, len(pile) // 2))
+            longest = max((len(list(run)) for _, run in groupby(pile.values)), default=0)
+            self.assertEqual(pile.longest_run, longest)
+
+
 class TestPlayCardPile_VisibleCards(unittest.TestCase):
     always_visibles = [2, 3, 5, 7, 8, 9, 10, 12, 13, 14, 15]
     sometimes_invisible = [6, 11]
@@ -166,5 +231,56 @@ class TestPlayCardPile_VisibleCards(unittest.TestCase):
         return PlayCardPile(self.__cards_from_values(values, default_suit=default_suit))
 
 
+class TestDequeCardPile(unittest.TestCase):
+    def test_remove_from_bottom(self):
+        pile = DequeCardPile(self.__cards_from_values([3, 5, 7, 9]))
+        removed = pile.remove_from_bottom(2)
+        self.assertIsInstance(removed, Cards)
+        self.assertEqual(removed.values, (CardValue.THREE, CardValue.FIVE))
+        self.assertEqual(pile.values, (CardValue.SEVEN, CardValue.NINE))
+
+    def test_remove_from_bottom_more_than_held(self):
+        pile = DequeCardPile(self.__cards_from_values([3]))
+        self.assertEqual(len(pile.remove_from_bottom(3)), 1)
+        self.assertFalse(pile)
+
+    def test_add_cards_and_pop(self):
+        pile = DequeCardPile.empty()
+        pile.add_cards(self.__cards_from_values([3, 15, 15]))
+        self.assertEqual(pile.count_value(CardValue.JOKER), 2)
+        self.assertEqual(pile.pop_card().value, CardValue.JOKER)
+        self.assertEqual(pile.pop_card(0).value, CardValue.THREE)
+
+    def test_save_restore(self):
+        pile = DequeCardPile(self.__cards_from_values([3, 5]))
+        state = pile.save_state()
+        pile.remove_from_bottom(1)
+        pile.restore_state(state)
+        self.assertEqual(pile.values, (CardValue.THREE, CardValue.FIVE))
+        self.assertEqual(repr(pile), repr(Cards(pile)))
+
+    def test_hash_follows_remove_from_bottom(self):
+        pile = DequeCardPile(self.__cards_from_values([3, 5, 7, 9, 12]))
+        pile.remove_from_bottom(2)
+        pile.add_cards(self.__cards_from_values([4]))
+        self.assertEqual(pile.zobrist_hash, DequeCardPile(self.__cards_from_values([7, 9, 12, 4])).zobrist_hash)
+        self.assertEqual(pile.zobrist_hash, CardPile(self.__cards_from_values([7, 9, 12, 4])).zobrist_hash)
+        self.assertNotEqual(pile.zobrist_hash, CardPile(self.__cards_from_values([9, 7, 12, 4])).zobrist_hash)
+
+    def test_hash_has_no_size_limit(self):
+        values = [2 + i % 13 for i in range(500)]
+        pile = DequeCardPile.empty()
+        list_pile = CardPile(Cards())
+        for value in values:
+            pile.add_cards(self.__cards_from_values([value]))
+            list_pile.append(Card(SUITS[0], CardValue(value)))
+        self.assertEqual(pile.zobrist_hash, CardPile(self.__cards_from_values(values)).zobrist_hash)
+        self.assertEqual(list_pile.zobrist_hash, pile.zobrist_hash)
+        self.assertEqual(len(PlayCardPile(self.__cards_from_values(values)).visibles), 500)
+
+    @staticmethod
+    def __cards_from_values(values: list[int], default_suit: CardSuit = SUITS[0]) -> Cards:
+        return Cards([Card(default_suit, CardValue(value)) for value in values])
+
 if __name__ == '__main__':
     unittest.main()
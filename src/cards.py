@@ -1,49 +1,80 @@
 from __future__ import annotations
 
 import random
-from enum import Enum
+from enum import Enum, IntEnum
 
 from collections import Counter
 
-from typing import Iterable, TypeVar
+from typing import Iterable, Self, TypeVar
+
+from src.utils.zobrist import zobrist_keys
 
 
 type CardValueCounts = dict[CardValue, int]
 
 
 class Card:
+    """ Immutable. suit, value and id are plain slots, so reading them costs no Python call."""
+
+    __slots__ = ("suit", "value", "id")
+
+    suit: CardSuit
+    value: CardValue
+    id: int  # Small int in [0, 56): four suits per value, values in ascending order, jokers last
+
     def __init__(self, suit: CardSuit, value: CardValue):
-        self.__suit = suit
-        self.__value = value
+        object.__setattr__(self, "suit", suit)
+        object.__setattr__(self, "value", value)
+        object.__setattr__(self, "id", card_id(suit, value))
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"Card is immutable, cannot set \'{name}\'")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"Card is immutable, cannot delete \'{name}\'")
 
     def __hash__(self):
-        return hash((self.value, self.suit.name))
+        return self.id
 
     def __repr__(self) -> str:
-        return f"{CARD_VALUE_NAMES[self.__value.value]}{self.__suit}"
+        return f"{CARD_VALUE_NAMES[self.value]}{self.suit}"
 
     def __eq__(self, other: Card) -> bool:
-        return self.suit == other.suit and self.value == other.value
+        if self is other:
+            return True
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self.id == other.id
+
+    def __reduce__(self):
+        return Card.from_id, (self.id,)
+
+    def __copy__(self) -> Card:
+        return self
+
+    def __deepcopy__(self, memo) -> Card:
+        return self
+
+    @classmethod
+    def interned(cls, suit: CardSuit, value: CardValue) -> Card:
+        """ The shared instance from CARD_TABLE. Cards are immutable, so there is never a need for another."""
+        return CARD_TABLE[card_id(suit, value)]
+
+    @classmethod
+    def from_id(cls, card_id: int) -> Card:
+        return CARD_TABLE[card_id]
 
     def __gt__(self, other: Card) -> bool:
-        return self.value.value > other.value.value
+        return self.value > other.value
 
     def __lt__(self, other: Card) -> bool:
-        return self.value.value < other.value.value
+        return self.value < other.value
 
     def __ge__(self, other: Card) -> bool:
-        return self.value.value >= other.value.value
+        return self.value >= other.value
 
     def __le__(self, other: Card) -> bool:
-        return self.value.value <= other.value.value
-
-    @property
-    def suit(self) -> CardSuit:
-        return self.__suit
-
-    @property
-    def value(self) -> CardValue:
-        return self.__value
+        return self.value <= other.value
 
 
 CARD = TypeVar("CARD", bound=Card)
@@ -75,8 +106,7 @@ class Cards(list[Card]):
         return None
 
     def add_cards(self, cards: Cards) -> None:
-        for card in cards:
-            self.add_card(card)
+        self.extend(cards)
         return None
 
     def pop_multiple(self, indices: Iterable[int]) -> Cards:
@@ -95,45 +125,77 @@ class Cards(list[Card]):
         return None
 
     def contains(self, cards: Cards) -> bool:
-        return len(self.search(cards)) == len(cards)
+        if len(cards) > len(self):
+            return False
+        return not Counter(cards) - Counter(self)
 
     def is_exclusively(self, card_value: CardValue) -> bool:
         return all(card.value == card_value for card in self)
 
+    def positions(self) -> dict[Card, list[int]]:
+        """ Ascending indices of every copy of each card."""
+        positions = {}
+        for i, card in enumerate(self):
+            card_positions = positions.get(card)
+            if card_positions is None:
+                positions[card] = [i]
+            else:
+                card_positions.append(i)
+        return positions
+
     def search(self, cards: Cards) -> list[int]:
-        # TODO Use binary search to speed it up a BIT
-        target_cards = cards.copy()
-        self_copy = self.copy()
+        """ Index of each card found, last target first. Every target takes the highest index not yet taken."""
+        positions = self.positions()
         indices = []
-        for i in range(len(target_cards) - 1, -1, -1):
-            target_card = target_cards[i]
-            for j in range(len(self_copy) - 1, -1, -1):
-                card_checking = self_copy[j]
-                if target_card == card_checking:
-                    indices.append(j)
-                    target_cards.pop(i)
+        for target_card in reversed(cards):
+            card_positions = positions.get(target_card)
+            if card_positions:
+                indices.append(card_positions.pop())
         return indices
 
     def remove(self, cards: Cards) -> Cards:
         """ LIST difference (order preserved, duplicates preserved). self = x - y and returns (x - y)"""
         removed_cards = Cards()
         targets_counts = Counter(cards)
-        leftovers = Cards()
+        number_remaining = len(cards)
+        leftovers = []
         for i, x in enumerate(self):
-            if x in targets_counts and targets_counts[x] > 0:
+            if number_remaining == 0:
+                leftovers.extend(self[i:])
+                break
+            if targets_counts.get(x, 0) > 0:
                 targets_counts[x] -= 1
-                removed_cards.add_card(x)
+                number_remaining -= 1
+                removed_cards.append(x)
             else:
-                leftovers.add_card(x)
+                leftovers.append(x)
         self[:] = leftovers
         return removed_cards
 
+    def copy(self) -> Self:
+        return self.__class__(self)
+
+    def save_state(self) -> tuple:
+        return tuple(self)
+
+    def restore_state(self, state: tuple) -> None:
+        self[:] = state
+        return None
+
     def get(self, indices: list[int]) -> Cards:
         return Cards((self[i] for i in indices))
 
     def count_value(self, target_value: CardValue) -> int:
         return sum(1 if card.value == target_value else 0 for card in self)
 
+    @property
+    def value_counts(self) -> tuple[int, ...]:
+        """ Count of each CardValue, TWO first and JOKER last."""
+        counts = [0 for _ in range(NUMBER_OF_CARD_VALUES)]
+        for card in self:
+            counts[card.id // NUMBER_OF_SUITS] += 1
+        return tuple(counts)
+
     @property
     def values(self) -> list[CardValue]:
         if not self:
@@ -141,11 +203,151 @@ class Cards(list[Card]):
         return tuple(card.value for card in self)
 
 
+class CountedCards(Cards):
+    """ Cards that also keep how many of each CardValue they hold (slot value - 2), updated on every mutation.
+
+        zobrist_hash is kept alongside: the k-th copy of a value held XORs in COPY_KEYS[slot][k], so it only
+        depends on the value counts, never on order or suits."""
+
+    def __init__(self, cards: Iterable[Card] | None = None):
+        super().__init__(cards)
+        self.__counts = [0 for _ in range(NUMBER_OF_CARD_VALUES)]
+        self.__hash = 0
+        self.__add_counts(self)
+
+    def append(self, card: Card) -> None:
+        super().append(card)
+        slot = card.id // NUMBER_OF_SUITS
+        count = self.__counts[slot]
+        self.__counts[slot] = count + 1
+        self.__hash ^= COPY_KEYS[slot][count]
+        return None
+
+    def insert(self, index: int, card: Card) -> None:
+        super().insert(index, card)
+        self.__add_count(card)
+        return None
+
+    def extend(self, cards: Iterable[Card]) -> None:
+        cards = list(cards)
+        super().extend(cards)
+        self.__add_counts(cards)
+        return None
+
+    def __iadd__(self, cards: Iterable[Card]) -> Self:
+        self.extend(cards)
+        return self
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+    def pop(self, index: int = -1) -> Card:
+        card = super().pop(index)
+        slot = card.id // NUMBER_OF_SUITS
+        count = self.__counts[slot] - 1
+        self.__counts[slot] = count
+        self.__hash ^= COPY_KEYS[slot][count]
+        return card
+
+    def clear(self) -> None:
+        super().clear()
+        self.__counts = [0 for _ in range(NUMBER_OF_CARD_VALUES)]
+        self.__hash = 0
+        return None
+
+    def __setitem__(self, key: int | slice, value: Card | Iterable[Card]) -> None:
+        if isinstance(key, slice):
+            value = list(value)
+            self.__remove_counts(super().__getitem__(key))
+            super().__setitem__(key, value)
+            self.__add_counts(value)
+            return None
+        self.__remove_count(super().__getitem__(key))
+        super().__setitem__(key, value)
+        self.__add_count(value)
+        return None
+
+    def __delitem__(self, key: int | slice) -> None:
+        removed = super().__getitem__(key)
+        super().__delitem__(key)
+        if isinstance(key, slice):
+            self.__remove_counts(removed)
+        else:
+            self.__remove_count(removed)
+        return None
+
+    def shuffle(self) -> None:
+        shuffled = list(self)
+        random.shuffle(shuffled)
+        super().__setitem__(slice(None), shuffled)  # Same cards, so the counts stand
+        return None
+
+    def count_value(self, target_value: CardValue) -> int:
+        return self.__counts[target_value.value - 2]
+
+    @property
+    def value_counts(self) -> tuple[int, ...]:
+        """ Count of each CardValue, TWO first and JOKER last."""
+        return tuple(self.__counts)
+
+    @property
+    def zobrist_hash(self) -> int:
+        return self.__hash
+
+    def __add_count(self, card: Card) -> None:
+        slot = card.id // NUMBER_OF_SUITS
+        count = self.__counts[slot]
+        self.__counts[slot] = count + 1
+        self.__hash ^= COPY_KEYS[slot][count]
+        return None
+
+    def __remove_count(self, card: Card) -> None:
+        slot = card.id // NUMBER_OF_SUITS
+        count = self.__counts[slot] - 1
+        self.__counts[slot] = count
+        self.__hash ^= COPY_KEYS[slot][count]
+        return None
+
+    def __add_counts(self, cards: Iterable[Card]) -> None:
+        counts = self.__counts
+        zobrist_hash = self.__hash
+        for card in cards:
+            slot = card.id // NUMBER_OF_SUITS
+            count = counts[slot]
+            counts[slot] = count + 1
+            zobrist_hash ^= COPY_KEYS[slot][count]
+        self.__hash = zobrist_hash
+        return None
+
+    def __remove_counts(self, cards: Iterable[Card]) -> None:
+        counts = self.__counts
+        zobrist_hash = self.__hash
+        for card in cards:
+            slot = card.id // NUMBER_OF_SUITS
+            count = counts[slot] - 1
+            counts[slot] = count
+            zobrist_hash ^= COPY_KEYS[slot][count]
+        self.__hash = zobrist_hash
+        return None
+
+
 class CardSuit:
-    def __init__(self, colour: CardColor, name: str, shorthand: str):
-        self.colour = colour
-        self.name = name
-        self.shorthand = shorthand
+    __slots__ = ("colour", "name", "shorthand")
+
+    colour: int
+    name: str
+    shorthand: str
+
+    def __init__(self, colour: int, name: str, shorthand: str):
+        object.__setattr__(self, "colour", colour)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "shorthand", shorthand)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"CardSuit is immutable, cannot set \'{name}\'")
+
+    def __reduce__(self):
+        return CardSuit, (self.colour, self.name, self.shorthand)
 
     def __repr__(self) -> str:
         return self.shorthand
@@ -156,7 +358,8 @@ class CardColor:
     BLACK = 1
 
 
-class CardValue(Enum):
+class CardValue(IntEnum):
+    """ Compares, orders and hashes as its int, natively. Printing still shows the member name."""
     TWO = 2
     THREE = 3
     FOUR = 4
@@ -175,11 +378,11 @@ class CardValue(Enum):
     def __repr__(self) -> str:
         return f"{self.name}"
 
-    def __hash__(self):
-        return hash(self.value)
+    __str__ = Enum.__str__
+    __format__ = Enum.__format__
+
 
-    def __eq__(self, other: CardValue) -> bool:
-        return self.value == other.value
+NUMBER_OF_CARD_VALUES = len(CardValue)
 
 
 CARD_VALUE_NAMES = ({x: str(x) for x in range(2, 10)} |
@@ -193,6 +396,20 @@ SUITS = (CardSuit(CardColor.RED, "Hearts", "♥"),
          CardSuit(CardColor.BLACK, "Spades", "♠"))
 
 
+NUMBER_OF_SUITS = len(SUITS)
+MAX_JOKERS = NUMBER_OF_SUITS  # Combos hold at most NUMBER_OF_SUITS cards of a value, jokers included
+SUIT_INDICES = {suit.name: i for i, suit in enumerate(SUITS)}
+
+
+def card_id(suit: CardSuit, value: CardValue) -> int:
+    return (value.value - 2) * len(SUITS) + SUIT_INDICES[suit.name]
+
+
+CARD_TABLE: tuple[Card, ...] = tuple(Card(suit, value) for value in CardValue for suit in SUITS)
+MAX_ZOBRIST_CARDS = 2 * len(CARD_TABLE)  # Room for extra jokers
+COPY_KEYS = zobrist_keys("copies", NUMBER_OF_CARD_VALUES, MAX_ZOBRIST_CARDS)
+
+
 def non_six_value(counts: CardValueCounts) -> CardValue:
     keys = list(counts.keys())
     card_value1 = keys[0]
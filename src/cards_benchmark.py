@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from enum import Enum
+
+from typing import Callable
+
+import timeit
+
+from src.cards import CARD_TABLE, CardValue
+
+
+class LegacyCardValue(Enum):
+    """ CardValue as it was: a plain Enum with Python level __eq__ and __hash__."""
+    TWO = 2
+    THREE = 3
+    FOUR = 4
+    FIVE = 5
+    SIX = 6
+    SEVEN = 7
+    EIGHT = 8
+    NINE = 9
+    TEN = 10
+    JACK = 11
+    QUEEN = 12
+    KING = 13
+    ACE = 14
+    JOKER = 15
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __eq__(self, other: LegacyCardValue) -> bool:
+        return self.value == other.value
+
+
+class LegacyCard:
+    """ Card as it was: name mangled attributes behind properties, no slots."""
+
+    def __init__(self, suit, value: LegacyCardValue, card_id: int):
+        self.__suit = suit
+        self.__value = value
+        self.__id = card_id
+
+    def __hash__(self):
+        return self.__id
+
+    def __eq__(self, other: LegacyCard) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, LegacyCard):
+            return NotImplemented
+        return self.__id == other.__id
+
+    def __ge__(self, other: LegacyCard) -> bool:
+        return self.value.value >= other.value.value
+
+    @property
+    def suit(self):
+        return self.__suit
+
+    @property
+    def value(self) -> LegacyCardValue:
+        return self.__value
+
+    @property
+    def id(self) -> int:
+        return self.__id
+
+
+LEGACY_CARD_TABLE = tuple(LegacyCard(card.suit, LegacyCardValue(card.value.value), card.id) for card in CARD_TABLE)
+
+
+def comparisons_per_second(comparison: Callable[[object, object], bool], cards: tuple, number: int = 20) -> float:
+    pairs = [(a, b) for a in cards for b in cards]
+    seconds = timeit.timeit(lambda: [comparison(a, b) for a, b in pairs], number=number)
+    return number * len(pairs) / seconds
+
+
+def benchmarks(card_value_type) -> dict[str, Callable[[object, object], bool]]:
+    joker = card_value_type.JOKER
+    always_legal = {card_value_type.TWO, card_value_type.FOUR}
+    return {"card == card": lambda a, b: a == b,
+            "card >= card": lambda a, b: a >= b,
+            "value == JOKER": lambda a, b: a.value == joker,
+            "value in always legal": lambda a, b: a.value in always_legal,
+            "value.value >= value.value": lambda a, b: a.value.value >= b.value.value}
+
+
+def main():
+    before = benchmarks(LegacyCardValue)
+    after = benchmarks(CardValue)
+    print(f"{'comparison':>28} {'before (M/s)':>13} {'after (M/s)':>12} {'speedup':>8}")
+    for name in before:
+        before_rate = comparisons_per_second(before[name], LEGACY_CARD_TABLE)
+        after_rate = comparisons_per_second(after[name], CARD_TABLE)
+        print(f"{name:>28} {before_rate / 1e6:>13.2f} {after_rate / 1e6:>12.2f} {after_rate / before_rate:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 import unittest
 
-from src.cards import Cards, Card, CardSuit, CardValue, SUITS
+import pickle
+import random
+
+from src.cards import Cards, Card, CardSuit, CardValue, SUITS, CARD_TABLE
+from src.hand import Hand
+from src.karma import KarmaFaceUp
 
 
 class TestCards_Creation(unittest.TestCase):
@@ -35,6 +40,112 @@ class TestCards_Creation(unittest.TestCase):
         self.assertTrue(cards.contains(Cards([c2])))
         self.assertTrue(cards.contains(Cards([c6])))
 
+    def test_contains_counts_duplicates(self):
+        c5 = Card(SUITS[0], CardValue(5))
+        cards = Cards([c5, c5, Card(SUITS[1], CardValue(7))])
+        self.assertTrue(cards.contains(Cards([c5, c5])))
+        self.assertFalse(cards.contains(Cards([c5, c5, c5])))
+
+    def test_search_last_target_first(self):
+        c2, c6, c9 = (Card(SUITS[0], CardValue(value)) for value in (2, 6, 9))
+        cards = Cards([c9, c2, c6])
+        self.assertEqual(cards.search(Cards([c2, c6])), [2, 1])
+        self.assertEqual(cards.search(Cards([c2, Card(SUITS[3], CardValue(8))])), [1])
+
+    def test_search_duplicates_take_distinct_indices(self):
+        c5 = Card(SUITS[0], CardValue(5))
+        cards = Cards([c5, Card(SUITS[1], CardValue(7)), c5])
+        self.assertEqual(cards.search(Cards([c5, c5])), [2, 0])
+
+    def test_remove_preserves_order(self):
+        c3, c5, c7 = (Card(SUITS[0], CardValue(value)) for value in (3, 5, 7))
+        cards = Cards([c5, c3, c5, c7])
+        removed = cards.remove(Cards([c5, c3]))
+        self.assertEqual(removed, Cards([c5, c3]))
+        self.assertEqual(cards, Cards([c5, c7]))
+
+
+
+class TestCard_Immutable(unittest.TestCase):
+    def test_card_is_immutable(self):
+        card = CARD_TABLE[0]
+        with self.assertRaises(AttributeError):
+            card.value = CardValue.ACE
+        with self.assertRaises(AttributeError):
+            card.extra = 1
+
+    def test_suit_is_immutable(self):
+        with self.assertRaises(AttributeError):
+            SUITS[0].name = "Cups"
+
+    def test_card_value_is_native_int(self):
+        self.assertEqual(CardValue.FIVE, 5)
+        self.assertLess(CardValue.FIVE, CardValue.SIX)
+        self.assertEqual(hash(CardValue.KING), 13)
+        self.assertEqual(repr(CardValue.KING), "KING")
+        self.assertEqual(str(CardValue.KING), "CardValue.KING")
+
+
+class TestCard_Interning(unittest.TestCase):
+    def test_table_ids(self):
+        self.assertEqual(len(CARD_TABLE), 56)
+        for i, card in enumerate(CARD_TABLE):
+            self.assertEqual(card.id, i)
+            self.assertIs(Card.from_id(i), card)
+
+    def test_interned_is_shared(self):
+        card = Card.interned(SUITS[3], CardValue.QUEEN)
+        self.assertIs(card, Card.interned(SUITS[3], CardValue.QUEEN))
+        self.assertEqual(card.suit.name, SUITS[3].name)
+        self.assertEqual(card.value, CardValue.QUEEN)
+
+    def test_equal_to_constructed(self):
+        for card in CARD_TABLE:
+            constructed = Card(card.suit, card.value)
+            self.assertEqual(card, constructed)
+            self.assertEqual(hash(card), hash(constructed))
+        self.assertNotEqual(Card(SUITS[0], CardValue.TWO), Card(SUITS[1], CardValue.TWO))
+
+    def test_pickle_keeps_interning(self):
+        card = Card.interned(SUITS[1], CardValue.JOKER)
+        self.assertIs(pickle.loads(pickle.dumps(card)), card)
+
+
+
+class TestCountedCards(unittest.TestCase):
+    def test_init_counts(self):
+        hand = Hand(Cards([Card.from_id(0), Card.from_id(1), Card.from_id(55)]))
+        self.assertEqual(hand.count_value(CardValue.TWO), 2)
+        self.assertEqual(hand.count_value(CardValue.JOKER), 1)
+        self.assertEqual(sum(hand.value_counts), 3)
+
+    def test_counts_follow_mutations(self):
+        random.seed(0)
+        for cards_class in (Hand, KarmaFaceUp):
+            cards = cards_class(Cards(random.sample(CARD_TABLE, 5)))
+            for _ in range(300):
+                operation = random.randrange(9)
+                if operation == 0:
+                    cards.add_card(random.choice(CARD_TABLE))
+                elif operation == 1:
+                    cards.add_cards(Cards(random.sample(CARD_TABLE, 3)))
+                elif operation == 2 and cards:
+                    cards.pop(random.randrange(len(cards)))
+                elif operation == 3 and cards:
+                    cards.pop_multiple(random.sample(range(len(cards)), min(2, len(cards))))
+                elif operation == 4 and cards:
+                    cards.remove(Cards([random.choice(cards)]))
+                elif operation == 5 and cards:
+                    cards.swap(random.randrange(len(cards)), random.choice(CARD_TABLE))
+                elif operation == 6:
+                    cards.shuffle()
+                elif operation == 7 and cards:
+                    del cards[:random.randrange(len(cards))]
+                elif operation == 8 and random.random() < 0.1:
+                    cards.clear()
+                expected = tuple(sum(1 for card in cards if card.value == value) for value in CardValue)
+                self.assertEqual(cards.value_counts, expected)
+
 
 if __name__ == '__main__':
     unittest.main()
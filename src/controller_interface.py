@@ -2,8 +2,9 @@ from abc import ABC, abstractmethod
 
 from typing import Any
 
-from response_conditions import ResponseCondition
-from prompt_manager import Prompt
+from response_conditions import ResponseCondition, IsNumberSelection
+from prompt_manager import Prompt, PromptManager
+from src.cards import CardValue
 
 
 class IController(ABC):
@@ -14,3 +15,23 @@ class IController(ABC):
     @abstractmethod
     def get_response(self, prompts: list[Prompt], output_checks: list[ResponseCondition]) -> list[Any]:
         raise NotImplementedError
+
+    def card_giveaway(self, board, prompt_manager: PromptManager) -> tuple[int, int]:
+        """ (playable card index, target player index) for a single queen give-away."""
+        playable_cards = board.current_player.playable_cards
+        joker_indices = {i for i, card in enumerate(playable_cards) if card.value == CardValue.JOKER}
+        card_index_selected = self.get_response([prompt_manager["give_away"]],
+                                                [IsNumberSelection(0, len(playable_cards) - 1, 1,
+                                                                   exclude=joker_indices)])
+        excluded_target_players = board.potential_winner_indices | {board.player_index}
+        target_player_index = self.get_response([prompt_manager["give_away_select_player"]],
+                                                [IsNumberSelection(0, len(board.players) - 1, 1,
+                                                                   exclude=excluded_target_players)])
+        return card_index_selected[0], target_player_index[0]
+
+    def joker_target_index(self, board, prompt_manager: PromptManager) -> int:
+        target_index = self.get_response([prompt_manager["joker_select_player"]],
+                                         [IsNumberSelection(0, len(board.players) - 1,
+                                                            max_selection_count=1,
+                                                            exclude=board.player_index)])
+        return target_index[0]
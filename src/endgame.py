@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+from typing import Callable, Iterator
+
+from src.action_space import ActionIdController, ActionPhase
+from src.board import Board
+from src.board_interface import IBoard
+from src.utils.lru_cache import LRUCache
+from src.utils.zobrist import mix
+
+type Move = tuple[int | None, tuple[int, ...]]  # Turn action id (None to pass) and the in-combo decision ids
+
+WIN, DRAW, LOSS = 1, 0, -1
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class EndgameResult:
+    def __init__(self, value: int, action_id: int | None, decision_ids: tuple[int, ...], depth: int,
+                 number_of_nodes: int):
+        self.value = value
+        self.action_id = action_id
+        self.decision_ids = decision_ids
+        self.depth = depth
+        self.number_of_nodes = number_of_nodes
+
+    def __repr__(self) -> str:
+        return (f"EndgameResult(value={self.value}, action_id={self.action_id}, decision_ids={self.decision_ids}, "
+                f"depth={self.depth}, number_of_nodes={self.number_of_nodes})")
+
+    @property
+    def is_proven(self) -> bool:
+        """ A forced win or loss. A draw only means nothing was forced within depth turns."""
+        return self.value != DRAW
+
+
+class NodeBudgetExceeded(Exception):
+    pass
+
+
+class EndgameSolver:
+    """ Iterative deepening alpha-beta over whole turns, for the player to move against the one other player
+        still holding cards. A move is a turn action plus every give-away and joker target it asks for.
+
+        Positions are keyed by their Zobrist state_hash (salted by the solving player) in a bounded transposition
+        table that is kept between solves. Wins and losses are proven, so they are reused at any depth. A draw
+        means nothing was forced within the horizon (endless pickup loops included)."""
+
+    def __init__(self, max_cards: int = 12, max_turns: int = 40, max_nodes: int = 200_000,
+                 table_size: int = 1 << 18):
+        self.max_cards = max_cards
+        self.max_turns = max_turns
+        self.max_nodes = max_nodes
+        self.table = LRUCache(max_size=table_size)
+        self.__number_of_nodes = 0
+
+    def applies_to(self, board: IBoard) -> bool:
+        """ Only two players hold cards, the draw pile is empty and at most max_cards are held. The hands can then
+            be worked out from the rest of the deck and only face down karma is hidden, so solving a
+            determinization is exact once that is gone too."""
+        if board.draw_pile:
+            return False
+        players_with_cards = [player for player in board.players if player.has_cards]
+        if len(players_with_cards) != 2:
+            return False
+        return sum(len(player) for player in players_with_cards) <= self.max_cards
+
+    def solve(self, board: IBoard) -> EndgameResult:
+        """ Searches a clone of board from the start of the current player's turn. Returns the result of the
+            deepest search that finished within max_nodes, stopping early once the value is proven."""
+        hero_index = board.player_index
+        root = board.clone()
+        root.enable_undo_journal()
+        self.__number_of_nodes = 0
+        result = EndgameResult(DRAW, None, (), 0, 0)
+        for depth in range(1, self.max_turns + 1):
+            try:
+                value = self.__search(root, hero_index, depth, LOSS, WIN, root.state_hash)
+            except NodeBudgetExceeded:
+                break
+            move = self.table.get(mix(root.state_hash, hero_index))[3]
+            result = EndgameResult(value, move[0], move[1], depth, self.__number_of_nodes)
+            if value != DRAW:
+                break
+        return result
+
+    def __search(self, board: Board, hero_index: int, depth: int, alpha: int, beta: int, state_hash: int) -> int:
+        key = mix(state_hash, hero_index)  # Salted, as values are from hero_index's side
+        entry = self.table.get(key)
+        table_move = None
+        if entry is not None:
+            value, flag, entry_depth, table_move = entry
+            if entry_depth >= depth or (value == WIN and flag != UPPER) or (value == LOSS and flag != LOWER):
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+        if depth == 0:
+            return DRAW
+
+        original_alpha, original_beta = alpha, beta
+        is_hero_to_move = board.player_index == hero_index
+        best_value = LOSS - 1 if is_hero_to_move else WIN + 1
+        best_move = None
+        seen_child_hashes = set()
+        moves = self.__moves(board, table_move)
+        try:
+            for move in moves:
+                child_hash = board.state_hash
+                if child_hash in seen_child_hashes:
+                    continue  # Give-aways in a different order, or combos with the same outcome
+                seen_child_hashes.add(child_hash)
+                value = _terminal_value(board, hero_index)
+                if value is None:
+                    value = self.__search(board, hero_index, depth - 1, alpha, beta, child_hash)
+                if (value > best_value) if is_hero_to_move else (value < best_value):
+                    best_value = value
+                    best_move = move
+                if is_hero_to_move:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    break
+        finally:
+            moves.close()  # Takes the move and the turn start back off the board
+
+        flag = EXACT
+        if best_value <= original_alpha:
+            flag = UPPER
+        elif best_value >= original_beta:
+            flag = LOWER
+        self.table.put(key, (best_value, flag, depth, best_move))
+        return best_value
+
+    def __moves(self, board: Board, first_move: Move | None) -> Iterator[Move]:
+        """ Plays each move of the current turn in turn, yielding it while it is on the board."""
+        board.start_turn()
+        try:
+            for action_id in _ordered_action_ids(board, first_move):
+                script = []
+                while script is not None:
+                    self.__count_node()
+                    trace = []
+                    decision_ids = []
+                    board.begin_undo_frame()
+                    try:
+                        if action_id is not None:
+                            chooser = _scripted_chooser(script, trace, decision_ids)
+                            board.apply_action_id(action_id, controller=ActionIdController(chooser))
+                        _finish_turn(board)
+                    finally:
+                        board.end_undo_frame()
+                    try:
+                        yield action_id, tuple(decision_ids)
+                    finally:
+                        board.undo()
+                    script = _next_script(trace)
+        finally:
+            board.undo()
+        return None
+
+    def __count_node(self) -> None:
+        self.__number_of_nodes += 1
+        if self.__number_of_nodes > self.max_nodes:
+            raise NodeBudgetExceeded(f"Over {self.max_nodes} nodes")
+        return None
+
+
+def _ordered_action_ids(board: Board, first_move: Move | None) -> list[int | None]:
+    """ The table's move first, then bigger combos before smaller ones and picking up last. Passes when there
+        is nothing to do, the same as Simulator."""
+    action_space = board.action_space
+    action_ids = board.legal_action_ids()
+    if not action_ids:
+        return [None]
+    action_ids.sort(key=lambda x: 1 if x == action_space.PICKUP else -len(action_space.combo(x)))
+    if first_move is not None and first_move[0] in action_ids:
+        action_ids.remove(first_move[0])
+        action_ids.insert(0, first_move[0])
+    return action_ids
+
+
+def _scripted_chooser(script: list[int], trace: list[tuple[int, int]],
+                      decision_ids: list[int]) -> Callable[[IBoard], int]:
+    """ Answers the k-th decision with option script[k] (the first option once the script runs out), noting
+        which option was taken out of how many. Only the multiset of a combo's give-aways matters, so they are
+        made in increasing action id order."""
+    def choose(board: IBoard) -> int:
+        legal_action_ids = board.legal_action_ids()
+        if decision_ids and board.action_phase == ActionPhase.GIVE_AWAY:
+            legal_action_ids = [x for x in legal_action_ids if x >= decision_ids[-1]] or legal_action_ids
+        k = len(trace)
+        choice = script[k] if k < len(script) else 0
+        trace.append((choice, len(legal_action_ids)))
+        decision_ids.append(legal_action_ids[choice])
+        return legal_action_ids[choice]
+    return choose
+
+
+def _next_script(trace: list[tuple[int, int]]) -> list[int] | None:
+    """ The next decision sequence in depth first order, or None once they have all been played."""
+    for i in range(len(trace) - 1, -1, -1):
+        choice, number_of_options = trace[i]
+        if choice + 1 < number_of_options:
+            return [choice for choice, _ in trace[:i]] + [choice + 1]
+    return None
+
+
+def _finish_turn(board: Board) -> None:
+    """ The same turn change as Simulator.play_game."""
+    board.end_turn()
+    board.step_player_index(1)
+    if _is_replaying_burn(board):
+        board.set_player_index(board.player_index_who_started_turn)
+    return None
+
+
+def _is_replaying_burn(board: Board) -> bool:
+    return board.has_burned_this_turn and board.get_player(board.player_index_who_started_turn).has_cards
+
+
+def _terminal_value(board: Board, hero_index: int) -> int | None:
+    """ None while the game goes on, which includes a burning player's replay, as Game only looks for a winner
+        after it. Winner votes are not searched, so they count as draws."""
+    if _is_replaying_burn(board):
+        return None
+    potential_winner_indices = board.potential_winner_indices
+    if not potential_winner_indices:
+        return None
+    if len(potential_winner_indices) == 1 and board.number_of_jokers_in_play == 0:
+        if hero_index in potential_winner_indices:
+            return WIN
+        return LOSS
+    if len(potential_winner_indices) >= 2:
+        return DRAW
+    return None
@@ -0,0 +1,83 @@
+import random
+import unittest
+
+from src.board import Board
+from src.board_seeds import BoardFactory
+from src.cards import CardValue
+from src.endgame import EndgameSolver, WIN, DRAW, LOSS
+from src.frozen_combo import FrozenCombo
+from src.ismcts import ISMCTSBot
+
+
+class TestEndgameSolver(unittest.TestCase):
+    def test_applies_to(self):
+        solver = EndgameSolver(max_cards=6)
+        self.assertTrue(solver.applies_to(_endgame([[[3, 8], [5], []], [[6, 6], [4], []]])))
+        self.assertTrue(solver.applies_to(_endgame([[[3, 8], [], [5]], [[6, 6], [4], []], [[], [], []]])))
+        self.assertFalse(solver.applies_to(_endgame([[[3, 8], [5], []], [[6, 6], [4], []]], draw_pile_values=[2])))
+        self.assertFalse(solver.applies_to(_endgame([[[3, 8], [5], []], [[6, 6], [4], []], [[9], [], []]])))
+        self.assertFalse(solver.applies_to(_endgame([[[3, 8, 9], [5], []], [[6, 6], [4], []]])))
+
+    def test_wins_by_playing_out(self):
+        board = _endgame([[[7, 7], [], []], [[3, 4, 9], [], []]])
+        result = EndgameSolver().solve(board)
+        self.assertEqual(result.value, WIN)
+        self.assertEqual(result.action_id, board.action_space.combo_id(FrozenCombo({CardValue.SEVEN: 2})))
+
+    def test_wins_by_giving_away(self):
+        board = _endgame([[[12, 9], [], []], [[3, 3], [], []]])
+        result = EndgameSolver().solve(board)
+        self.assertEqual(result.value, WIN)
+        self.assertEqual(result.action_id, board.action_space.combo_id(FrozenCombo({CardValue.QUEEN: 1})))
+        self.assertEqual(result.decision_ids, (board.action_space.give_away_id(CardValue.NINE, 1),))
+
+    def test_forced_loss(self):
+        board = _endgame([[[3, 8], [5], []], [[6, 6], [4], []]])
+        result = EndgameSolver().solve(board)
+        self.assertEqual(result.value, LOSS)
+        self.assertGreater(result.depth, 1)
+
+    def test_solving_leaves_board_alone(self):
+        board = _endgame([[[3, 8], [5], []], [[6, 6], [4], []]])
+        state_hash = board.state_hash
+        EndgameSolver().solve(board)
+        self.assertEqual(board.state_hash, state_hash)
+        self.assertEqual(board.undo_depth, 0)
+
+    def test_table_is_reused(self):
+        board = _endgame([[[3, 8], [5], []], [[6, 6], [4], []]])
+        solver = EndgameSolver()
+        first = solver.solve(board)
+        second = solver.solve(board)
+        self.assertEqual(second.value, first.value)
+        self.assertLess(second.number_of_nodes, first.number_of_nodes)
+
+    def test_node_budget(self):
+        board = _endgame([[[3, 8, 11, 13], [5, 9], []], [[6, 6, 10, 14], [4, 7], []]])
+        result = EndgameSolver(max_nodes=30).solve(board)
+        self.assertEqual(result.value, DRAW)
+        self.assertLessEqual(result.number_of_nodes, 30)
+
+
+class TestISMCTSBot_Endgame(unittest.TestCase):
+    def test_plays_the_forced_win(self):
+        board = _endgame([[[12, 9], [], []], [[3, 3], [], []]])
+        board.start_turn()
+        bot = ISMCTSBot("Ismael", time_budget=None, max_iterations=1, endgame_solver=EndgameSolver(), seed=0)
+        bot.set_board(board)
+        bot.action()
+        playable_cards = board.current_player.playable_cards
+        queen = playable_cards.get(bot.card_play_indices())
+        self.assertEqual(queen.values, (CardValue.QUEEN,))
+        playable_cards.remove(queen)
+        self.assertEqual(playable_cards[bot.card_giveaway_index()].value, CardValue.NINE)
+        self.assertEqual(bot.card_giveaway_player_index(), 1)
+
+
+def _endgame(players_card_values: list[list[list[int]]], draw_pile_values: list[int] | None = None) -> Board:
+    random.seed(0)
+    return BoardFactory(Board).matrix_start(players_card_values, draw_pile_values or [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from src.batch_board import BatchBoard, HAND, KARMA_FACE_DOWN, JOKER
+from src.board_interface import IBoard
+from src.cards import CardValue, NUMBER_OF_CARD_VALUES
+from src.player import Player
+from src.policies import RandomPolicy
+from src.simulator import Simulator
+
+FINISHED = 3  # Karma stage of a player without cards, after HAND, KARMA_FACE_UP and KARMA_FACE_DOWN
+
+
+class IFeature(ABC):
+    """ One number per seat, from a Board or for every game of a BatchBoard at once. Both must agree."""
+
+    name: str
+
+    @abstractmethod
+    def of_board(self, board: IBoard) -> np.ndarray:
+        """ [player] float64."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def of_batch(self, batch: BatchBoard) -> np.ndarray:
+        """ [batch, player] float64."""
+        raise NotImplementedError
+
+
+class CardsRemaining(IFeature):
+    name = "cards_remaining"
+
+    def of_board(self, board: IBoard) -> np.ndarray:
+        return np.array([len(player) for player in board.players], dtype=np.float64)
+
+    def of_batch(self, batch: BatchBoard) -> np.ndarray:
+        return batch.player_card_counts.astype(np.float64)
+
+
+class KarmaStage(IFeature):
+    """ HAND, KARMA_FACE_UP, KARMA_FACE_DOWN or FINISHED, from the player's first non empty container. Not
+        Player.playing_from, which goes by container class, and random_start deals the two karmas with their
+        classes swapped."""
+
+    name = "karma_stage"
+
+    def of_board(self, board: IBoard) -> np.ndarray:
+        return np.array([_stage(player) for player in board.players], dtype=np.float64)
+
+    def of_batch(self, batch: BatchBoard) -> np.ndarray:
+        return _batch_stages(batch).astype(np.float64)
+
+
+class JokerOwnership(IFeature):
+    """ Jokers held anywhere, each one a vote if the game ends in a tie."""
+
+    name = "jokers"
+
+    def of_board(self, board: IBoard) -> np.ndarray:
+        return np.array([player.number_of_jokers for player in board.players], dtype=np.float64)
+
+    def of_batch(self, batch: BatchBoard) -> np.ndarray:
+        return batch.held[:, :, :, JOKER].sum(axis=2).astype(np.float64)
+
+
+class HighCardDensity(IFeature):
+    """ Share of the playable cards worth at least minimum_value, 0 without playable cards."""
+
+    name = "high_card_density"
+
+    def __init__(self, minimum_value: CardValue = CardValue.JACK):
+        self.minimum_value = minimum_value
+        self.__is_high = np.arange(NUMBER_OF_CARD_VALUES) >= minimum_value - 2
+
+    def of_board(self, board: IBoard) -> np.ndarray:
+        value_counts = np.array([player.playable_cards.value_counts if player.has_cards else
+                                 (0,) * NUMBER_OF_CARD_VALUES for player in board.players])
+        return self.__density(value_counts)
+
+    def of_batch(self, batch: BatchBoard) -> np.ndarray:
+        sources = np.minimum(_batch_stages(batch), KARMA_FACE_DOWN)[:, :, None, None]
+        return self.__density(np.take_along_axis(batch.held, sources, axis=2)[:, :, 0])
+
+    def __density(self, value_counts: np.ndarray) -> np.ndarray:
+        totals = value_counts.sum(axis=-1)
+        return value_counts[..., self.__is_high].sum(axis=-1) / np.maximum(totals, 1)
+
+
+class PlayOrderAdvantage(IFeature):
+    """ 1 for the player to move, falling by 1 / number of players for every seat further along the turn order."""
+
+    name = "play_order_advantage"
+
+    def of_board(self, board: IBoard) -> np.ndarray:
+        number_of_players = len(board.players)
+        seats = np.arange(number_of_players)
+        distances = ((seats - board.player_index) * board.turn_order.value) % number_of_players
+        return 1 - distances / number_of_players
+
+    def of_batch(self, batch: BatchBoard) -> np.ndarray:
+        number_of_players = batch.number_of_players
+        seats = np.arange(number_of_players)
+        distances = ((seats - batch.player_indices[:, None]) * batch.turn_orders[:, None]) % number_of_players
+        return 1 - distances / number_of_players
+
+
+class PileToHandRatio(IFeature):
+    """ Play pile size over hand size plus one: how much a pickup would swamp the hand."""
+
+    name = "pile_to_hand_ratio"
+
+    def of_board(self, board: IBoard) -> np.ndarray:
+        return np.array([len(board.play_pile) / (len(player.hand) + 1) for player in board.players])
+
+    def of_batch(self, batch: BatchBoard) -> np.ndarray:
+        return batch.play_lengths[:, None] / (batch.held[:, :, HAND].sum(axis=2) + 1)
+
+
+def default_features() -> list[IFeature]:
+    return [CardsRemaining(), KarmaStage(), JokerOwnership(), HighCardDensity(), PlayOrderAdvantage(),
+            PileToHandRatio()]
+
+
+# Fitted by EvaluatorTuner on seeds 0-1999 of four RandomPolicy players, see main
+DEFAULT_WEIGHTS = {"cards_remaining": -0.0541, "karma_stage": 0.4894, "jokers": 0.3606, "high_card_density": 0.0894,
+                   "play_order_advantage": 0.0792, "pile_to_hand_ratio": -0.0040}
+DEFAULT_BIAS = -1.1488
+
+
+class LinearEvaluator:
+    """ Static evaluation: the win probability of each seat is the logistic of bias plus the weighted sum of its
+        relative features, each feature minus its mean over the other seats.
+
+        Boards are scored one at a time from their objects, or a whole BatchBoard at once from its arrays.
+        Weights are looked up by feature name in DEFAULT_WEIGHTS unless given."""
+
+    def __init__(self, features: Sequence[IFeature] | None = None, weights: Sequence[float] | None = None,
+                 bias: float | None = None):
+        self.features = list(default_features() if features is None else features)
+        if weights is None:
+            weights = [DEFAULT_WEIGHTS.get(feature.name, 0.0) for feature in self.features]
+        if len(weights) != len(self.features):
+            raise ValueError(f"Expected {len(self.features)} weights, got {len(weights)}")
+        self.weights = np.array(weights, dtype=np.float64)
+        self.bias = DEFAULT_BIAS if bias is None else bias
+
+    def __repr__(self) -> str:
+        weights = ", ".join(f"{feature.name}={weight:.4f}" for feature, weight in zip(self.features, self.weights))
+        return f"LinearEvaluator({weights}, bias={self.bias:.4f})"
+
+    @property
+    def feature_names(self) -> list[str]:
+        return [feature.name for feature in self.features]
+
+    def feature_matrix(self, board: IBoard) -> np.ndarray:
+        """ [player, feature] relative features."""
+        return relative_features(np.stack([feature.of_board(board) for feature in self.features], axis=-1))
+
+    def batch_feature_matrix(self, batch: BatchBoard) -> np.ndarray:
+        """ [batch, player, feature] relative features."""
+        return relative_features(np.stack([feature.of_batch(batch) for feature in self.features], axis=-1))
+
+    def win_probabilities(self, board: IBoard) -> np.ndarray:
+        """ [player]"""
+        return self.probabilities(self.feature_matrix(board))
+
+    def batch_win_probabilities(self, batch: BatchBoard) -> np.ndarray:
+        """ [batch, player]"""
+        return self.probabilities(self.batch_feature_matrix(batch))
+
+    def evaluate(self, board: IBoard, player_index: int) -> float:
+        return float(self.win_probabilities(board)[player_index])
+
+    def evaluate_batch(self, batch: BatchBoard, player_indices: np.ndarray | None = None) -> np.ndarray:
+        """ [batch] win probability of player_indices, by default each game's current player."""
+        if player_indices is None:
+            player_indices = batch.player_indices
+        return self.batch_win_probabilities(batch)[np.arange(batch.batch_size), player_indices]
+
+    def probabilities(self, feature_matrix: np.ndarray) -> np.ndarray:
+        return 1 / (1 + np.exp(-(feature_matrix @ self.weights + self.bias)))
+
+
+def relative_features(features: np.ndarray) -> np.ndarray:
+    """ Each seat's features minus the mean of the other seats', over the second to last axis."""
+    number_of_players = features.shape[-2]
+    return features - (features.sum(axis=-2, keepdims=True) - features) / (number_of_players - 1)
+
+
+class EvaluatorTuner:
+    """ Fits LinearEvaluator weights to simulated games. Every sample_every turns each seat's relative features
+        are recorded and labelled with whether that seat went on to win, then an L2 regularised logistic
+        regression is fitted by Newton's method. Games that hit the turn limit have no real winner and are
+        skipped."""
+
+    def __init__(self, simulator: Simulator, features: Sequence[IFeature] | None = None, sample_every: int = 1,
+                 l2: float = 1e-2):
+        self.simulator = simulator
+        self.features = list(default_features() if features is None else features)
+        self.sample_every = sample_every
+        self.l2 = l2
+
+    def collect(self, seeds: Iterable[int]) -> tuple[np.ndarray, np.ndarray]:
+        """ (x [sample, feature], y [sample]) with one sample per seat per recorded turn."""
+        evaluator = LinearEvaluator(self.features, weights=[0.0 for _ in self.features])
+        xs, ys = [], []
+        for seed in seeds:
+            game_rows = []
+
+            def record(board: IBoard) -> None:
+                if board.turns_played % self.sample_every == 0:
+                    game_rows.append(evaluator.feature_matrix(board))
+                return None
+
+            result, = self.simulator.play_seeds([seed], on_turn_end=record)
+            if result.turn_limit_exceeded or not game_rows:
+                continue
+            is_winner = np.isin(np.arange(len(result.ranks)), list(result.winner_indices))
+            xs.extend(game_rows)
+            ys.extend(is_winner for _ in game_rows)
+        number_of_features = len(self.features)
+        if not xs:
+            return np.zeros((0, number_of_features)), np.zeros(0)
+        return np.concatenate(xs), np.concatenate(ys).astype(np.float64)
+
+    def fit(self, x: np.ndarray, y: np.ndarray, iterations: int = 25, tolerance: float = 1e-8) -> LinearEvaluator:
+        design = np.hstack([x, np.ones((len(x), 1))])
+        penalty = np.full(design.shape[1], self.l2 * max(len(x), 1))
+        penalty[-1] = 0  # The bias is not regularised
+        parameters = np.zeros(design.shape[1])
+        for _ in range(iterations):
+            probabilities = 1 / (1 + np.exp(-(design @ parameters)))
+            gradient = design.T @ (probabilities - y) + penalty * parameters
+            hessian = (design.T * (probabilities * (1 - probabilities))) @ design + np.diag(penalty)
+            step = np.linalg.solve(hessian + 1e-9 * np.eye(len(parameters)), gradient)
+            parameters -= step
+            if np.abs(step).max() < tolerance:
+                break
+        return LinearEvaluator(self.features, weights=parameters[:-1].tolist(), bias=float(parameters[-1]))
+
+    def tune(self, seeds: Iterable[int], iterations: int = 25) -> LinearEvaluator:
+        x, y = self.collect(seeds)
+        return self.fit(x, y, iterations=iterations)
+
+
+def log_loss(evaluator: LinearEvaluator, x: np.ndarray, y: np.ndarray) -> float:
+    probabilities = np.clip(evaluator.probabilities(x), 1e-12, 1 - 1e-12)
+    return float(-np.mean(y * np.log(probabilities) + (1 - y) * np.log(1 - probabilities)))
+
+
+def _stage(player: Player) -> int:
+    for stage, cards in enumerate((player.hand, player.karma_face_up, player.karma_face_down)):
+        if cards:
+            return stage
+    return FINISHED
+
+
+def _batch_stages(batch: BatchBoard) -> np.ndarray:
+    """ [batch, player] the first non empty of HAND, KARMA_FACE_UP and KARMA_FACE_DOWN, else FINISHED."""
+    has_cards = batch.held.sum(axis=3) > 0
+    return np.where(has_cards.any(axis=2), np.argmax(has_cards, axis=2), FINISHED)
+
+
+def main():
+    tuner = EvaluatorTuner(Simulator([RandomPolicy(pickup_probability=0.05) for _ in range(4)]), sample_every=2)
+    evaluator = tuner.tune(range(2000))
+    x, y = tuner.collect(range(2000, 2500))
+    constant = LinearEvaluator(tuner.features, [0.0 for _ in tuner.features], bias=evaluator.bias)
+    print(evaluator)
+    print(f"Held out log loss: {log_loss(evaluator, x, y):.4f} (bias only: {log_loss(constant, x, y):.4f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import random
+import unittest
+
+import numpy as np
+
+from src.batch_board import BatchBoard
+from src.board import Board
+from src.board_seeds import BoardFactory
+from src.evaluation import (CardsRemaining, EvaluatorTuner, HighCardDensity, KarmaStage, LinearEvaluator,
+                            PileToHandRatio, PlayOrderAdvantage, default_features, log_loss, relative_features)
+from src.policies import RandomPolicy
+from src.simulator import Simulator
+
+
+class TestFeatures(unittest.TestCase):
+    def test_feature_values(self):
+        board = BoardFactory(Board).matrix_start([[[3, 11], [5], [6]], [[], [13], [4]], [[], [], []]], [],
+                                                 play_pile_values=[9, 9, 9])
+        self.assertEqual(CardsRemaining().of_board(board).tolist(), [4, 2, 0])
+        self.assertEqual(KarmaStage().of_board(board).tolist(), [0, 1, 3])
+        self.assertEqual(HighCardDensity().of_board(board).tolist(), [0.5, 1, 0])
+        np.testing.assert_allclose(PlayOrderAdvantage().of_board(board), [1, 2 / 3, 1 / 3])
+        self.assertEqual(PileToHandRatio().of_board(board).tolist(), [1, 3, 3])
+
+    def test_batch_matches_boards(self):
+        random.seed(0)
+        boards = []
+        simulator = Simulator([RandomPolicy(pickup_probability=0.05) for _ in range(4)])
+        for seed in range(6):
+            random.seed(seed)
+            board = BoardFactory(Board).random_start(number_of_players=4)
+            for _ in range(15 * seed):
+                if board.potential_winner_indices:
+                    break
+                simulator.play_turn(board)
+                board.end_turn()
+                board.step_player_index(1)
+            boards.append(board)
+        batch = BatchBoard.from_boards(boards)
+        for feature in default_features():
+            expected = np.array([feature.of_board(board) for board in boards])
+            np.testing.assert_allclose(feature.of_batch(batch), expected, err_msg=feature.name)
+
+    def test_relative_features_cancel(self):
+        features = np.random.default_rng(0).normal(size=(5, 4, 3))
+        relative = relative_features(features)
+        np.testing.assert_allclose(relative.sum(axis=1), 0, atol=1e-12)
+        np.testing.assert_allclose(relative[:, 0], features[:, 0] - features[:, 1:].mean(axis=1))
+
+
+class TestLinearEvaluator(unittest.TestCase):
+    def test_fewer_cards_is_better(self):
+        board = BoardFactory(Board).matrix_start([[[3], [], []], [[3, 5, 7, 9], [], []]], [])
+        evaluator = LinearEvaluator()
+        self.assertGreater(evaluator.evaluate(board, 0), evaluator.evaluate(board, 1))
+
+    def test_batch_matches_boards(self):
+        random.seed(1)
+        boards = [BoardFactory(Board).random_start(number_of_players=3) for _ in range(8)]
+        evaluator = LinearEvaluator()
+        np.testing.assert_allclose(evaluator.batch_win_probabilities(BatchBoard.from_boards(boards)),
+                                   [evaluator.win_probabilities(board) for board in boards])
+
+    def test_weights_must_match_features(self):
+        with self.assertRaises(ValueError):
+            LinearEvaluator([CardsRemaining()], weights=[1.0, 2.0])
+
+
+class TestEvaluatorTuner(unittest.TestCase):
+    def test_fit_beats_bias_only(self):
+        tuner = EvaluatorTuner(Simulator([RandomPolicy(pickup_probability=0.05) for _ in range(4)]), sample_every=3)
+        x, y = tuner.collect(range(40))
+        self.assertEqual(x.shape, (len(y), len(tuner.features)))
+        self.assertTrue(((y == 0) | (y == 1)).all())
+        evaluator = tuner.fit(x, y)
+        bias_only = LinearEvaluator(tuner.features, [0.0 for _ in tuner.features], bias=evaluator.bias)
+        self.assertLess(log_loss(evaluator, x, y), log_loss(bias_only, x, y))
+        self.assertLess(evaluator.weights[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+from typing import Iterable, Iterator
+
+from src.utils.multiset import BaseMultiset, FrozenMultiset
+from src.cards import CardValue
+
+
+class FrozenCombo:
+    """ Immutable multiset of card values, stored as (value, count) pairs sorted by value.
+
+        Hashes and compares equal to a FrozenMultiset with the same contents, so either can be used to look up
+        the other in a set. The hash is computed once, on creation."""
+
+    __slots__ = ("__pairs", "__total", "__hash")
+
+    def __init__(self, values: Mapping[CardValue, int] | Iterable[CardValue] = ()):
+        if isinstance(values, FrozenCombo):
+            pairs = values.__pairs
+        else:
+            counts = {}
+            if isinstance(values, (Mapping, BaseMultiset)):
+                for value, count in values.items():
+                    if count > 0:
+                        counts[value] = count
+            else:
+                for value in values:
+                    counts[value] = counts.get(value, 0) + 1
+            pairs = tuple(sorted(counts.items(), key=lambda pair: pair[0].value))
+        self.__pairs: tuple[tuple[CardValue, int], ...] = pairs
+        self.__total = sum(count for _, count in pairs)
+        self.__hash = hash(frozenset(pairs))
+
+    def __hash__(self) -> int:
+        return self.__hash
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, FrozenCombo):
+            return self.__hash == other.__hash and self.__pairs == other.__pairs
+        if isinstance(other, BaseMultiset):
+            return self.__total == len(other) and all(other[value] == count for value, count in self.__pairs)
+        return NotImplemented
+
+    def __ne__(self, other) -> bool:
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    def __reduce__(self):
+        return FrozenCombo, (dict(self.__pairs),)
+
+    def __copy__(self) -> FrozenCombo:
+        return self
+
+    def __deepcopy__(self, memo) -> FrozenCombo:
+        return self
+
+    def copy(self) -> FrozenCombo:
+        return self
+
+    def __repr__(self) -> str:
+        items = ", ".join(f"{value!r}: {count!r}" for value, count in self.__pairs)
+        return f"FrozenCombo({{{items}}})"
+
+    def __str__(self) -> str:
+        return "{" + ", ".join(str(value) for value in self) + "}"
+
+    def __len__(self) -> int:
+        return self.__total
+
+    def __bool__(self) -> bool:
+        return self.__total > 0
+
+    def __iter__(self) -> Iterator[CardValue]:
+        for value, count in self.__pairs:
+            for _ in range(count):
+                yield value
+
+    def __contains__(self, value: CardValue) -> bool:
+        return any(value == combo_value for combo_value, _ in self.__pairs)
+
+    def __getitem__(self, value: CardValue) -> int:
+        for combo_value, count in self.__pairs:
+            if combo_value == value:
+                return count
+        return 0
+
+    def get(self, value: CardValue, default: int) -> int:
+        for combo_value, count in self.__pairs:
+            if combo_value == value:
+                return count
+        return default
+
+    def items(self) -> tuple[tuple[CardValue, int], ...]:
+        return self.__pairs
+
+    def distinct_elements(self) -> tuple[CardValue, ...]:
+        return tuple(value for value, _ in self.__pairs)
+
+    def multiplicities(self) -> tuple[int, ...]:
+        return tuple(count for _, count in self.__pairs)
+
+    def to_multiset(self) -> FrozenMultiset:
+        return FrozenMultiset(dict(self.__pairs))
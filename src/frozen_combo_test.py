@@ -0,0 +1,47 @@
+import pickle
+import unittest
+
+from src.utils.multiset import FrozenMultiset
+from src.frozen_combo import FrozenCombo
+from src.cards import CardValue
+
+
+class TestFrozenCombo(unittest.TestCase):
+    def test_from_values_and_mapping_agree(self):
+        combo = FrozenCombo([CardValue.SIX, CardValue.FIVE, CardValue.FIVE])
+        self.assertEqual(combo, FrozenCombo({CardValue.FIVE: 2, CardValue.SIX: 1}))
+        self.assertEqual(combo.items(), ((CardValue.FIVE, 2), (CardValue.SIX, 1)))
+        self.assertEqual(len(combo), 3)
+        self.assertEqual(list(combo), [CardValue.FIVE, CardValue.FIVE, CardValue.SIX])
+
+    def test_interoperates_with_frozen_multiset(self):
+        combo = FrozenCombo({CardValue.KING: 3, CardValue.SIX: 2})
+        multiset = FrozenMultiset({CardValue.SIX: 2, CardValue.KING: 3})
+        self.assertEqual(combo, multiset)
+        self.assertEqual(multiset, combo)
+        self.assertEqual(hash(combo), hash(multiset))
+        self.assertIn(multiset, {combo})
+        self.assertIn(combo, {multiset})
+        self.assertNotEqual(combo, FrozenMultiset({CardValue.KING: 3}))
+        self.assertEqual(combo.to_multiset(), multiset)
+
+    def test_multiplicity(self):
+        combo = FrozenCombo({CardValue.ACE: 2})
+        self.assertEqual(combo[CardValue.ACE], 2)
+        self.assertEqual(combo[CardValue.TWO], 0)
+        self.assertIn(CardValue.ACE, combo)
+        self.assertNotIn(CardValue.TWO, combo)
+
+    def test_copy_and_pickle(self):
+        combo = FrozenCombo({CardValue.JOKER: 1})
+        self.assertIs(combo.copy(), combo)
+        self.assertEqual(pickle.loads(pickle.dumps(combo)), combo)
+
+    def test_frozen_multiset_hash_is_cached(self):
+        multiset = FrozenMultiset({CardValue.TEN: 4})
+        self.assertEqual(hash(multiset), hash(multiset))
+        self.assertEqual(multiset._hash, hash(FrozenCombo({CardValue.TEN: 4})))
+
+
+if __name__ == '__main__':
+    unittest.main()
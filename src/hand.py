@@ -3,10 +3,10 @@ from typing import Iterable
 from bisect import insort
 from heapq import merge as heapq_merge
 
-from src.cards import Card, Cards
+from src.cards import Card, Cards, CountedCards
 
 
-class Hand(Cards):
+class Hand(CountedCards):
     def __init__(self, cards: Iterable[Card]):
         super().__init__(cards)
 
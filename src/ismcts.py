@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+import random
+import math
+import time
+
+from src.action_space import ActionPhase
+from src.belief import BeliefTracker
+from src.board import Board
+from src.board_actions import PickUpPlayPile, PlayCardsCombo, combo_card_indices
+from src.board_interface import IBoard, BoardTurnOrder
+from src.bot_interface import IBot
+from src.endgame import EndgameSolver, WIN
+from src.policies import RandomRolloutPolicy
+from src.policy_interface import IRolloutPolicy
+from src.simulator import GameResult, Simulator
+
+type Determinizer = Callable[[Board, int, random.Random], Board]
+type Evaluator = Callable[[IBoard, GameResult], list[float]]
+
+
+class SearchNode:
+    """ One action in an information set tree. Children are keyed by action id, and availability counts how
+        often the action was legal when its parent was reached, as determinizations disagree on that."""
+
+    __slots__ = ("player_index", "visits", "availability", "total_reward", "children")
+
+    def __init__(self, player_index: int = -1):
+        self.player_index = player_index
+        self.visits = 0
+        self.availability = 0
+        self.total_reward = 0.0
+        self.children: dict[int, SearchNode] = {}
+
+    def ucb(self, exploration: float) -> float:
+        return self.total_reward / self.visits + exploration * math.sqrt(math.log(self.availability) / self.visits)
+
+    def most_visited(self, action_ids: list[int]) -> int | None:
+        """ The most visited child among action_ids, or None if none of them has been tried."""
+        visited = [action_id for action_id in action_ids if action_id in self.children]
+        if not visited:
+            return None
+        return max(visited, key=lambda action_id: self.children[action_id].visits)
+
+    def merge(self, other: SearchNode) -> None:
+        """ Adds other's statistics into this tree, for root parallel searches."""
+        self.visits += other.visits
+        self.availability += other.availability
+        self.total_reward += other.total_reward
+        for action_id, other_child in other.children.items():
+            child = self.children.get(action_id)
+            if child is None:
+                self.children[action_id] = other_child
+            else:
+                child.merge(other_child)
+        return None
+
+    def __repr__(self) -> str:
+        return (f"SearchNode(player_index={self.player_index}, visits={self.visits}, "
+                f"availability={self.availability}, children={len(self.children)})")
+
+
+def determinize(board: Board, observer_index: int, generator: random.Random) -> Board:
+    """ Clone of board where every card observer_index cannot see is shuffled between the places it could be:
+        the other hands (or only their own hand, while cards are flipped), all face down karma and the draw pile."""
+    clone = board.clone()
+    hidden_containers = []
+    for i, player in enumerate(clone.players):
+        if (i == observer_index) == clone.cards_are_flipped:
+            hidden_containers.append(player.hand)
+        hidden_containers.append(player.karma_face_down)
+    hidden_containers.append(clone.draw_pile)
+
+    hidden_cards = [card for container in hidden_containers for card in container]
+    generator.shuffle(hidden_cards)
+    start = 0
+    for container in hidden_containers:
+        container.restore_state(tuple(hidden_cards[start:start + len(container)]))
+        start += len(container)
+    if not clone.cards_are_flipped:
+        for player in clone.players:
+            player.hand.sort()
+    return clone
+
+
+def rank_rewards(board: IBoard, result: GameResult) -> list[float]:
+    """ 1 for the winners down to 0 for the last rank."""
+    worst_rank = max(result.ranks.values())
+    if worst_rank == 0:
+        return [1.0 for _ in board.players]
+    return [1.0 - result.ranks[i] / worst_rank for i in range(len(board.players))]
+
+
+class TreePolicy(IRolloutPolicy):
+    """ Plays one search iteration: UCB over the tried legal actions, adds the first untried action it meets,
+        then hands every later decision to rollout_policy."""
+
+    def __init__(self, root: SearchNode, exploration: float, generator: random.Random,
+                 rollout_policy: IRolloutPolicy):
+        self.node = root
+        self.path = [root]
+        self.exploration = exploration
+        self.generator = generator
+        self.rollout_policy = rollout_policy
+        self.is_in_tree = True
+
+    def choose_action_id(self, board: IBoard, legal_action_ids: list[int]) -> int:
+        if not self.is_in_tree:
+            return self.rollout_policy.choose_action_id(board, legal_action_ids)
+        children = self.node.children
+        untried_action_ids = []
+        for action_id in legal_action_ids:
+            child = children.get(action_id)
+            if child is None:
+                untried_action_ids.append(action_id)
+            else:
+                child.availability += 1
+
+        if untried_action_ids:
+            action_id = self.generator.choice(untried_action_ids)
+            child = SearchNode(board.player_index)
+            child.availability = 1
+            children[action_id] = child
+            self.is_in_tree = False
+        else:
+            action_id = max(legal_action_ids, key=lambda x: children[x].ucb(self.exploration))
+            child = children[action_id]
+        self.node = child
+        self.path.append(child)
+        return action_id
+
+    def vote_for_winner_index(self, board: IBoard) -> int:
+        return self.generator.choice(sorted(board.potential_winner_indices))
+
+
+def search(board: Board, observer_index: int, time_budget: float | None = 1.0, max_iterations: int | None = None,
+           seed: int | None = None, exploration: float = 0.7, rollout_turns: int = 60,
+           determinizer: Determinizer = determinize, evaluator: Evaluator = rank_rewards,
+           rollout_policy: IRolloutPolicy | None = None) -> SearchNode:
+    """ Single observer information set MCTS from observer_index's turn. Stops at whichever of time_budget
+        (seconds) and max_iterations comes first. Module level, so pools can run it."""
+    if time_budget is None and max_iterations is None:
+        raise ValueError("Searching needs a time_budget, max_iterations or both")
+    generator = random.Random(seed)
+    if rollout_policy is None:
+        rollout_policy = RandomRolloutPolicy(generator=generator)
+    root = SearchNode()
+    deadline = math.inf if time_budget is None else time.perf_counter() + time_budget
+    iteration = 0
+    while time.perf_counter() < deadline and (max_iterations is None or iteration < max_iterations):
+        determinization = determinizer(board, observer_index, generator)
+        tree_policy = TreePolicy(root, exploration, generator, rollout_policy)
+        policies = [tree_policy for _ in determinization.players]
+        simulator = Simulator(policies, turn_limit=determinization.turns_played + rollout_turns)
+        rewards = evaluator(determinization, simulator.play_game(determinization))
+
+        root.visits += 1
+        for node in tree_policy.path[1:]:
+            node.visits += 1
+            node.total_reward += rewards[node.player_index]
+        iteration += 1
+    return root
+
+
+def searchable_copy(board: IBoard) -> Board:
+    """ Clone without end turn events, and with only the combo history the rules read, so it can be pickled."""
+    clone = board.clone()
+    clone.combo_history[:] = [combo.__class__(combo.cards, {}) for combo in clone.combo_history[-1:]]
+    return clone
+
+
+class ISMCTSBot(IBot):
+    """ Determinized information set MCTS. Each move is searched for time_budget seconds (and/or max_iterations)
+        from the turn it is asked about, on number_of_workers independent trees that are merged (root
+        parallelism) on a thread or process pool.
+
+        Give-aways and joker targets are asked in the middle of the bot's own combo, so they are answered from
+        the subtree of the combo that was just chosen. Untried ones fall back to a random legal choice.
+
+        Without a determinizer, hidden cards are sampled from a BeliefTracker following the bot's board. With an
+        endgame_solver, endgames it applies to are solved on a determinization first, and a forced win is played
+        without searching."""
+
+    def __init__(self, name: str, delay: float = 0.0, time_budget: float | None = 1.0,
+                 max_iterations: int | None = None, number_of_workers: int = 1, use_processes: bool = False,
+                 exploration: float = 0.7, rollout_turns: int = 60, determinizer: Determinizer | None = None,
+                 evaluator: Evaluator = rank_rewards, rollout_policy: IRolloutPolicy | None = None,
+                 endgame_solver: EndgameSolver | None = None, seed: int | None = None):
+        self._name = name
+        self._delay = delay
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        self.number_of_workers = number_of_workers
+        self.use_processes = use_processes
+        self.exploration = exploration
+        self.rollout_turns = rollout_turns
+        self.determinizer = determinizer
+        self.evaluator = evaluator
+        self.rollout_policy = rollout_policy
+        self.endgame_solver = endgame_solver
+        self.__generator = random.Random(seed)
+        self.__board: IBoard | None = None
+        self.__belief_tracker: BeliefTracker | None = None
+        self.__executor: Executor | None = None
+        self.__chosen_action_id: int | None = None
+        self.__decision_node: SearchNode | None = None
+        self.__planned_decision_ids: list[int] = []
+        self.__giveaway_player_index: int | None = None
+
+    @property
+    def delay(self) -> float:
+        return self._delay
+
+    def set_board(self, board: IBoard) -> None:
+        if board is not self.__board and self.determinizer is None:
+            self.__belief_tracker = BeliefTracker.following(board)
+        self.__board = board
+
+    @property
+    def is_ready(self) -> bool:
+        return self.__board is not None
+
+    def name(self) -> str:
+        return self._name
+
+    def search(self) -> SearchNode:
+        """ Merged search tree for the current player of the board."""
+        board = searchable_copy(self.__board)
+        seeds = [self.__generator.getrandbits(32) for _ in range(self.number_of_workers)]
+        determinizer = self.__determinizer()
+        search_kwargs = dict(time_budget=self.time_budget, exploration=self.exploration,
+                             rollout_turns=self.rollout_turns, determinizer=determinizer,
+                             evaluator=self.evaluator, rollout_policy=self.rollout_policy)
+        if self.number_of_workers == 1:
+            return search(board, board.player_index, max_iterations=self.max_iterations, seed=seeds[0],
+                          **search_kwargs)
+
+        max_iterations = None
+        if self.max_iterations is not None:
+            max_iterations = -(-self.max_iterations // self.number_of_workers)
+        executor = self.__get_executor()
+        futures = [executor.submit(search, board, board.player_index, max_iterations=max_iterations, seed=seed,
+                                   **search_kwargs) for seed in seeds]
+        root = SearchNode()
+        for future in futures:
+            root.merge(future.result())
+        return root
+
+    def close(self) -> None:
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+        return None
+
+    def action(self) -> str:
+        self.__choose_turn_action(can_pickup=True)
+        if self.__chosen_action_id == self.__board.action_space.PICKUP:
+            return PickUpPlayPile.name()
+        return PlayCardsCombo.name()
+
+    def card_play_indices(self) -> list[int]:
+        action_space = self.__board.action_space
+        if self.__chosen_action_id is None or self.__chosen_action_id == action_space.PICKUP:
+            self.__choose_turn_action(can_pickup=False)
+        combo = action_space.combo(self.__chosen_action_id)
+        self.__chosen_action_id = None
+        return combo_card_indices(self.__board.current_player.playable_cards, combo)
+
+    def card_giveaway_index(self) -> int:
+        action_id = self.__decide(ActionPhase.GIVE_AWAY)
+        value, self.__giveaway_player_index = self.__board.action_space.give_away(action_id)
+        return _first_card_index(self.__board, value)
+
+    def card_giveaway_player_index(self) -> int:
+        return self.__giveaway_player_index
+
+    def joker_target_index(self) -> int:
+        return self.__board.action_space.joker_target(self.__decide(ActionPhase.JOKER_TARGET))
+
+    def wants_to_mulligan(self) -> str:
+        return "n"
+
+    def mulligan_hand_index(self) -> int:
+        raise NotImplementedError
+
+    def mulligan_fuk_index(self) -> int:
+        raise NotImplementedError
+
+    def preferred_start_direction(self) -> BoardTurnOrder:
+        return BoardTurnOrder.RIGHT
+
+    def vote_for_winner_index(self) -> int:
+        potential_winner_indices = self.__board.potential_winner_indices
+        if self.__board.player_index in potential_winner_indices:
+            return self.__board.player_index
+        return min(potential_winner_indices)
+
+    def __choose_turn_action(self, can_pickup: bool) -> None:
+        legal_action_ids = self.__board.legal_action_ids(ActionPhase.TURN)
+        if not can_pickup and legal_action_ids[0] == self.__board.action_space.PICKUP:
+            legal_action_ids.pop(0)
+        self.__planned_decision_ids = []
+        if self.endgame_solver is not None and self.endgame_solver.applies_to(self.__board):
+            result = self.endgame_solver.solve(self.__determinizer()(searchable_copy(self.__board),
+                                                                     self.__board.player_index, self.__generator))
+            if result.value == WIN and result.action_id in legal_action_ids:
+                self.__chosen_action_id = result.action_id
+                self.__decision_node = None
+                self.__planned_decision_ids = list(result.decision_ids)
+                return None
+        root = self.search()
+        action_id = root.most_visited(legal_action_ids)
+        if action_id is None:
+            action_id = self.__generator.choice(legal_action_ids)
+        self.__chosen_action_id = action_id
+        self.__decision_node = root.children.get(action_id)
+        return None
+
+    def __decide(self, action_phase: ActionPhase) -> int:
+        legal_action_ids = self.__board.legal_action_ids(action_phase)
+        if self.__planned_decision_ids:
+            action_id = self.__planned_decision_ids.pop(0)
+            if action_id in legal_action_ids:
+                return action_id
+            self.__planned_decision_ids = []
+        node = self.__decision_node
+        action_id = None if node is None else node.most_visited(legal_action_ids)
+        if action_id is None:
+            action_id = self.__generator.choice(legal_action_ids)
+        self.__decision_node = None if node is None else node.children.get(action_id)
+        return action_id
+
+    def __determinizer(self) -> Determinizer:
+        if self.determinizer is None:
+            return self.__belief_tracker.determinize
+        return self.determinizer
+
+    def __get_executor(self) -> Executor:
+        if self.__executor is None:
+            executor_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self.__executor = executor_class(max_workers=self.number_of_workers)
+        return self.__executor
+
+
+def _first_card_index(board: IBoard, value) -> int:
+    return next(i for i, card in enumerate(board.current_player.playable_cards) if card.value == value)
@@ -0,0 +1,139 @@
+import random
+import unittest
+
+from collections import Counter
+
+from src.action_space import ActionPhase
+from src.board import Board
+from src.board_seeds import BoardFactory
+from src.cards import CardValue
+from src.frozen_combo import FrozenCombo
+from src.ismcts import ISMCTSBot, SearchNode, TreePolicy, determinize, search, searchable_copy
+from src.policies import BotPolicy, RandomPolicy, RandomRolloutPolicy
+from src.simulator import Simulator
+
+
+class TestDeterminize(unittest.TestCase):
+    def test_only_hidden_cards_move(self):
+        random.seed(0)
+        board = BoardFactory(Board).random_start(number_of_players=4)
+        determinization = determinize(board, 0, random.Random(1))
+        self.assertEqual(determinization.players[0].hand, board.players[0].hand)
+        for player, original in zip(determinization.players, board.players):
+            self.assertEqual(player.karma_face_up, original.karma_face_up)
+            self.assertEqual(len(player.hand), len(original.hand))
+            self.assertEqual(len(player.karma_face_down), len(original.karma_face_down))
+        self.assertEqual(len(determinization.draw_pile), len(board.draw_pile))
+        self.assertEqual(_hidden_cards(determinization, 0), _hidden_cards(board, 0))
+        self.assertNotEqual(determinization.state_hash, board.state_hash)
+
+    def test_flipped_hides_own_hand(self):
+        board = BoardFactory(Board).matrix_start([[[2, 3, 4], [], []], [[5, 6, 7], [], []]], [8, 9],
+                                                 cards_are_flipped=True)
+        determinization = determinize(board, 0, random.Random(2))
+        self.assertEqual(determinization.players[1].hand, board.players[1].hand)
+
+
+class TestSearch(unittest.TestCase):
+    def test_visits_add_up(self):
+        board = BoardFactory(Board).matrix_start([[[5, 5, 9], [], [3]], [[7, 8], [], [2]]], [10, 4])
+        board.start_turn()
+        root = search(board, 0, time_budget=None, max_iterations=60, seed=0)
+        self.assertEqual(root.visits, 60)
+        self.assertEqual(sum(child.visits for child in root.children.values()), 60)
+        legal_action_ids = set(board.legal_action_mask(ActionPhase.TURN).nonzero()[0].tolist())
+        self.assertLessEqual(set(root.children), legal_action_ids)
+
+    def test_finds_the_winning_combo(self):
+        board = BoardFactory(Board).matrix_start([[[10, 10], [], []], [[7, 8], [], []]], [])
+        board.start_turn()
+        root = search(board, 0, time_budget=None, max_iterations=40, seed=0)
+        winning_action_id = board.action_space.combo_id(FrozenCombo({CardValue.TEN: 2}))
+        self.assertEqual(root.most_visited(list(root.children)), winning_action_id)
+
+    def test_searchable_copy_keeps_last_combo(self):
+        random.seed(1)
+        board = BoardFactory(Board).random_start(number_of_players=4)
+        simulator = Simulator([RandomPolicy() for _ in range(4)])
+        for _ in range(5):
+            simulator.play_turn(board)
+            board.end_turn()
+        copy = searchable_copy(board)
+        self.assertEqual(len(copy.combo_history), 1)
+        self.assertIs(copy.combo_history[-1].__class__, board.combo_history[-1].__class__)
+        self.assertEqual(copy.state_hash, board.state_hash)
+
+    def test_tree_policy_votes_from_its_generator(self):
+        board = BoardFactory(Board).matrix_start([[[], [], []], [[], [], []], [[], [], []], [[3], [], []]], [])
+        votes = []
+        for global_seed in range(2):
+            random.seed(global_seed)
+            tree_policy = TreePolicy(SearchNode(0), 0.7, random.Random(0), RandomRolloutPolicy())
+            votes.append([tree_policy.vote_for_winner_index(board) for _ in range(10)])
+        self.assertEqual(votes[0], votes[1])
+        self.assertLessEqual(set(votes[0]), {0, 1, 2})
+
+
+class TestISMCTSBot(unittest.TestCase):
+    def test_plays_full_games(self):
+        bot = ISMCTSBot("Ismael", time_budget=None, max_iterations=8, rollout_turns=10, seed=0)
+        policies = [BotPolicy(bot), RandomPolicy(), RandomPolicy(), RandomPolicy()]
+        results = Simulator(policies).run(2, first_seed=10)
+        self.assertEqual(len(results), 2)
+
+    def test_answers_queen_give_away(self):
+        board = BoardFactory(Board).matrix_start([[[12, 8, 6], [], []], [[7], [], []], [[5, 5], [], []]], [],
+                                                 play_pile_values=[11])
+        board.start_turn()
+        bot = ISMCTSBot("Ismael", time_budget=None, max_iterations=30, seed=0)
+        bot.set_board(board)
+        bot.action()
+        playable_cards = board.current_player.playable_cards
+        queen = playable_cards.get(bot.card_play_indices())
+        self.assertEqual(queen.values, (CardValue.QUEEN,))
+        playable_cards.remove(queen)
+        card_index = bot.card_giveaway_index()
+        self.assertNotEqual(playable_cards[card_index].value, CardValue.JOKER)
+        self.assertIn(bot.card_giveaway_player_index(), {1, 2})
+
+    def test_answers_joker_target(self):
+        board = BoardFactory(Board).matrix_start([[[15, 8], [], []], [[7], [], []], [[5], [], []]], [],
+                                                 play_pile_values=[3, 14])
+        board.start_turn()
+        bot = ISMCTSBot("Ismael", time_budget=None, max_iterations=30, seed=0)
+        bot.set_board(board)
+        self.assertIn(bot.joker_target_index(), {1, 2})
+
+    def test_thread_workers_merge(self):
+        board = BoardFactory(Board).matrix_start([[[5, 5, 9], [], [3]], [[7, 8], [], [2]]], [10, 4])
+        board.start_turn()
+        bot = ISMCTSBot("Ismael", time_budget=None, max_iterations=40, number_of_workers=2, seed=0)
+        bot.set_board(board)
+        try:
+            self.assertEqual(bot.search().visits, 40)
+        finally:
+            bot.close()
+
+    def test_process_workers_merge(self):
+        board = BoardFactory(Board).matrix_start([[[5, 5, 9], [], [3]], [[7, 8], [], [2]]], [10, 4])
+        board.start_turn()
+        bot = ISMCTSBot("Ismael", time_budget=None, max_iterations=20, number_of_workers=2, use_processes=True,
+                        seed=0)
+        bot.set_board(board)
+        try:
+            self.assertEqual(bot.search().visits, 20)
+        finally:
+            bot.close()
+
+
+def _hidden_cards(board: Board, observer_index: int) -> Counter:
+    hidden = Counter(board.draw_pile)
+    for i, player in enumerate(board.players):
+        hidden.update(player.karma_face_down)
+        if i != observer_index:
+            hidden.update(player.hand)
+    return hidden
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,9 @@
 from typing import Iterable
 
-from src.cards import Card, Cards
+from src.cards import Card, Cards, CountedCards
 
 
-class Karma(Cards):
+class Karma(CountedCards):
     def __init__(self, cards: Iterable[Card]):
         super().__init__(cards)
 
@@ -11,8 +11,8 @@ class Karma(Cards):
         self.pop(index)
         return None
 
-    def pop_multiple(self, indices: int):
-        return self.pop_multiple(indices)
+    def pop_multiple(self, indices: Iterable[int]) -> Cards:
+        return super().pop_multiple(indices)
 
 
 class KarmaFaceUp(Karma):
@@ -20,7 +20,7 @@ class KarmaFaceUp(Karma):
         super().__init__(cards)
 
     def swap(self, index: int, card: Card) -> Card:
-        return self.swap(index, card)
+        return super().swap(index, card)
 
 
 class KarmaFaceDown(Karma):
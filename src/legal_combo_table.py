@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+from typing import Callable, Iterable, Sequence
+
+import argparse
+import mmap
+import os
+import struct
+import warnings
+
+from src.frozen_combo import FrozenCombo
+from src.card_combo_permuations import CARD_VALUES
+from src.cards import CardValue, NUMBER_OF_SUITS, NUMBER_OF_CARD_VALUES
+from src.board_interface import BoardPlayOrder
+
+type ContextGenerator = Callable[[tuple[int, ...], CardValue | None, BoardPlayOrder], Iterable[FrozenCombo]]
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "legal_combos.table")
+
+
+def _table_combos() -> tuple[FrozenCombo, ...]:
+    """ Every combo the rules can ever produce, in a fixed order. Bit i of a table row is combo i."""
+    combos = []
+    filler = CardValue.SIX
+    for value in CARD_VALUES:
+        if value == filler:
+            continue
+        for number_of_cards in range(1, NUMBER_OF_SUITS + 1):
+            combos.append(FrozenCombo({value: number_of_cards}))
+            for number_of_fillers in range(1, NUMBER_OF_SUITS + 1):
+                combos.append(FrozenCombo({value: number_of_cards, filler: number_of_fillers}))
+    for number_of_fillers in range(1, NUMBER_OF_SUITS + 1):
+        combos.append(FrozenCombo({filler: number_of_fillers}))
+    return tuple(combos)
+
+
+TABLE_COMBOS = _table_combos()
+COMBO_INDICES = {combo: i for i, combo in enumerate(TABLE_COMBOS)}
+
+
+class LegalComboTable:
+    """ Legal combos of every value count vector up to hand_size cards, for every top card and play order.
+
+        Rows are fixed width bitmasks over TABLE_COMBOS, read straight out of a memory mapped file. Count vectors
+        are ranked in lexicographic order among all vectors with at most hand_size cards, so a lookup is an
+        O(NUMBER_OF_CARD_VALUES) index computation and a slice."""
+
+    MAGIC = b"KLCT"
+    VERSION = 1
+    __HEADER = struct.Struct("<4sHHHH")
+    NUMBER_OF_CONTEXTS = 1 + 2 * NUMBER_OF_CARD_VALUES  # No top card, then (top value, play order) pairs
+
+    def __init__(self, buffer: bytes | mmap.mmap, hand_size: int):
+        self.hand_size = hand_size
+        self.row_size = (len(TABLE_COMBOS) + 7) // 8
+        self.__buffer = buffer
+        self.__offset = self.__HEADER.size
+        self.__vectors_below = _vectors_below_table(hand_size)
+
+    @classmethod
+    def open(cls, file_path: str = DEFAULT_TABLE_PATH) -> LegalComboTable:
+        with open(file_path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls.__from_buffer(buffer, file_path)
+        except ValueError:
+            buffer.close()
+            raise
+
+    @classmethod
+    def __from_buffer(cls, buffer: mmap.mmap, file_path: str) -> LegalComboTable:
+        if len(buffer) < cls.__HEADER.size:
+            raise ValueError(f"\'{file_path}\' is truncated, rebuild it")
+        magic, version, hand_size, number_of_combos, number_of_contexts = cls.__HEADER.unpack_from(buffer)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError(f"\'{file_path}\' is not a version {cls.VERSION} legal combo table")
+        if number_of_combos != len(TABLE_COMBOS) or number_of_contexts != cls.NUMBER_OF_CONTEXTS:
+            raise ValueError(f"\'{file_path}\' was built for different rules, rebuild it")
+        table = cls(buffer, hand_size)
+        expected_size = cls.__HEADER.size + table.number_of_vectors * cls.NUMBER_OF_CONTEXTS * table.row_size
+        if len(buffer) != expected_size:
+            raise ValueError(f"\'{file_path}\' is truncated, rebuild it")
+        return table
+
+    @classmethod
+    def open_if_built(cls, file_path: str = DEFAULT_TABLE_PATH) -> LegalComboTable | None:
+        """ None when there is no usable table, so that Board falls back to generating legal combos."""
+        if not os.path.exists(file_path):
+            return None
+        try:
+            return cls.open(file_path)
+        except ValueError as error:
+            warnings.warn(f"Ignoring the legal combo table: {error}")
+            return None
+
+    @classmethod
+    def build(cls, file_path: str, hand_size: int, generator: ContextGenerator) -> None:
+        """ generator(value_counts, top card value or None, play order) must give the legal unflipped combos."""
+        row_size = (len(TABLE_COMBOS) + 7) // 8
+        with open(file_path, "wb") as file:
+            file.write(cls.__HEADER.pack(cls.MAGIC, cls.VERSION, hand_size, len(TABLE_COMBOS),
+                                         cls.NUMBER_OF_CONTEXTS))
+            for value_counts in _count_vectors(hand_size):
+                rows = bytearray()
+                for top_card_value, play_order in cls.contexts():
+                    mask = 0
+                    for combo in generator(value_counts, top_card_value, play_order):
+                        mask |= 1 << COMBO_INDICES[combo]
+                    rows += mask.to_bytes(row_size, "little")
+                file.write(rows)
+        return None
+
+    @staticmethod
+    def contexts() -> list[tuple[CardValue | None, BoardPlayOrder]]:
+        contexts = [(None, BoardPlayOrder.UP)]
+        for value in CARD_VALUES:
+            contexts += [(value, BoardPlayOrder.UP), (value, BoardPlayOrder.DOWN)]
+        return contexts
+
+    @property
+    def number_of_vectors(self) -> int:
+        return self.__vectors_below[0][self.hand_size]
+
+    def covers(self, value_counts: Sequence[int]) -> bool:
+        return sum(value_counts) <= self.hand_size and max(value_counts) <= NUMBER_OF_SUITS
+
+    def rank(self, value_counts: Sequence[int]) -> int:
+        """ Position of value_counts among all count vectors with at most hand_size cards."""
+        vectors_below = self.__vectors_below
+        rank = 0
+        remaining = self.hand_size
+        for slot, count in enumerate(value_counts):
+            below = vectors_below[slot + 1]
+            for skipped_count in range(count):
+                rank += below[remaining - skipped_count]
+            remaining -= count
+        return rank
+
+    def mask(self, value_counts: Sequence[int], top_card_value: CardValue | None, play_order: BoardPlayOrder) -> int:
+        context_index = 0
+        if top_card_value is not None:
+            context_index = 1 + 2 * (top_card_value.value - 2) + (play_order == BoardPlayOrder.DOWN)
+        start = self.__offset + (self.rank(value_counts) * self.NUMBER_OF_CONTEXTS + context_index) * self.row_size
+        return int.from_bytes(self.__buffer[start:start + self.row_size], "little")
+
+    def legal_combos(self, value_counts: Sequence[int], top_card_value: CardValue | None,
+                     play_order: BoardPlayOrder) -> list[FrozenCombo]:
+        mask = self.mask(value_counts, top_card_value, play_order)
+        combos = []
+        while mask:
+            lowest_bit = mask & -mask
+            combos.append(TABLE_COMBOS[lowest_bit.bit_length() - 1])
+            mask ^= lowest_bit
+        return combos
+
+
+def _vectors_below_table(hand_size: int) -> list[list[int]]:
+    """ [slot][r] = number of ways to fill slots slot.. with at most r cards and at most NUMBER_OF_SUITS each."""
+    table = [[1] * (hand_size + 1)]
+    for _ in range(NUMBER_OF_CARD_VALUES):
+        below = table[0]
+        table.insert(0, [sum(below[r - count] for count in range(min(NUMBER_OF_SUITS, r) + 1))
+                         for r in range(hand_size + 1)])
+    return table
+
+
+def _count_vectors(hand_size: int, prefix: tuple[int, ...] = ()) -> Iterable[tuple[int, ...]]:
+    """ All count vectors with at most hand_size cards, in rank order."""
+    if len(prefix) == NUMBER_OF_CARD_VALUES:
+        yield prefix
+        return None
+    for count in range(min(NUMBER_OF_SUITS, hand_size) + 1):
+        yield from _count_vectors(hand_size - count, prefix + (count,))
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the on-disk legal combo lookup table.")
+    parser.add_argument("--hand-size", type=int, default=5)
+    parser.add_argument("--output", default=DEFAULT_TABLE_PATH)
+    args = parser.parse_args()
+
+    from src.board import Board
+    LegalComboTable.build(args.output, args.hand_size,
+                          lambda value_counts, top_card_value, play_order:
+                          Board.legal_combos_for_context(value_counts, top_card_value, play_order, False))
+    print(f"Wrote {os.path.getsize(args.output)} bytes to \'{args.output}\'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from src.board import Board
+from src.legal_combo_table import LegalComboTable, _count_vectors
+
+
+class TestLegalComboTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.file_path = os.path.join(cls.directory.name, "legal_combos.table")
+        LegalComboTable.build(cls.file_path, 3, lambda value_counts, top_card_value, play_order:
+                              Board.legal_combos_for_context(value_counts, top_card_value, play_order, False))
+        cls.table = LegalComboTable.open(cls.file_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.table
+        cls.directory.cleanup()
+
+    def test_rank_is_dense(self):
+        ranks = [self.table.rank(value_counts) for value_counts in _count_vectors(3)]
+        self.assertEqual(ranks, list(range(self.table.number_of_vectors)))
+
+    def test_matches_live_generator(self):
+        for value_counts in _count_vectors(3):
+            for top_card_value, play_order in LegalComboTable.contexts():
+                self.assertEqual(set(self.table.legal_combos(value_counts, top_card_value, play_order)),
+                                 set(Board.legal_combos_for_context(value_counts, top_card_value, play_order,
+                                                                    False)))
+
+    def test_covers(self):
+        self.assertTrue(self.table.covers((3,) + (0,) * 13))
+        self.assertFalse(self.table.covers((2, 2) + (0,) * 12))
+
+    def test_open_rejects_other_files(self):
+        file_path = os.path.join(self.directory.name, "not_a_table")
+        with open(file_path, "wb") as file:
+            file.write(b"\x00" * 64)
+        with self.assertRaises(ValueError):
+            LegalComboTable.open(file_path)
+
+    def test_open_if_built_ignores_broken_files(self):
+        with open(self.file_path, "rb") as file:
+            header = file.read(64)
+        for contents in (b"", header[:4], header, b"\x00" * 64):
+            file_path = os.path.join(self.directory.name, "broken_table")
+            with open(file_path, "wb") as file:
+                file.write(contents)
+            with self.assertWarns(UserWarning):
+                self.assertIsNone(LegalComboTable.open_if_built(file_path))
+        self.assertIsNone(LegalComboTable.open_if_built(os.path.join(self.directory.name, "missing_table")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+from src.batch_board import BatchBoard, HAND, KARMA_FACE_UP, KARMA_FACE_DOWN
+from src.board_interface import IBoard, BoardPlayOrder, BoardTurnOrder
+from src.cards import NUMBER_OF_CARD_VALUES
+
+NO_CARD_SLOT = NUMBER_OF_CARD_VALUES  # One hot slot for "no card" after the 14 value slots
+SLOTS_WITH_NONE = NUMBER_OF_CARD_VALUES + 1
+NUMBER_OF_SCALARS = 7
+
+
+class ObservationEncoder:
+    """ The current player's view of a board as a flat float32 vector, written into a caller owned buffer.
+
+        Players are rotated so the current player is always first. Per player: hand value counts, hand size,
+        face up karma value counts and face down karma size. A hand's values are only visible to the current
+        player when the cards are not flipped, and only to the others when they are. Then the top visible
+        card, the last history_length cards of the play pile (value and visibility), burn pile value counts
+        and the scalars: draw pile size, play pile size, play order, turn order, log2 of the effect
+        multiplier, flipped and jokers in play."""
+
+    PLAYER_FEATURES = 2 * NUMBER_OF_CARD_VALUES + 2
+
+    def __init__(self, number_of_players: int, history_length: int = 8):
+        self.number_of_players = number_of_players
+        self.history_length = history_length
+        self.top_card_offset = number_of_players * self.PLAYER_FEATURES
+        self.history_offset = self.top_card_offset + SLOTS_WITH_NONE
+        self.burn_offset = self.history_offset + history_length * SLOTS_WITH_NONE
+        self.scalars_offset = self.burn_offset + NUMBER_OF_CARD_VALUES
+        self.size = self.scalars_offset + NUMBER_OF_SCALARS
+
+    def new_buffer(self, batch_size: int | None = None) -> np.ndarray:
+        if batch_size is None:
+            return np.zeros(self.size, dtype=np.float32)
+        return np.zeros((batch_size, self.size), dtype=np.float32)
+
+    def encode(self, board: IBoard, out: np.ndarray) -> np.ndarray:
+        out.fill(0)
+        number_of_players = self.number_of_players
+        for seat in range(number_of_players):
+            player = board.players[(board.player_index + seat) % number_of_players]
+            start = seat * self.PLAYER_FEATURES
+            if (seat == 0) != board.cards_are_flipped:
+                out[start:start + NUMBER_OF_CARD_VALUES] = player.hand.value_counts
+            start += NUMBER_OF_CARD_VALUES
+            out[start] = len(player.hand)
+            out[start + 1:start + 1 + NUMBER_OF_CARD_VALUES] = player.karma_face_up.value_counts
+            out[start + 1 + NUMBER_OF_CARD_VALUES] = len(player.karma_face_down)
+
+        play_pile = board.play_pile
+        top_card = play_pile.visible_top_card
+        out[self.top_card_offset + (NO_CARD_SLOT if top_card is None else top_card.value - 2)] = 1
+
+        visibles = play_pile.visibles
+        for depth in range(self.history_length):
+            start = self.history_offset + depth * SLOTS_WITH_NONE
+            if depth >= len(play_pile):
+                out[start + NO_CARD_SLOT] = 1
+                continue
+            out[start + play_pile[-1 - depth].value - 2] = 1 if visibles[-1 - depth] else -1
+
+        out[self.burn_offset:self.scalars_offset] = board.burn_pile.value_counts
+        self.__encode_scalars(out[self.scalars_offset:], len(board.draw_pile), len(play_pile),
+                              board.play_order == BoardPlayOrder.DOWN, board.turn_order == BoardTurnOrder.LEFT,
+                              board.effect_multiplier.bit_length() - 1, board.cards_are_flipped,
+                              board.number_of_jokers_in_play)
+        return out
+
+    def encode_batch(self, boards: Sequence[IBoard], out: np.ndarray) -> np.ndarray:
+        for board, row in zip(boards, out):
+            self.encode(board, row)
+        return out
+
+    def encode_batch_board(self, batch: BatchBoard, out: np.ndarray) -> np.ndarray:
+        """ encode_batch for every game of a BatchBoard, straight from its arrays."""
+        batch_range = np.arange(batch.batch_size)[:, None]
+        seats = (batch.player_indices[:, None] + np.arange(self.number_of_players)) % self.number_of_players
+        held = batch.held[batch_range, seats]
+        hand_is_visible = (np.arange(self.number_of_players) == 0) != batch.flipped[:, None]
+
+        players = out[:, :self.top_card_offset].reshape(batch.batch_size, self.number_of_players,
+                                                        self.PLAYER_FEATURES)
+        players[:, :, :NUMBER_OF_CARD_VALUES] = held[:, :, HAND] * hand_is_visible[:, :, None]
+        players[:, :, NUMBER_OF_CARD_VALUES] = held[:, :, HAND].sum(axis=2)
+        players[:, :, NUMBER_OF_CARD_VALUES + 1:-1] = held[:, :, KARMA_FACE_UP]
+        players[:, :, -1] = held[:, :, KARMA_FACE_DOWN].sum(axis=2)
+
+        top_card = out[:, self.top_card_offset:self.history_offset]
+        top_card.fill(0)
+        top_slots = batch.top_visible_slots()
+        top_card[batch_range[:, 0], np.where(top_slots < 0, NO_CARD_SLOT, top_slots)] = 1
+
+        history = out[:, self.history_offset:self.burn_offset].reshape(batch.batch_size, self.history_length,
+                                                                       SLOTS_WITH_NONE)
+        history.fill(0)
+        positions = batch.play_lengths[:, None] - 1 - np.arange(self.history_length)
+        in_pile = positions >= 0
+        positions = np.maximum(positions, 0)
+        values = np.take_along_axis(batch.play_values, positions, axis=1)
+        visibles = np.take_along_axis(batch.play_visibles, positions, axis=1)
+        history[batch_range, np.arange(self.history_length), np.where(in_pile, values, NO_CARD_SLOT)] = np.where(
+            in_pile, np.where(visibles, 1, -1), 1)
+
+        within_burn_pile = np.arange(batch.burn_values.shape[1]) < batch.burn_lengths[:, None]
+        out[:, self.burn_offset:self.scalars_offset] = (
+            (batch.burn_values[:, :, None] == np.arange(NUMBER_OF_CARD_VALUES)) & within_burn_pile[:, :, None]
+        ).sum(axis=1)
+        self.__encode_scalars(out[:, self.scalars_offset:].T, batch.draw_lengths, batch.play_lengths,
+                              batch.play_orders == BoardPlayOrder.DOWN.value,
+                              batch.turn_orders == BoardTurnOrder.LEFT.value, batch.multiplier_exponents,
+                              batch.flipped, batch.jokers_in_play)
+        return out
+
+    @staticmethod
+    def __encode_scalars(out: np.ndarray, *scalars) -> None:
+        for i, scalar in enumerate(scalars):
+            out[i] = scalar
+        return None
@@ -0,0 +1,59 @@
+import random
+import unittest
+
+import numpy as np
+
+from src.batch_board import BatchBoard, PICKUP
+from src.board import Board
+from src.board_seeds import BoardFactory
+from src.cards import NUMBER_OF_CARD_VALUES
+from src.observation import ObservationEncoder
+
+
+class TestObservationEncoder(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.encoder = ObservationEncoder(2, history_length=3)
+
+    def test_own_hand_is_visible(self):
+        board = BoardFactory(Board).matrix_start([[[5, 5, 9], [7], [2, 3]], [[8], [], []]], [],
+                                                 play_pile_values=[4, 10])
+        observation = self.encoder.encode(board, self.encoder.new_buffer())
+        self.assertEqual(observation[5 - 2], 2)
+        self.assertEqual(observation[ObservationEncoder.PLAYER_FEATURES + 8 - 2], 0)
+        self.assertEqual(observation[ObservationEncoder.PLAYER_FEATURES - 1], 2)
+        self.assertEqual(observation[self.encoder.top_card_offset + 10 - 2], 1)
+        history = observation[self.encoder.history_offset:self.encoder.burn_offset].reshape(3, -1)
+        self.assertEqual(history[1, 4 - 2], -1)
+        self.assertEqual(history[2, -1], 1)
+
+    def test_flipped_hides_own_hand_only(self):
+        board = BoardFactory(Board).matrix_start([[[5, 5, 9], [], []], [[8], [], []]], [], cards_are_flipped=True)
+        observation = self.encoder.encode(board, self.encoder.new_buffer())
+        self.assertEqual(observation[5 - 2], 0)
+        self.assertEqual(observation[NUMBER_OF_CARD_VALUES], 3)
+        self.assertEqual(observation[ObservationEncoder.PLAYER_FEATURES + 8 - 2], 1)
+
+    def test_face_down_karma_is_hidden(self):
+        first = BoardFactory(Board).matrix_start([[[5], [], [2, 3]], [[8], [], []]], [])
+        second = BoardFactory(Board).matrix_start([[[5], [], [9, 14]], [[8], [], []]], [])
+        self.assertTrue(np.array_equal(self.encoder.encode(first, self.encoder.new_buffer()),
+                                       self.encoder.encode(second, self.encoder.new_buffer())))
+
+    def test_batch_board_matches_boards(self):
+        encoder = ObservationEncoder(4)
+        batch = BatchBoard.random_start(30, 4)
+        for _ in range(25):
+            batch.start_turn()
+            masks = batch.legal_combo_masks()
+            batch.apply(np.where(masks.any(axis=1), np.argmax(masks, axis=1), PICKUP))
+            batch.end_turn()
+            boards = [batch.to_board(i) for i in range(batch.batch_size)]
+            expected = encoder.encode_batch(boards, encoder.new_buffer(batch.batch_size))
+            actual = encoder.encode_batch_board(batch, np.full((batch.batch_size, encoder.size), 7,
+                                                               dtype=np.float32))
+            self.assertTrue(np.array_equal(actual, expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -33,6 +33,14 @@ class Player:
     def __repr_karma_debug(self) -> str:
         return f"FUK{self.karma_face_up}, FDK{self.karma_face_down}"
 
+    def copy(self) -> Self:
+        """ Copies the card containers, not the cards. Hand order is kept (it may be shuffled)."""
+        player = self.__class__.__new__(self.__class__)
+        player.hand = self.hand.copy()
+        player.karma_face_up = self.karma_face_up.copy()
+        player.karma_face_down = self.karma_face_down.copy()
+        return player
+
     @property
     def has_cards(self) -> bool:
         return len(self) != 0
@@ -99,7 +107,7 @@ class Player:
     @classmethod
     def from_card_values(cls, player_matrix: list[list[int]]) -> Self:
         suit = SUITS[0]
-        hand = Hand(Cards([Card(suit, CardValue(x)) for x in player_matrix[0]]))
-        kfu = KarmaFaceUp(Cards([Card(suit, CardValue(x)) for x in player_matrix[1]]))
-        kfd = KarmaFaceDown(Cards([Card(suit, CardValue(x)) for x in player_matrix[2]]))
+        hand = Hand(Cards([Card.interned(suit, CardValue(x)) for x in player_matrix[0]]))
+        kfu = KarmaFaceUp(Cards([Card.interned(suit, CardValue(x)) for x in player_matrix[1]]))
+        kfd = KarmaFaceDown(Cards([Card.interned(suit, CardValue(x)) for x in player_matrix[2]]))
         return cls(hand, kfu, kfd)
@@ -0,0 +1,94 @@
+import random
+
+from src.cards import CardValue
+from src.frozen_combo import FrozenCombo
+from src.board_interface import IBoard
+from src.board_actions import PickUpPlayPile
+from src.policy_interface import IPolicy, IRolloutPolicy
+from src.bot_interface import IBot
+
+
+class RandomPolicy(IPolicy):
+    """ Uniformly random legal decisions, drawn from the module `random` so that seeding a game reproduces it."""
+
+    def __init__(self, pickup_probability: float = 0.0):
+        self.pickup_probability = pickup_probability
+
+    def choose_combo(self, board: IBoard) -> FrozenCombo | None:
+        can_pickup = PickUpPlayPile in board.current_legal_actions
+        legal_combos = board.current_legal_combos
+        if not legal_combos or (can_pickup and random.random() < self.pickup_probability):
+            return None
+        return random.choice(sorted_combos(legal_combos))
+
+    def card_giveaway(self, board: IBoard) -> tuple[int, int]:
+        playable_cards = board.current_player.playable_cards
+        card_indices = [i for i, card in enumerate(playable_cards) if card.value != CardValue.JOKER]
+        target_indices = _other_player_indices(board, board.potential_winner_indices)
+        if not card_indices or not target_indices:
+            raise ValueError("There is no card that can be given away to a player who is not a potential winner")
+        return random.choice(card_indices), random.choice(target_indices)
+
+    def joker_target_index(self, board: IBoard) -> int:
+        return random.choice(_other_player_indices(board))
+
+    def vote_for_winner_index(self, board: IBoard) -> int:
+        return random.choice(sorted(board.potential_winner_indices))
+
+
+class RandomRolloutPolicy(IRolloutPolicy):
+    """ RandomPolicy over action ids. Draws from generator, or from the module `random` without one."""
+
+    def __init__(self, pickup_probability: float = 0.0, generator: random.Random | None = None):
+        self.pickup_probability = pickup_probability
+        self.generator = random if generator is None else generator
+
+    def choose_action_id(self, board: IBoard, legal_action_ids: list[int]) -> int:
+        if not legal_action_ids:
+            raise ValueError("There are no legal action ids to choose from")
+        if legal_action_ids[0] == board.action_space.PICKUP and len(legal_action_ids) > 1:
+            if self.generator.random() < self.pickup_probability:
+                return legal_action_ids[0]
+            return self.generator.choice(legal_action_ids[1:])
+        return self.generator.choice(legal_action_ids)
+
+    def vote_for_winner_index(self, board: IBoard) -> int:
+        return self.generator.choice(sorted(board.potential_winner_indices))
+
+
+def sorted_combos(combos) -> list[FrozenCombo]:
+    """ Legal combos in a fixed order, so random choices do not depend on set iteration order."""
+    return sorted(combos, key=lambda combo: sorted((value.value, count) for value, count in combo.items()))
+
+
+def _other_player_indices(board: IBoard, exclude: set[int] | None = None) -> list[int]:
+    excluded = {board.player_index}
+    if exclude is not None:
+        excluded |= exclude
+    return [i for i in range(len(board.players)) if i not in excluded]
+
+
+class BotPolicy(IPolicy):
+    """ Lets any IBot play headless games: the bot answers the same questions BotController would ask it."""
+
+    def __init__(self, bot: IBot):
+        self.bot = bot
+
+    def choose_combo(self, board: IBoard) -> FrozenCombo | None:
+        self.bot.set_board(board)
+        if self.bot.action() == PickUpPlayPile.name() and PickUpPlayPile in board.current_legal_actions:
+            return None
+        playable_cards = board.current_player.playable_cards
+        return FrozenCombo(playable_cards.get(self.bot.card_play_indices()).values)
+
+    def card_giveaway(self, board: IBoard) -> tuple[int, int]:
+        self.bot.set_board(board)
+        return self.bot.card_giveaway_index(), self.bot.card_giveaway_player_index()
+
+    def joker_target_index(self, board: IBoard) -> int:
+        self.bot.set_board(board)
+        return self.bot.joker_target_index()
+
+    def vote_for_winner_index(self, board: IBoard) -> int:
+        self.bot.set_board(board)
+        return self.bot.vote_for_winner_index()
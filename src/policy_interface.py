@@ -0,0 +1,40 @@
+import random
+
+from abc import ABC, abstractmethod
+
+from src.frozen_combo import FrozenCombo
+from src.board_interface import IBoard
+
+
+class IPolicy(ABC):
+    """ Decisions for a headless game. Every method is handed the live board instead of a prompt."""
+
+    @abstractmethod
+    def choose_combo(self, board: IBoard) -> FrozenCombo | None:
+        """ One of board.current_legal_combos, or None to pick up the play pile."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def card_giveaway(self, board: IBoard) -> tuple[int, int]:
+        """ (playable card index, target player index) for a queen give-away."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def joker_target_index(self, board: IBoard) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def vote_for_winner_index(self, board: IBoard) -> int:
+        raise NotImplementedError
+
+
+class IRolloutPolicy(ABC):
+    """ Action id decisions for rollouts. The engine hands over the sorted legal action ids of whatever is being
+        decided (a turn, a give-away or a joker target) and plays the id it gets back without checking it."""
+
+    @abstractmethod
+    def choose_action_id(self, board: IBoard, legal_action_ids: list[int]) -> int:
+        raise NotImplementedError
+
+    def vote_for_winner_index(self, board: IBoard) -> int:
+        return random.choice(sorted(board.potential_winner_indices))
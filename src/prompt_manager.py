@@ -29,6 +29,8 @@ class Prompt:
 
 
 class PromptManager:
+    __loaded: dict[str, "PromptManager"] = {}
+
     def __init__(self, file_path: str="prompts.csv"):
         assert len(file_path) > 4 and file_path[-4:] == ".csv", FileNotFoundError(file_path)
         self.__file_path = file_path
@@ -50,3 +52,10 @@ class PromptManager:
 
     def get(self, key: str) -> Prompt:
         return self.__getitem__(key)
+
+    @classmethod
+    def cached(cls, file_path: str="prompts.csv") -> "PromptManager":
+        """ Shared (read-only) manager per file, so boards and combos do not re-read the csv every time."""
+        if file_path not in cls.__loaded:
+            cls.__loaded[file_path] = cls(file_path)
+        return cls.__loaded[file_path]
@@ -0,0 +1,251 @@
+from collections import Counter, defaultdict
+
+from typing import Any, Callable, Iterable
+
+import random
+
+from src.action_space import ActionPhase
+from src.board import Board
+from src.board_interface import IBoard
+from src.board_actions import PickUpPlayPile, PlayCardsCombo, combo_card_indices
+from src.board_seeds import BoardFactory
+from src.controller_interface import IController
+from src.frozen_combo import FrozenCombo
+from src.policy_interface import IPolicy, IRolloutPolicy
+from src.policies import RandomPolicy
+
+type BoardConstructor = Callable[[], IBoard]
+type OnTurnEnd = Callable[[IBoard], None]
+type AnyPolicy = IPolicy | IRolloutPolicy
+
+
+class GameResult:
+    def __init__(self, ranks: dict[int, int], turns_played: int, burns: int, combo_counts: dict[str, int],
+                 turn_limit_exceeded: bool = False):
+        self.ranks = ranks
+        self.turns_played = turns_played
+        self.burns = burns
+        self.combo_counts = combo_counts
+        self.turn_limit_exceeded = turn_limit_exceeded
+
+    def __repr__(self) -> str:
+        return (f"GameResult(ranks={self.ranks}, turns_played={self.turns_played}, burns={self.burns}, "
+                f"turn_limit_exceeded={self.turn_limit_exceeded})")
+
+    @property
+    def winner_indices(self) -> set[int]:
+        return {player_index for player_index, rank in self.ranks.items() if rank == 0}
+
+
+class PolicyController(IController):
+    """ Routes every in-combo decision straight to the policy of the player whose turn it is. No prompts.
+        Rollout policies are handed the legal action ids and their answer is used unchecked.
+
+        Game's prompts are answered from the policies too, for the board given to set_board, so a Game can
+        be played by policies without a bot. Mulligans are always declined and play starts to the right."""
+
+    def __init__(self, policies: list[AnyPolicy], board: IBoard | None = None):
+        self.__policies = policies
+        self.__board = board
+        self.__pending_combo: FrozenCombo | None = None
+        self.__pending_target_index: int | None = None
+        self.__response_from_prompt_map = {"give_away": self.__give_away_card_index,
+                                           "give_away_select_player": self.__give_away_player_index,
+                                           "joker_select_player": lambda: self.joker_target_index(self.__board),
+                                           "mulligan_yn": lambda: "n",
+                                           "choose_direction": lambda: "r",
+                                           "select_action": self.__action_name,
+                                           "select_cards_to_play": self.__card_play_indices,
+                                           "vote_for_winner": self.__vote_for_winner_index}
+
+    def set_board(self, board: IBoard) -> None:
+        self.__board = board
+        return None
+
+    def get_response(self, prompts: list[Any], output_checks: list[Any]) -> list[Any]:
+        assert len(prompts) == len(output_checks), ValueError("The prompts must have a condition for each!")
+        if self.__board is None:
+            raise ValueError("Set a board before prompting a PolicyController")
+        return [self.__response_from_prompt_map[prompt.key]() for prompt in prompts]
+
+    def card_giveaway(self, board: IBoard, prompt_manager: Any = None) -> tuple[int, int]:
+        policy = self.__policies[board.player_index]
+        if not isinstance(policy, IRolloutPolicy):
+            return policy.card_giveaway(board)
+        action_id = policy.choose_action_id(board, board.legal_action_ids(ActionPhase.GIVE_AWAY))
+        value, target_player_index = board.action_space.give_away(action_id)
+        card_index = next(i for i, card in enumerate(board.current_player.playable_cards) if card.value == value)
+        return card_index, target_player_index
+
+    def joker_target_index(self, board: IBoard, prompt_manager: Any = None) -> int:
+        policy = self.__policies[board.player_index]
+        if not isinstance(policy, IRolloutPolicy):
+            return policy.joker_target_index(board)
+        action_id = policy.choose_action_id(board, board.legal_action_ids(ActionPhase.JOKER_TARGET))
+        return board.action_space.joker_target(action_id)
+
+    def __give_away_card_index(self) -> int:
+        card_index, self.__pending_target_index = self.card_giveaway(self.__board)
+        return card_index
+
+    def __give_away_player_index(self) -> int:
+        target_player_index = self.__pending_target_index
+        self.__pending_target_index = None
+        if target_player_index is None:
+            return self.card_giveaway(self.__board)[1]
+        return target_player_index
+
+    def __action_name(self) -> str:
+        self.__pending_combo = turn_combo(self.__policies[self.__board.player_index], self.__board)
+        if self.__pending_combo is None:
+            return PickUpPlayPile.name()
+        return PlayCardsCombo.name()
+
+    def __card_play_indices(self) -> list[int]:
+        combo = self.__pending_combo
+        self.__pending_combo = None
+        if combo is None:
+            combo = turn_combo(self.__policies[self.__board.player_index], self.__board)
+        return combo_card_indices(self.__board.current_player.playable_cards, combo)
+
+    def __vote_for_winner_index(self) -> int:
+        return self.__policies[self.__board.player_index].vote_for_winner_index(self.__board)
+
+
+def turn_combo(policy: AnyPolicy, board: IBoard) -> FrozenCombo | None:
+    """ The combo policy plays this turn, or None to pick up the play pile. Falls back to the first legal combo
+        when the policy would pick up but cannot."""
+    actions = board.current_legal_actions
+    combo = None
+    if isinstance(policy, IRolloutPolicy):
+        action_id = policy.choose_action_id(board, board.legal_action_ids(ActionPhase.TURN))
+        if action_id != board.action_space.PICKUP:
+            combo = board.action_space.combo(action_id)
+    elif PlayCardsCombo in actions:
+        combo = policy.choose_combo(board)
+    if combo is None and PickUpPlayPile not in actions:
+        combo = next(iter(board.current_legal_combos))
+    return combo
+
+
+class Simulator:
+    """ Plays complete bot games back to back with the same rules as Game, but without printing,
+        prompts or exceptions for control flow. Seats can mix IPolicy and IRolloutPolicy.
+
+        About 135 games/s per core with four RandomPolicy seats, roughly 120us a turn, nearly all of it in Board
+        itself: combo creation and effects, card container bookkeeping and legal combo lookups. BatchBoard
+        steps thousands of games together for bulk runs."""
+
+    def __init__(self, policies: list[AnyPolicy], turn_limit: int = 100, number_of_jokers: int = 1,
+                 board_constructor: BoardConstructor | None = None):
+        self.policies = policies
+        self.turn_limit = turn_limit
+        self.number_of_jokers = number_of_jokers
+        self.__board_constructor = board_constructor
+        if board_constructor is None:
+            self.__board_constructor = self.__random_start
+        self.__controller = PolicyController(policies)
+
+    def run(self, number_of_games: int, first_seed: int | None = None) -> list[GameResult]:
+        """ With first_seed set, game i is seeded with first_seed + i, so any slice of games can be replayed."""
+        results = []
+        for i in range(number_of_games):
+            if first_seed is not None:
+                random.seed(first_seed + i)
+            results.append(self.play_game(self.__board_constructor()))
+        return results
+
+    def play_seeds(self, seeds: Iterable[int], on_turn_end: OnTurnEnd | None = None) -> list[GameResult]:
+        results = []
+        for seed in seeds:
+            random.seed(seed)
+            results.append(self.play_game(self.__board_constructor(), on_turn_end=on_turn_end))
+        return results
+
+    def play_game(self, board: IBoard, on_turn_end: OnTurnEnd | None = None) -> GameResult:
+        """ on_turn_end sees the board after every turn that does not end the game, with the next player set.
+
+            The turn change is in the same order as Game.end_turn: step on, replay a burning player's turn if
+            they still have cards, and only after that replay look for a winner or the turn limit."""
+        burns = 0
+        while True:
+            self.play_turn(board)
+            if board.has_burned_this_turn:
+                burns += 1
+            board.end_turn()
+            board.step_player_index(1)
+            if board.has_burned_this_turn and board.get_player(board.player_index_who_started_turn).has_cards:
+                board.set_player_index(board.player_index_who_started_turn)
+                if on_turn_end is not None:
+                    on_turn_end(board)
+                continue
+
+            number_of_potential_winners = len(board.potential_winner_indices)
+            if number_of_potential_winners >= 1 and board.number_of_jokers_in_play == 0:
+                return self.__result(board, self.game_ranks(board), burns)
+            if number_of_potential_winners >= 2:
+                ranks = self.game_ranks(board)
+                self.__vote_for_winners(board, ranks)
+                return self.__result(board, ranks, burns)
+            if board.turns_played >= self.turn_limit:
+                return self.__result(board, self.game_ranks(board), burns, turn_limit_exceeded=True)
+            if on_turn_end is not None:
+                on_turn_end(board)
+
+    def play_turn(self, board: IBoard) -> None:
+        board.start_turn()
+        if not board.current_legal_actions:
+            return None
+
+        combo = turn_combo(self.policies[board.player_index], board)
+        if combo is None:
+            PickUpPlayPile()(board)
+            return None
+
+        playable_cards = board.current_player.playable_cards
+        cards = playable_cards.get(combo_card_indices(playable_cards, combo))
+        PlayCardsCombo(lambda: cards)(board, controller=self.__controller)
+        return None
+
+    @staticmethod
+    def game_ranks(board: IBoard) -> dict[int, int]:
+        """ Players with fewer cards rank higher, the same as Game."""
+        card_counts = sorted({len(player) for player in board.players})
+        rank_of_count = {card_count: rank for rank, card_count in enumerate(card_counts)}
+        return {i: rank_of_count[len(player)] for i, player in enumerate(board.players)}
+
+    def __vote_for_winners(self, board: IBoard, ranks: dict[int, int]) -> None:
+        votes = defaultdict(int)
+        for player_index, player in enumerate(board.players):
+            joker_count = player.number_of_jokers
+            if joker_count > 0:
+                board.set_player_index(player_index)
+                votes[self.policies[player_index].vote_for_winner_index(board)] += joker_count
+
+        if votes:
+            most_votes = max(votes.values())
+            for player_index in range(len(board.players)):
+                if votes.get(player_index, 0) != most_votes:
+                    ranks[player_index] += 1
+        return None
+
+    @staticmethod
+    def __result(board: IBoard, ranks: dict[int, int], burns: int, turn_limit_exceeded: bool = False) -> GameResult:
+        combo_counts = Counter(combo.__class__.__name__ for combo in board.combo_history)
+        return GameResult(ranks, board.turns_played, burns, dict(combo_counts), turn_limit_exceeded)
+
+    def __random_start(self) -> IBoard:
+        return BoardFactory(Board).random_start(number_of_players=len(self.policies),
+                                                number_of_jokers=self.number_of_jokers)
+
+
+def main():
+    simulator = Simulator([RandomPolicy() for _ in range(4)])
+    results = simulator.run(1000, first_seed=0)
+    win_counts = Counter(player_index for result in results for player_index in result.winner_indices)
+    print(f"Wins per seat: {dict(sorted(win_counts.items()))}")
+    print(f"Turn limit hit: {sum(result.turn_limit_exceeded for result in results)}/{len(results)}")
+
+
+if __name__ == "__main__":
+    main()
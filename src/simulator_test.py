@@ -0,0 +1,116 @@
+import contextlib
+import io
+import random
+import unittest
+
+from src.board import Board
+from src.board_seeds import BoardFactory
+from src.cards import CardValue
+from src.game import Game, GameWonException, GameTurnLimitExceededException
+from src.policies import RandomPolicy, RandomRolloutPolicy
+from src.prompt_manager import PromptManager
+from src.simulator import PolicyController, Simulator
+
+
+class TestSimulator(unittest.TestCase):
+    def test_games_finish(self):
+        simulator = Simulator([RandomPolicy() for _ in range(4)])
+        results = simulator.run(20, first_seed=0)
+        self.assertEqual(len(results), 20)
+        for result in results:
+            self.assertEqual(sorted(result.ranks.keys()), [0, 1, 2, 3])
+            self.assertTrue(result.winner_indices)
+            self.assertLessEqual(result.turns_played, simulator.turn_limit)
+
+    def test_seeded_runs_repeat(self):
+        simulator = Simulator([RandomPolicy() for _ in range(4)])
+        first = simulator.run(5, first_seed=123)
+        second = simulator.play_seeds(range(123, 128))
+        self.assertEqual([x.ranks for x in first], [x.ranks for x in second])
+        self.assertEqual([x.combo_counts for x in first], [x.combo_counts for x in second])
+
+    def test_matrix_start_single_card_wins(self):
+        board = BoardFactory(Board).matrix_start([[[7], [], []], [[2, 3], [], []]], [])
+        result = Simulator([RandomPolicy(), RandomPolicy()]).play_game(board)
+        self.assertEqual(result.ranks, {0: 0, 1: 1})
+        self.assertEqual(result.turns_played, 1)
+
+    def test_burn_is_replayed_before_the_game_ends(self):
+        board = BoardFactory(Board).matrix_start([[[10, 3], [], []], [[5], [], []]], [], play_pile_values=[7])
+        simulator = Simulator([RandomPolicy(), RandomPolicy()], turn_limit=1)
+        result = simulator.play_game(board)
+        self.assertEqual(result.ranks, {0: 0, 1: 1})
+        self.assertEqual(result.turns_played, 2)
+        self.assertEqual(result.burns, 1)
+        self.assertFalse(result.turn_limit_exceeded)
+
+    def test_queen_skips_give_away_without_a_target(self):
+        # Seed 119 plays a queen while the only opponent is already a potential winner
+        results = Simulator([RandomPolicy(), RandomPolicy()]).play_seeds(range(110, 130))
+        self.assertEqual(len(results), 20)
+        for result in results:
+            self.assertTrue(result.winner_indices)
+
+    def test_rollout_policy_games_finish(self):
+        simulator = Simulator([RandomRolloutPolicy(pickup_probability=0.05) for _ in range(4)])
+        results = simulator.run(20, first_seed=0)
+        self.assertEqual(len(results), 20)
+        for result in results:
+            self.assertEqual(sorted(result.ranks.keys()), [0, 1, 2, 3])
+            self.assertTrue(result.winner_indices)
+
+    def test_rollout_queen_skips_give_away_without_a_target(self):
+        # Seed 48 plays a queen while the only opponent is already a potential winner
+        results = Simulator([RandomRolloutPolicy(), RandomRolloutPolicy()]).play_seeds(range(40, 60))
+        self.assertEqual(len(results), 20)
+        with self.assertRaises(ValueError):
+            RandomRolloutPolicy().choose_action_id(BoardFactory(Board).random_start(number_of_players=2), [])
+
+    def test_seeded_rollout_runs_repeat(self):
+        simulator = Simulator([RandomRolloutPolicy() for _ in range(4)])
+        first = simulator.run(5, first_seed=7)
+        second = simulator.run(5, first_seed=7)
+        self.assertEqual([x.ranks for x in first], [x.ranks for x in second])
+        self.assertEqual([x.combo_counts for x in first], [x.combo_counts for x in second])
+
+    def test_on_turn_end_sees_every_turn(self):
+        simulator = Simulator([RandomPolicy() for _ in range(4)])
+        turns = []
+        result, = simulator.play_seeds([3], on_turn_end=lambda board: turns.append(board.turns_played))
+        self.assertEqual(turns, list(range(1, result.turns_played)))
+
+    def test_mixed_policy_seats(self):
+        simulator = Simulator([RandomPolicy(), RandomRolloutPolicy(), RandomPolicy(), RandomRolloutPolicy()])
+        for result in simulator.run(10, first_seed=0):
+            self.assertEqual(sorted(result.ranks.keys()), [0, 1, 2, 3])
+
+
+
+class TestPolicyController(unittest.TestCase):
+    def test_answers_give_away_prompts(self):
+        board = BoardFactory(Board).matrix_start([[[15, 9], [], []], [[7], [], []], [[5], [], []]], [])
+        controller = PolicyController([RandomPolicy() for _ in range(3)], board)
+        prompt_manager = PromptManager.cached("prompts.csv")
+        card_index, target_player_index = controller.get_response(
+            [prompt_manager["give_away"], prompt_manager["give_away_select_player"]], [None, None])
+        self.assertEqual(board.players[0].hand[card_index].value, CardValue.NINE)
+        self.assertIn(target_player_index, (1, 2))
+
+    def test_plays_a_game_through_prompts(self):
+        random.seed(0)
+        board = BoardFactory(Board).random_start(number_of_players=4)
+        controller = PolicyController([RandomPolicy(pickup_probability=0.05), RandomRolloutPolicy(),
+                                       RandomPolicy(), RandomRolloutPolicy(pickup_probability=0.05)], board)
+        with contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaises((GameWonException, GameTurnLimitExceededException)):
+                Game(board, controller=controller).play()
+        self.assertTrue(board.potential_winner_indices or board.turns_played >= 100)
+
+    def test_needs_a_board(self):
+        with self.assertRaises(ValueError):
+            PolicyController([RandomPolicy()]).get_response([PromptManager.cached("prompts.csv")["mulligan_yn"]],
+                                                            [None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+
+from typing import Any, Iterator
+
+import os
+
+from src.bot_interface import IBot
+from src.bots import IntegrationTestBot
+from src.policies import BotPolicy
+from src.simulator import Simulator
+
+type BotSpec = tuple[type[IBot], dict[str, Any]]
+type PairingTally = dict[tuple[str, str], list[int]]
+
+
+class WinRateTable:
+    """ Head-to-head results. A game where both bots own a winning seat counts as a draw for each."""
+
+    def __init__(self, names: list[str]):
+        self.names = names
+        self.__wins = {(a, b): 0 for a in names for b in names if a != b}
+        self.__draws = {(a, b): 0 for a in names for b in names if a != b}
+        self.__games = {(a, b): 0 for a in names for b in names if a != b}
+
+    def add(self, tally: PairingTally) -> None:
+        for (name, opponent), (wins, opponent_wins, draws) in tally.items():
+            games = wins + opponent_wins + draws
+            self.__wins[name, opponent] += wins
+            self.__wins[opponent, name] += opponent_wins
+            self.__draws[name, opponent] += draws
+            self.__draws[opponent, name] += draws
+            self.__games[name, opponent] += games
+            self.__games[opponent, name] += games
+        return None
+
+    def games(self, name: str, opponent: str) -> int:
+        return self.__games[name, opponent]
+
+    def win_rate(self, name: str, opponent: str) -> float:
+        games = self.__games[name, opponent]
+        if games == 0:
+            return 0.0
+        return (self.__wins[name, opponent] + 0.5 * self.__draws[name, opponent]) / games
+
+    def copy(self) -> "WinRateTable":
+        table = WinRateTable(self.names)
+        table.add({pairing: [self.__wins[pairing], self.__wins[pairing[::-1]], self.__draws[pairing]]
+                   for pairing in combinations(self.names, 2)})
+        return table
+
+    def __repr__(self) -> str:
+        width = max([len(name) for name in self.names] + [6])
+        rows = [" " * width + " " + " ".join(f"{name:>{width}}" for name in self.names)]
+        for name in self.names:
+            cells = [f"{'-':>{width}}" if name == opponent else f"{self.win_rate(name, opponent):>{width}.3f}"
+                     for opponent in self.names]
+            rows.append(f"{name:>{width}} " + " ".join(cells))
+        return "\n".join(rows)
+
+
+class Tournament:
+    """ Round robin over every pair of registered bots, with the seed range sharded across processes.
+
+        Every seed is played twice per pairing (each bot gets the first seat once) and seeds the game's
+        random module, so the final table only depends on the seed range, never on the number of workers."""
+
+    def __init__(self, number_of_players: int = 4, turn_limit: int = 100, shard_size: int = 250):
+        self.number_of_players = number_of_players
+        self.turn_limit = turn_limit
+        self.shard_size = shard_size
+        self.__bot_specs: dict[str, BotSpec] = {}
+
+    def register(self, name: str, bot_class: type[IBot], **bot_kwargs) -> None:
+        if name in self.__bot_specs:
+            raise KeyError(f"A bot named \'{name}\' is already registered")
+        self.__bot_specs[name] = (bot_class, bot_kwargs)
+        return None
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.__bot_specs.keys())
+
+    def run(self, seeds: range, max_workers: int | None = None) -> WinRateTable:
+        table = WinRateTable(self.names)
+        for table in self.stream(seeds, max_workers=max_workers):
+            pass
+        return table
+
+    def stream(self, seeds: range, max_workers: int | None = None) -> Iterator[WinRateTable]:
+        """ Yields the running table each time a shard finishes."""
+        if max_workers is None:
+            max_workers = os.cpu_count()
+        table = WinRateTable(self.names)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_play_shard, {name: self.__bot_specs[name] for name in pairing},
+                                       self.number_of_players, self.turn_limit, shard)
+                       for pairing in combinations(self.names, 2) for shard in self.__shards(seeds)]
+            for future in as_completed(futures):
+                table.add(future.result())
+                yield table.copy()
+        return None
+
+    def __shards(self, seeds: range) -> list[range]:
+        return [seeds[i:i + self.shard_size] for i in range(0, len(seeds), self.shard_size)]
+
+
+def _play_shard(bot_specs: dict[str, BotSpec], number_of_players: int, turn_limit: int,
+                seeds: range) -> PairingTally:
+    name, opponent = bot_specs.keys()
+    tally = [0, 0, 0]
+    for first, second in ((name, opponent), (opponent, name)):
+        seat_names = [first if i % 2 == 0 else second for i in range(number_of_players)]
+        policies = [BotPolicy(_create_bot(seat_name, bot_specs[seat_name])) for seat_name in seat_names]
+        for result in Simulator(policies, turn_limit=turn_limit).play_seeds(seeds):
+            winner_names = {seat_names[i] for i in result.winner_indices}
+            if winner_names == {name}:
+                tally[0] += 1
+            elif winner_names == {opponent}:
+                tally[1] += 1
+            else:
+                tally[2] += 1
+    return {(name, opponent): tally}
+
+
+def _create_bot(name: str, bot_spec: BotSpec) -> IBot:
+    bot_class, bot_kwargs = bot_spec
+    return bot_class(name, **bot_kwargs)
+
+
+def main():
+    tournament = Tournament()
+    tournament.register("Bill", IntegrationTestBot, delay=0)
+    tournament.register("Ben", IntegrationTestBot, delay=0)
+    print(tournament.run(range(2000)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import unittest
+
+from src.board_actions import PickUpPlayPile
+from src.bots import IntegrationTestBot
+from src.tournament import Tournament, WinRateTable
+
+
+class PickUpBot(IntegrationTestBot):
+    """ Picks up the play pile whenever it is allowed to."""
+
+    def action(self) -> str:
+        return PickUpPlayPile.name()
+
+
+def _tournament() -> Tournament:
+    tournament = Tournament(number_of_players=2, turn_limit=100, shard_size=5)
+    tournament.register("Player", IntegrationTestBot, delay=0)
+    tournament.register("PickUp", PickUpBot, delay=0)
+    return tournament
+
+
+class TestTournament(unittest.TestCase):
+    def test_table_does_not_depend_on_workers(self):
+        seeds = range(20)
+        serial = _tournament().run(seeds, max_workers=1)
+        parallel = _tournament().run(seeds, max_workers=3)
+        self.assertEqual(repr(serial), repr(parallel))
+        for name, opponent in (("Player", "PickUp"), ("PickUp", "Player")):
+            self.assertEqual(serial.games(name, opponent), 2 * len(seeds))
+            self.assertEqual(serial.win_rate(name, opponent), parallel.win_rate(name, opponent))
+        self.assertNotEqual(serial.win_rate("Player", "PickUp"), 0.5)
+
+    def test_stream_ends_on_the_run_table(self):
+        seeds = range(10)
+        tables = list(_tournament().stream(seeds, max_workers=2))
+        self.assertEqual(len(tables), 2)
+        self.assertEqual(repr(tables[-1]), repr(_tournament().run(seeds, max_workers=1)))
+
+    def test_register_rejects_duplicate_names(self):
+        tournament = _tournament()
+        with self.assertRaises(KeyError):
+            tournament.register("Player", IntegrationTestBot)
+
+    def test_win_rates_of_a_pairing_sum_to_one(self):
+        table = WinRateTable(["a", "b"])
+        table.add({("a", "b"): [3, 1, 2]})
+        self.assertEqual(table.games("b", "a"), 6)
+        self.assertEqual(table.win_rate("a", "b") + table.win_rate("b", "a"), 1)
+        self.assertEqual(repr(table.copy()), repr(table))
+
+
+if __name__ == '__main__':
+    unittest.main()
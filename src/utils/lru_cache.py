@@ -0,0 +1,74 @@
+from collections import OrderedDict
+
+from typing import Any, Hashable
+
+import threading
+
+
+class LRUCache:
+    """ Bounded mapping that evicts the least recently used key once full. Counts hits and misses.
+
+        Safe to share between threads: a lookup and its move to the end happen under one lock, so another
+        thread cannot evict the key in between."""
+
+    __MISSING = object()
+
+    def __init__(self, max_size: int = 1 << 16):
+        if max_size < 1:
+            raise ValueError(f"max_size must be positive, not {max_size}")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self.__lock:
+            value = self.__entries.get(key, self.__MISSING)
+            if value is self.__MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.__entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self.__lock:
+            self.__entries[key] = value
+            self.__entries.move_to_end(key)
+            if len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+        return None
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = 0
+            self.misses = 0
+        return None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_LRUCache__lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.__lock = threading.Lock()
+        return None
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return self.hits / lookups
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__entries
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __repr__(self) -> str:
+        return f"LRUCache(size={len(self)}/{self.max_size}, hits={self.hits}, misses={self.misses})"
@@ -573,10 +573,14 @@ class Multiset(BaseMultiset):
 
 class FrozenMultiset(BaseMultiset):
     """The frozen multiset variant that is immutable and hashable."""
-    __slots__ = ()
+    __slots__ = ('_hash',)
 
     def __hash__(self):
-        return hash(frozenset(self._elements.items()))
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(frozenset(self._elements.items()))
+            return self._hash
 
 
 Mapping.register(BaseMultiset)  # type: ignore
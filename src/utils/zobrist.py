@@ -0,0 +1,31 @@
+import random
+
+MASK_64 = (1 << 64) - 1
+
+
+def zobrist_keys(name: str, *shape: int) -> list:
+    """ Nested lists of random 64 bit keys. Seeded from name only, so every process gets the same keys."""
+    generator = random.Random(f"zobrist:{name}")
+    return _keys(generator, shape)
+
+
+def extend_zobrist_keys(keys: list[int], name: str, size: int) -> None:
+    """ Grows flat keys made by zobrist_keys(name, n) to size in place. Key i past the first n is seeded from
+        name and i, so it is the same however far and in whatever steps the keys have grown."""
+    for i in range(len(keys), size):
+        keys.append(random.Random(f"zobrist:{name}:{i}").getrandbits(64))
+    return None
+
+
+def _keys(generator: random.Random, shape: tuple[int, ...]) -> list:
+    if len(shape) == 1:
+        return [generator.getrandbits(64) for _ in range(shape[0])]
+    return [_keys(generator, shape[1:]) for _ in range(shape[0])]
+
+
+def mix(value: int, salt: int) -> int:
+    """ splitmix64 finaliser of value ^ salt. Lets the same container hash count differently per seat or pile."""
+    z = value ^ salt
+    z = (z ^ (z >> 30)) * 0xbf58476d1ce4e5b9 & MASK_64
+    z = (z ^ (z >> 27)) * 0x94d049bb133111eb & MASK_64
+    return z ^ (z >> 31)